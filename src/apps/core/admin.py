@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Application, Configuration, Organization
+from .models import Application, CommunitySmell, Configuration, Organization
 
 @admin.register(Configuration)
 class ConfigurationAdmin(admin.ModelAdmin):
@@ -27,3 +27,12 @@ class OrganizationAdmin(admin.ModelAdmin):
     list_per_page = 25
     ordering = ['-id']
 
+
+@admin.register(CommunitySmell)
+class CommunitySmellAdmin(admin.ModelAdmin):
+    list_display = ['id', 'organization', 'team', 'period_start', 'period_end', 'people']
+    list_display_links = ['id', 'organization', 'team']
+    list_filter = ['organization', 'team']
+    search_fields = ['id', 'organization', 'team']
+    list_per_page = 25
+    ordering = ['-id']
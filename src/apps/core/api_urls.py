@@ -2,18 +2,22 @@ from django.urls import path, register_converter, include
 from rest_framework import routers
 from .api_views import (
     ApplicationViewSet,
+    CommunitySmellViewSet,
     ConfigurationViewSet,
     OrganizationViewSet,
     IssueView,
+    PropertyView,
 )
 router = routers.DefaultRouter()
 
 router.register(r'application', ApplicationViewSet, basename='application')
 router.register(r'configuration', ConfigurationViewSet, basename='configuration')
 router.register(r'organization', OrganizationViewSet, basename='organization')
+router.register(r'community-smell', CommunitySmellViewSet, basename='community-smell')
 
 
 router.register(r'issue/repository/stats', IssueView, basename='stats')
+router.register(r'property', PropertyView, basename='property')
 
 urlpatterns = [
     path('core/', include(router.urls))
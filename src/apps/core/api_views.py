@@ -1,13 +1,14 @@
 from .models import (
-    Application, Configuration, Organization
+    Application, CommunitySmell, Configuration, Organization
 )
 from .serializers import (
     ApplicationReadSerializer, ApplicationWriteSerializer,
+    CommunitySmellReadSerializer,
     ConfigurationReadSerializer, ConfigurationWriteSerializer,
     OrganizationReadSerializer,OrganizationWriteSerializer
 )
 
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 from rest_framework.permissions import IsAdminUser
 from rest_condition import And, Or
 from oauth2_provider.contrib.rest_framework import TokenHasReadWriteScope, OAuth2Authentication
@@ -20,8 +21,10 @@ import django_filters.rest_framework
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 from django.http import JsonResponse
 from .repository.IssueRepository import IssueRepository
+from .extract_github.property_store import PropertyStore
 
 
 class ApplicationViewSet(ModelViewSet):
@@ -86,6 +89,28 @@ class OrganizationViewSet(ModelViewSet):
         return OrganizationWriteSerializer
 
 
+class CommunitySmellViewSet(ReadOnlyModelViewSet):
+    """Community smells persisted by the ``analyse_community_smells`` task.
+
+    Filter by ``organization`` and ``team`` (empty for the organization-wide,
+    per-quarter results).
+    """
+    queryset = CommunitySmell.objects.all()
+    serializer_class = CommunitySmellReadSerializer
+    pagination_class = CustomPagination
+    authentication_classes = [OAuth2Authentication, SessionAuthentication]
+    permission_classes = [Or(IsAdminUser, TokenHasReadWriteScope)]
+    filter_backends = (
+        filters.SearchFilter,
+        filters.OrderingFilter,
+        django_filters.rest_framework.DjangoFilterBackend
+    )
+    filterset_fields = ['organization', 'team', 'period_start', 'period_end', 'generation']
+    search_fields = ['organization', 'team']
+    ordering_fields = ['period_start', 'period_end', 'team', 'people']
+    ordering = ["organization", "team", "period_start"]
+
+
 class IssueView(ViewSet):
 
     authentication_classes = [OAuth2Authentication, SessionAuthentication]
@@ -125,4 +150,20 @@ class IssueView(ViewSet):
                 return Response({"error": "Issue not found."}, status=status.HTTP_404_NOT_FOUND)
             return Response({"data": issue}, status=status.HTTP_200_OK)
         finally:
-            repo.close()
\ No newline at end of file
+            repo.close()
+
+
+class PropertyView(ViewSet):
+    """Full text of a node property offloaded to the property store (``<field>_ref`` on the node)."""
+
+    authentication_classes = [OAuth2Authentication, SessionAuthentication]
+    permission_classes = [Or(IsAdminUser, TokenHasReadWriteScope)]
+
+    def retrieve(self, request, pk=None):
+        try:
+            text = PropertyStore(settings.PROPERTY_STORE_DIR).get(pk)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if text is None:
+            return Response({"error": "Property not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"data": {"ref": pk, "size": len(text), "text": text}}, status=status.HTTP_200_OK)
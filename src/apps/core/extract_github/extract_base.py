@@ -13,6 +13,8 @@ from py2neo import Node, Relationship
 
 from .sink_neo4j import SinkNeo4j
 from .logging_config import LoggerFactory
+from .property_store import PropertyStore
+from .property_schema import PROPERTY_SCHEMA, node_properties
 from airbyte.caches import PostgresCache
 
 logger = LoggerFactory.get_logger("extractor")
@@ -30,6 +32,7 @@ class ExtractBase(ABC):
     cache: Any = None  # Local cache managed by Airbyte (DuckDB)
     source: Any = None  # Data source connector (Airbyte)
     sink: Any = None  # Data sink, in this case Neo4j (via SinkNeo4j)
+    property_store: PropertyStore = None  # Side store of large text properties
     start_date: datetime = None  # Start date for data extraction
 
     organization:str = None #Organization
@@ -50,6 +53,8 @@ class ExtractBase(ABC):
 
         logger.info(f"ExtractBase initialized with organization={self.organization}, repository={self.repository}, streams={self.streams}, token_length={token_len}")
 
+        self.property_store = PropertyStore()
+
         # Initialize the Neo4j sink
         try:
             self.sink = SinkNeo4j()
@@ -152,7 +157,10 @@ class ExtractBase(ABC):
                 items.append((new_key, v))
         return dict(items)        
 
-    def data_clean (self, data: Any) -> Any:
+    def data_clean (self, data: Any, label: str = None) -> Any:
+        # Labels com schema guardam só as propriedades declaradas em property_schema.py
+        if label in PROPERTY_SCHEMA:
+            return node_properties(label, data)
         clean = {}
         for k, v in data.items():
             if isinstance(v, dict):
@@ -178,15 +186,17 @@ class ExtractBase(ABC):
             return v
 
 
-    def transform(self, value: Any) -> Any:
+    def transform(self, value: Any, label: str = None) -> Any:
         """Transform a record from Airbyte into a clean dictionary.
 
         Removes auxiliary fields (starting with "_airbyte")
-        and converts NaN values to None.
+        and converts NaN values to None. With a ``label`` that has a
+        property schema, only the properties it declares are kept.
 
         Args:
         ----
             value (Any): A single record object.
+            label (str): SEON label of the node the record becomes.
 
         Returns:
         -------
@@ -200,7 +210,7 @@ class ExtractBase(ABC):
             if not k.startswith("_airbyte")  # Remove metadata fields
         }
 
-        clean = self.data_clean(data)
+        clean = self.data_clean(data, label)
         logger.debug(f"Transformed record: {clean}")
         
         return clean
@@ -360,7 +370,8 @@ class ExtractBase(ABC):
         """
         logger.info(f"Create node '{node_type}' with field '{id_field}': {data}")
         data["created_node_at"] = datetime.now().isoformat()
-        node = Node(node_type, **data)
+        # Textos grandes (corpo, mensagem, patch) vão para o property store; o nó guarda uma prévia
+        node = Node(node_type, **self.property_store.offload(data, keep=(id_field,)))
         try:
             self.sink.save_node(node, node_type.strip().lower(), id_field)
             logger.info(
@@ -2,62 +2,25 @@ import datetime
 from typing import Any  # noqa: I001
 from .extract_base import ExtractBase  # noqa: I001
 from .logging_config import LoggerFactory  # noqa: I001
+from .person_resolver import PersonResolver  # noqa: I001
 import json  # noqa: I001
 from apps.core.extract_github.seon_concepts_dictionary import SOURCEREPOSITORY, PROJECT, PERSON, BRANCH, COMMIT, HAS, PRESENT_IN, CREATED_BY, COMMITTED_BY, IN, IS_PARENT, HAS_PARENT
-from github import Github, Repository, Commit as GitCommit  # noqa: I001
-from celery import shared_task
-from py2neo import Graph  # noqa: I001
-import os  # noqa: I001
-
-@shared_task(autoretry_for=(Exception,), retry_backoff=True)
-def process_commit(sha: str, repository: str, secret: str) -> None:
-    """Fetch files of a given commit from GitHub and create artifacts in Neo4j."""
-    try:
-        
-        logger = LoggerFactory.get_logger(__name__)
-        github = Github(secret)
-        repo: Repository.Repository = github.get_repo(repository)
-        commit_git: GitCommit.Commit = repo.get_commit(sha)
-        commit_id = f"{sha}-{repository}"
-
-        sink = Graph(
-            "bolt://neo4j:7687",
-            auth=(os.getenv("NEO4J_USERNAME", ""), os.getenv("NEO4J_PASSWORD", "")),
-        )
-
-        commit_node = sink.get_node("Commit", id=commit_id)
-        if not commit_node:
-            logger.warning(f"❌ Commit not found in Neo4j: {commit_id}")
-            return
-
-        for file in commit_git.files:
-            if file.sha:
-                data = {
-                    "id": file.sha,
-                    "filename": file.filename,
-                    "status": file.status,
-                    "additions": file.additions,
-                    "deletions": file.deletions,
-                    "changes": file.changes,
-                    "patch": getattr(file, "patch", None),
-                    "raw_url": file.raw_url,
-                    "blob_url": file.blob_url,
-                    "sha": file.sha,
-                }
-
-                file_node = sink.create_node(data, "softwareartifact", "id")
-                sink.create_relationship(commit_node, "has", file_node)
-                sink.create_relationship(file_node, "commited", commit_node)
-
-                logger.info(f"✅ Processed: file {file.sha} | {sha}")
-
-        logger.info(f"✅ Processed: Commit {sha} | {repository}")
-
-    except Exception as e:
-        logger.error(f"⚠️ Error processing {sha} | {repository}: {e}")
 
+BATCH_SIZE = 5000
 
+# Pais que não são deste lote: quais já estão no grafo
+QUERY_KNOWN_COMMITS = f"""
+UNWIND $ids AS id
+MATCH (c:{COMMIT} {{id: id}})
+RETURN c.id AS id
+"""
 
+QUERY_IS_PARENT = f"""
+UNWIND $pairs AS pair
+MATCH (parent:{COMMIT} {{id: pair.parent}})
+MATCH (child:{COMMIT} {{id: pair.child}})
+MERGE (parent)-[:{IS_PARENT}]->(child)
+"""
 
 class ExtractCMPO(ExtractBase):
     """Extracts CMPO data and stores it in Neo4j."""
@@ -102,7 +65,7 @@ class ExtractCMPO(ExtractBase):
         """Load Source Code."""
         self.logger.info("Loading Source Code...")
         for repository in self.repositories.itertuples():
-            data = self.transform(repository)
+            data = self.transform(repository, SOURCEREPOSITORY)
             self.logger.debug("Source Code transformed: %s", data)
             node = self.create_node(data, SOURCEREPOSITORY, "id")
             self.create_relationship(self.organization_node, HAS, node)
@@ -130,16 +93,6 @@ class ExtractCMPO(ExtractBase):
                     project.repository,
                 )
 
-    def flatten_dict(self, d: Any, prefix: Any) -> Any:
-        """Flatten a nested dictionary, prefixing keys with their parent path."""
-        flat = {}
-        for k, v in d.items():
-            if isinstance(v, dict):
-                flat.update(self.flatten_dict(v, prefix + k + "_"))
-            else:
-                flat[prefix + k] = v
-        return flat
-
     def parse_json_from_db(self, raw_json):
         """
         Parse safely a JSON field from the database, which may be:
@@ -151,6 +104,8 @@ class ExtractCMPO(ExtractBase):
             return [raw_json]  # retorna como lista, se for um único dict
         elif isinstance(raw_json, list):
             return raw_json
+        elif hasattr(raw_json, "tolist"):  # array numpy vindo do pandas
+            return raw_json.tolist()
         elif isinstance(raw_json, str):
             try:
                 return json.loads(raw_json.strip())
@@ -164,20 +119,13 @@ class ExtractCMPO(ExtractBase):
     def __load_commits(self) -> None:
         """Load commits."""
         self.logger.info("Loading commits...")
+        people = PersonResolver(self.sink.graph, self.organization)
         for commit in self.commits.itertuples(index=False):
-            data = self.transform(commit)
-            data["id"] = data["sha"]
+            # O schema do commit já traz os campos de ``commit.commit`` (mensagem, autor, datas)
+            data = self.transform(commit, COMMIT)
             self.logger.debug("Commit transformed: %s", data["id"])
 
-            try:
-               combined = {**data, **commit.commit}
-                
-            except Exception as e:
-                self.logger.warning(f"Invalid commit JSON for {commit.sha}: {e}")
-                continue
-
-            node_data = {**data, **self.flatten_dict(combined, "")}
-            node = self.create_node(node_data, COMMIT, "id")
+            node = self.create_node(data, COMMIT, "id")
 
             repository_node = self.get_node(SOURCEREPOSITORY, full_name=commit.repository)
 
@@ -190,50 +138,10 @@ class ExtractCMPO(ExtractBase):
                     commit.repository
                 )
             
-            # Author
-            if commit.author:
-                author = commit.author
-                login = author["login"]
-                user_node = self.get_node(PERSON, id=login)
-                
-                if user_node:
-                    self.create_relationship(node, CREATED_BY, user_node)
-                    self.logger.debug(
-                        f"Linked author {login} to commit {commit.sha}"
-                    )
-                else:
-                    self.logger.warning(f"Author not found: {login}")
-                    author["id"] = login
-                    author["name"] = login
-
-                    person_node = self.create_node(author, PERSON, "id")
-                    self.create_relationship(person_node, PRESENT_IN, self.organization_node)
-                    self.create_relationship(node, CREATED_BY, person_node)
-                    self.logger.info(
-                        f"Linked author {login} to commit {commit.sha}"
-                    )
-            
-            # Committer
-            if commit.committer:
-                committer = commit.committer
-                login = committer["login"]
-                user_node = self.get_node(PERSON, id=login)
-                if user_node:
-                    self.create_relationship(node, COMMITTED_BY, user_node)
-                    self.logger.debug(
-                        f"Linked committer {login} to commit {commit.sha}"
-                    )
-                else:
-                    self.logger.warning(f"Committer not found: {login}")
-                    committer["id "]= login
-                    committer["name"] = login
+            # Autor e committer: resolvidos e ligados em lote por PersonResolver
+            people.add_link(COMMIT, data["id"], CREATED_BY, commit.author)
+            people.add_link(COMMIT, data["id"], COMMITTED_BY, commit.committer)
 
-                    person_node = self.create_node(committer, PERSON, "id")
-                    self.create_relationship(person_node, PRESENT_IN, self.organization_node)
-                    self.create_relationship(node, COMMITTED_BY, person_node)
-                    self.logger.info(
-                        f"Linked committer {login} to commit {commit.sha}"
-                    )
             # Branch
             branch_id = commit.branch + "-" + commit.repository
             branch_node = self.get_node(BRANCH, id=branch_id)
@@ -244,36 +152,45 @@ class ExtractCMPO(ExtractBase):
             else:
                 self.logger.warning(f"Branch not found: {branch_id}")
             
-            ## Busca os arquivos do commit e cria os SoftwareArtifact
-            # process_commit.delay(sha=commit.sha, repository=commit.repository, secret=self.secret)
-            
+            ## Os arquivos do commit (SoftwareArtifact) são extraídos depois, em lote,
+            ## por ExtractCMPOSoftwareArtifact (task retrieve_github_software_artifacts)
+
+        people.flush()
+        self.logger.info(f"{people.linked} authors and committers linked, {people.created} people created")
 
     def __create_relation_commits(self) -> None:
-        
-        """Create parent relationships between commits."""
+        """Create parent relationships between commits.
+
+        Parents loaded in this batch are known from the SHAs in memory; the
+        others are looked up in the graph at once, and the edges are written
+        with batched ``UNWIND`` statements.
+        """
         self.logger.info("Creating parent relationships between commits...")
-        for commit in self.commits.itertuples(index=False):
-            parents = commit.parents
-            
-            for parent in parents:
-                commit_node = self.get_node(COMMIT, id=commit.sha)
-                parent_node = self.get_node(COMMIT, id=parent["sha"])
-                if commit_node and parent_node:
-                    self.create_relationship(parent_node, IS_PARENT, commit_node)
-                    #self.create_relationship(commit_node, HAS_PARENT, parent_node)
-                    self.logger.debug(f"Linked {parent['sha']} -> {commit.sha}")
-                else:
-                    self.logger.info(
-                        "Missing node for parent-child relation: %s ->  %s",
-                        parent["sha"],
-                        commit.sha,
-                    )
-                
+        known = set(self.commits["sha"])
+        pairs = [
+            {"parent": parent["sha"], "child": commit.sha}
+            for commit in self.commits.itertuples(index=False)
+            for parent in self.parse_json_from_db(commit.parents)
+        ]
+
+        others = list({pair["parent"] for pair in pairs} - known)
+        for inicio in range(0, len(others), BATCH_SIZE):
+            found = self.sink.graph.run(QUERY_KNOWN_COMMITS, ids=others[inicio:inicio + BATCH_SIZE]).data()
+            known.update(row["id"] for row in found)
+
+        linked = [pair for pair in pairs if pair["parent"] in known]
+        for inicio in range(0, len(linked), BATCH_SIZE):
+            self.sink.graph.run(QUERY_IS_PARENT, pairs=linked[inicio:inicio + BATCH_SIZE])
+
+        self.logger.info(
+            f"{len(linked)} parent relationships created, {len(pairs) - len(linked)} parents not in the graph"
+        )
+
     def __load_branchs(self) -> None:
         """Load branches."""
         self.logger.info("Loading branches...")
         for branch in self.branches.itertuples(index=False):
-            data = self.transform(branch)
+            data = self.transform(branch, BRANCH)
             data["id"] = data["name"] + "-" + data["repository"]
             self.logger.debug("Branch transformed: %s", data["id"])
 
@@ -1,98 +1,268 @@
+import asyncio
+import os
 from datetime import datetime
 from typing import Any  # noqa: I001
-from src.extract.extract_base import ExtractBase  # noqa: I001
-from github import Github, Repository, Commit as GitCommit  # noqa: I001
-import os  # noqa: I001
-from concurrent.futures import ThreadPoolExecutor, as_completed  # noqa: I001
-from py2neo import Graph  # noqa: I001
 
+import httpx  # noqa: I001
 
+from .extract_base import ExtractBase  # noqa: I001
+from .http_cache import CachedResponse, ResponseCache  # noqa: I001
+from .logging_config import LoggerFactory  # noqa: I001
+from .property_store import PropertyStore  # noqa: I001
+from .rate_limit import LOW, RateLimiter, limiter_for  # noqa: I001
+from apps.core.extract_github.seon_concepts_dictionary import COMMIT, HAS
 
+SOFTWAREARTIFACT = "softwareartifact"
+COMMITED = "commited"
 
-class ExtractCMPOSoftwareArtifact():
-    """Extractor for CMPO Software Artifact."""
+GITHUB_API = "https://api.github.com"
+CONCURRENCY = int(os.getenv("GITHUB_CONCURRENCY", "8"))
+BATCH_SIZE = 500
+MAX_ATTEMPTS = 5
 
-    def __init__(self, organization:str, secret:str, repository:str, start_date:datetime=None) -> None:
-        """Initialize the extractor and define streams to load from Airbyte."""
-        super().__init__(organization=organization, secret=secret, repository=repository, start_date=start_date)            
-        self.graph = Graph(
-            "bolt://neo4j:7687",
-            auth=(os.getenv("NEO4J_USERNAME", ""), os.getenv("NEO4J_PASSWORD", "")),
+# Commits que ainda não tiveram os arquivos extraídos (nem por execuções antigas)
+QUERY_PENDING = f"""
+MATCH (c:{COMMIT})
+WHERE c.artifacts_extracted_at IS NULL
+  AND NOT (c)-[:{HAS}]->(:{SOFTWAREARTIFACT})
+  AND ($repository IS NULL OR c.repository = $repository)
+  AND ($prefix IS NULL OR c.repository STARTS WITH $prefix)
+RETURN c.sha AS sha, c.repository AS repository
+"""
+
+QUERY_ARTIFACTS = f"""
+UNWIND $rows AS row
+MATCH (c:{COMMIT} {{id: row.commit}})
+MERGE (f:{SOFTWAREARTIFACT} {{id: row.file.id}})
+SET f += row.file, f.created_node_at = $now
+MERGE (c)-[:{HAS}]->(f)
+MERGE (f)-[:{COMMITED}]->(c)
+"""
+
+QUERY_DONE = f"""
+UNWIND $commits AS id
+MATCH (c:{COMMIT} {{id: id}})
+SET c.artifacts_extracted_at = $now
+"""
+
+
+class GitHubCommitFetcher:
+    """Fetch the files of commits from the GitHub REST API with bounded concurrency.
+
+    One HTTP client (and connection pool) is shared by every request, and each
+    repository is resolved once and reused by all of its commits. Requests
+    are paced by the token's :class:`~.rate_limit.RateLimiter`, shared with
+    the other workers; a rate-limited request waits and is retried. With a
+    :class:`~.http_cache.ResponseCache`, commits already downloaded are read
+    from disk and other responses are revalidated (a ``304`` is free).
+
+    Args:
+    ----
+        token (str): GitHub token.
+        concurrency (int): Requests in flight at the same time.
+        client (httpx.AsyncClient): Client to use instead of a new one (e.g. in tests).
+        limiter (RateLimiter): Pacing of the token (default: :func:`~.rate_limit.limiter_for`).
+        priority (int): Priority of these requests in the limiter; a backfill is ``LOW``.
+        cache (ResponseCache): Persistent response cache, or None to always download.
+
+    """
+
+    def __init__(self, token: str, concurrency: int = CONCURRENCY, client: httpx.AsyncClient | None = None,
+                 limiter: RateLimiter | None = None, priority: int = LOW, cache: ResponseCache | None = None) -> None:
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        self.client = client or httpx.AsyncClient(
+            base_url=GITHUB_API,
+            headers={"Authorization": f"Bearer {token}", "Accept": "application/vnd.github+json"},
+            timeout=30.0,
         )
-        self.token = secret
-        self.github = Github(self.token)
-        self.commits = self._load_commits()
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = limiter or limiter_for(token)
+        self.priority = priority
+        self.cache = cache
+        self.repositories: dict[str, asyncio.Task] = {}
+
+    def _cached(self, entry: CachedResponse, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(entry.status, headers=entry.headers, content=entry.content, request=request)
+
+    async def _get(self, url: str, **params: Any) -> httpx.Response:
+        key = self.cache.key(url, params) if self.cache else None
+        entry = self.cache.get(key) if self.cache else None
+        if entry is not None and entry.immutable:
+            self.cache.hits += 1
+            return self._cached(entry, self.client.build_request("GET", url, params=params or None))
+
+        for _ in range(MAX_ATTEMPTS):
+            await self.limiter.acquire_async(self.priority)
+            async with self.semaphore:
+                response = await self.client.get(
+                    url, params=params or None, headers=entry.validators() if entry else None
+                )
+            # O limitador bloqueia o token até o fim da espera; a próxima volta aguarda nele
+            if not self.limiter.observe(response.status_code, response.headers, response.content):
+                break
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.not_modified += 1
+            return self._cached(entry, response.request)
+        response.raise_for_status()
+        if self.cache:
+            await asyncio.to_thread(self.cache.put, key, url, response.status_code, response.headers, response.content)
+        return response
+
+    async def repository(self, full_name: str) -> dict:
+        """Repository metadata, requested once per repository."""
+        if full_name not in self.repositories:
+            self.repositories[full_name] = asyncio.ensure_future(self._get(f"/repos/{full_name}"))
+        response = await self.repositories[full_name]
+        return response.json()
+
+    async def commit_files(self, repository: str, sha: str) -> list[dict]:
+        """Changed files of a commit, following the pagination of large commits."""
+        repo = await self.repository(repository)
+        url, params, files = f"/repos/{repo['full_name']}/commits/{sha}", {"per_page": 100}, []
+        while url:
+            response = await self._get(url, **params)
+            files.extend(response.json().get("files", []))
+            url, params = response.links.get("next", {}).get("url"), {}
+        return files
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def artifact_data(file: dict) -> dict:
+    """Properties of the ``softwareartifact`` node of a changed file."""
+    return {
+        "id": file["sha"],
+        "filename": file.get("filename"),
+        "status": file.get("status"),
+        "additions": file.get("additions"),
+        "deletions": file.get("deletions"),
+        "changes": file.get("changes"),
+        "patch": file.get("patch"),
+        "raw_url": file.get("raw_url"),
+        "blob_url": file.get("blob_url"),
+        "sha": file["sha"],
+    }
+
+
+class ArtifactWriter:
+    """Write software artifacts and their commit relationships in batched ``UNWIND`` statements.
+
+    Args:
+    ----
+        graph: py2neo ``Graph``.
+        batch_size (int): Files per statement.
+        store (PropertyStore): Where large patches are offloaded, or None to keep them on the node.
+
+    """
+
+    def __init__(self, graph: Any, batch_size: int = BATCH_SIZE, store: PropertyStore | None = None) -> None:
+        self.graph = graph
+        self.batch_size = batch_size
+        self.store = store
+        self.rows: list[dict] = []
+        self.commits: list[str] = []
+        self.written = 0
+
+    def add(self, commit_id: str, files: list[dict]) -> bool:
+        """Buffer the files of a commit; True when a batch is ready to :meth:`flush`."""
+        for f in files:
+            if f.get("sha"):
+                data = artifact_data(f)
+                self.rows.append({"commit": commit_id, "file": self.store.offload(data) if self.store else data})
+        self.commits.append(commit_id)
+        return len(self.rows) >= self.batch_size or len(self.commits) >= self.batch_size
+
+    def flush(self) -> None:
+        """Write the buffered files, then mark their commits as extracted."""
+        now = datetime.now().isoformat()
+        for inicio in range(0, len(self.rows), self.batch_size):
+            self.graph.run(QUERY_ARTIFACTS, rows=self.rows[inicio:inicio + self.batch_size], now=now)
+        # Só depois dos arquivos: um commit marcado tem todos os seus arquivos gravados
+        if self.commits:
+            self.graph.run(QUERY_DONE, commits=self.commits, now=now)
+        self.written += len(self.rows)
+        self.rows, self.commits = [], []
+
+
+class ExtractCMPOSoftwareArtifact(ExtractBase):
+    """Extract the files changed by each commit as CMPO software artifacts.
+
+    GitHub is read asynchronously (``concurrency`` requests at a time) and
+    the results go through a queue to a single writer that stores them in
+    batches. Commits already extracted are skipped, so re-runs only fetch
+    new commits.
+    """
+
+    def __init__(self, organization:str, secret:str, repository:str, start_date:datetime=None,
+                 concurrency:int=CONCURRENCY, batch_size:int=BATCH_SIZE) -> None:
+        """Initialize the extractor; no Airbyte streams are needed."""
+        self.logger = LoggerFactory.get_logger(__name__)
+        super().__init__(organization=organization, secret=secret, repository=repository, streams=[], start_date=start_date)
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.response_cache = ResponseCache()
 
     def fetch_data(self) -> None:
-        """Retrive data."""
-        pass
-
-    def _load_commits(
-        self,
-    ) -> Any:  # TODO: pegar sempre a data corrente ou da ultima importacao
-        """Load all commits with associated repository names from Neo4j."""
-        query = """
-        MATCH (c:Commit)
-        RETURN c.sha AS sha, c.repository AS repository
-        """
-        return self.graph.run(query).data()
-
-    def process_commit(self, sha: str, repository: str) -> None:
-        """Fetch files of a given commit from GitHub and create artifacts in Neo4j."""
-        try:
-            repo: Repository.Repository = self.github.get_repo(repository)
-            commit_git: GitCommit.Commit = repo.get_commit(sha)
-            commit_id = f"{sha}-{repository}"
-
-            commit_node = self.get_node("Commit", id=commit_id)
-            if not commit_node:
-                print(f"❌ Commit not found in Neo4j: {commit_id}")
-                return
-
-            for file in commit_git.files:
-                if file.sha:
-                    data = {
-                        "id": file.sha,
-                        "filename": file.filename,
-                        "status": file.status,
-                        "additions": file.additions,
-                        "deletions": file.deletions,
-                        "changes": file.changes,
-                        "patch": getattr(file, "patch", None),
-                        "raw_url": file.raw_url,
-                        "blob_url": file.blob_url,
-                        "sha": file.sha,
-                    }
-
-                    file_node = self.create_node(data, "SoftwareArtifact", "id")
-                    self.create_relationship(commit_node, "has", file_node)
-                    self.create_relationship(file_node, "commited", commit_node)
-
-                    print(f"✅ Processed: file {file.sha} | {sha}")
-
-            print(f"✅ Processed: Commit {sha} | {repository}")
+        """Commits still without software artifacts (of ``repository``, which may be ``org/*``)."""
+        repository = self.repository or None
+        prefix = repository[:-1] if repository and repository.endswith("*") else None
+        self.commits = self.sink.graph.run(
+            QUERY_PENDING, repository=None if prefix is not None else repository, prefix=prefix
+        ).data()
+        self.logger.info(f"{len(self.commits)} commits without software artifacts")
 
+    async def _fetch(self, fetcher: GitHubCommitFetcher, commit: dict, queue: asyncio.Queue) -> None:
+        try:
+            files = await fetcher.commit_files(commit["repository"], commit["sha"])
         except Exception as e:
-            print(f"⚠️ Error processing {sha} | {repository}: {e}")
-
-    def process_all(self, max_workers: int = 8) -> None:
-        """Run all commit processing jobs in parallel using threads."""
-        print(f"🚀 Processing {len(self.commits)} commits with {max_workers} threads")
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [
-                executor.submit(self.process_commit, row["sha"], row["repository"])
-                for row in self.commits
-            ]
-            for _ in as_completed(futures):
-                pass  # Log handled inside each thread
+            # Não marca o commit: ele volta na próxima execução
+            self.logger.error(f"⚠️ Error fetching {commit['sha']} | {commit['repository']}: {e}")
+            return
+        await queue.put((commit["sha"], files))
 
-    def run(self) -> None:
-        """Orchestrates the full data extraction process for CMPO.
+    async def _write(self, writer: ArtifactWriter, queue: asyncio.Queue) -> None:
+        while (item := await queue.get()) is not None:
+            sha, files = item
+            if writer.add(sha, files):
+                await asyncio.to_thread(writer.flush)
+        await asyncio.to_thread(writer.flush)
+
+    async def extract(self, commits: list[dict]) -> int:
+        """Fetch and store the files of ``commits``; returns the number of files written."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.batch_size)
+        writer = ArtifactWriter(self.sink.graph, self.batch_size, self.property_store)
+        fetcher = GitHubCommitFetcher(self.token, self.concurrency, cache=self.response_cache)
+        pendentes = iter(commits)
 
-        Loads repositories, projects, branches, and commits, and
-        creates the corresponding nodes and relationships in the Neo4j graph.
-        """
-        print("🔄 Extracting software artifacts using CMPO...")
+        async def worker() -> None:
+            for commit in pendentes:
+                await self._fetch(fetcher, commit, queue)
 
-        self.process_all()
-        print("✅ Extraction completed successfully!")
+        consumer = asyncio.create_task(self._write(writer, queue))
+        producers = asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        try:
+            await asyncio.wait({producers, consumer}, return_when=asyncio.FIRST_COMPLETED)
+            if consumer.done():
+                # O escritor só termina antes dos produtores se falhar
+                producers.cancel()
+                consumer.result()
+            await producers
+            await queue.put(None)
+            await consumer
+        finally:
+            await fetcher.aclose()
+        return writer.written
+
+    def run(self) -> None:
+        """Extract the software artifacts of the commits not processed yet."""
+        self.logger.info("🔄 Extracting software artifacts using CMPO...")
+        self.fetch_data()
+        written = asyncio.run(self.extract(self.commits))
+        self.logger.info(f"✅ {written} software artifacts from {len(self.commits)} commits")
+        self.logger.info(
+            f"GitHub cache: {self.response_cache.hits} from disk, {self.response_cache.not_modified} not modified, "
+            f"{self.response_cache.stored} stored"
+        )
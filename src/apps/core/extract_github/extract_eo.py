@@ -43,7 +43,7 @@ class ExtractEO(ExtractBase):
         """Create project nodes and relationships to the organization in Neo4j."""
         self.logger.info("Creating Project nodes and relationships...")
         for project in self.projects.itertuples():
-            data = self.transform(project)
+            data = self.transform(project, PROJECT)
             project_node = self.create_node(data, PROJECT, "id")
             self.create_relationship(self.organization_node, HAS, project_node)
 
@@ -51,7 +51,7 @@ class ExtractEO(ExtractBase):
         """Create Person and TeamMember and links them to teams and the organization."""
         self.logger.info("Creating TeamMember and Person nodes...")
         for member in self.team_members.itertuples():
-            data = self.transform(member)
+            data = self.transform(member, PERSON)
             data["id"] = member.login
             data["name"] = member.login
 
@@ -59,6 +59,7 @@ class ExtractEO(ExtractBase):
             self.create_relationship(person_node, PRESENT_IN, self.organization_node)
 
             if member.team_slug:
+                data = self.transform(member, TEAM_MEMBER)
                 data["id"] = f"{member.login}-{member.team_slug}"
                 data["name"] = member.login
 
@@ -74,7 +75,7 @@ class ExtractEO(ExtractBase):
         """Create Team nodes and links them to the organization."""
         self.logger.info("Creating Team nodes and relationships...")
         for team in self.teams.itertuples():
-            data = self.transform(team)
+            data = self.transform(team, TEAM)
             team_node = self.create_node(data, TEAM, "id")
             self.logger.info("🔄 Creating Team... %s", team.name)
             self.create_relationship(self.organization_node, HAS, team_node)
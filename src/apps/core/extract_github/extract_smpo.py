@@ -38,7 +38,7 @@ class ExtractSMPO(ExtractBase):
         """Create Milestone nodes and link them to their respective repositories."""
         self.logger.info("Loading milestones...")
         for milestone in self.milestones.itertuples(index=False):
-            data = self.transform(milestone)
+            data = self.transform(milestone, MILESTONE)
             self.logger.debug("Milestone transformed: %s", data)
 
             milestone_node = self.create_node(data, MILESTONE, "id")
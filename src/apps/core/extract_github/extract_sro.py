@@ -3,9 +3,29 @@ from .extract_base import ExtractBase  # noqa: I001
 from typing import Any  # noqa: I001
 from py2neo import Node  # noqa: I001
 from .logging_config import LoggerFactory  # noqa: I001
+from .person_resolver import PersonResolver  # noqa: I001
+from .reference_resolver import HAS_MILESTONE, IN_MILESTONE, LABELED_WITH, PART_OF_PULL_REQUEST, ReferenceResolver  # noqa: I001
 import json  # noqa: I001
 from apps.core.extract_github.seon_concepts_dictionary import PULLREQUEST, DEVELOPMENTTASK, CREATED_BY, LABEL, MILESTONE, PULLREQUEST, PERSON, COMMIT,SOURCEREPOSITORY, HAS, PRESENT_IN, LABELED, MERGED, MERGED_INTO, COMMITTED_IN, REVIEWED_BY, ASSIGNED_TO, PART_OF # noqa: I001
 
+# Pull requests citados por issues mas não extraídos: ficam marcados com problem=true
+QUERY_PULL_REQUEST_PLACEHOLDERS = f"""
+UNWIND $rows AS row
+MERGE (p:{PULLREQUEST} {{id: row.id}})
+ON CREATE SET p += row, p.created_node_at = $now
+"""
+
+BATCH_SIZE = 5000
+
+# Liga commits a PRs no servidor; devolve quantas triplas não acharam commit ou PR
+QUERY_PULL_REQUEST_COMMITS = f"""
+UNWIND $rows AS row
+OPTIONAL MATCH (c:{COMMIT} {{id: row.sha}})
+OPTIONAL MATCH (p:{PULLREQUEST} {{repository: row.repository, number: row.pull_number}})
+FOREACH (_ IN CASE WHEN c IS NULL OR p IS NULL THEN [] ELSE [1] END | MERGE (c)-[:{COMMITTED_IN}]->(p))
+RETURN sum(CASE WHEN c IS NULL OR p IS NULL THEN 1 ELSE 0 END) AS unmatched
+"""
+
 class ExtractSRO(ExtractBase):
     """Extract and persist data for the SRO dataset using Airbyte and Neo4j."""
 
@@ -15,6 +35,9 @@ class ExtractSRO(ExtractBase):
     pull_requests: Any = None
     issue_labels: Any = None
     projects: Any = None
+    people: PersonResolver = None
+    references: ReferenceResolver = None
+    pull_request_refs: dict = None
 
     def __init__(self, organization:str, secret:str, repository:str,start_date:datetime=None) -> None:
         """Initialize the extractor and define streams to load from Airbyte."""
@@ -55,8 +78,11 @@ class ExtractSRO(ExtractBase):
     def __load_issue(self) -> None:
         """Create Issue nodes and link."""
         self.logger.info("Loading issues...")
+        self.people = PersonResolver(self.sink.graph, self.organization)
+        self.references = ReferenceResolver(self.sink.graph)
+        self.pull_request_refs = {}
         for issue in self.issues.itertuples(index=False):
-            data = self.transform(issue)
+            data = self.transform(issue, DEVELOPMENTTASK)
             self.logger.debug("Issue transformed: %s", data)
 
             node = self._create_issue_node(data, issue)
@@ -65,33 +91,38 @@ class ExtractSRO(ExtractBase):
             self._link_issue_to_users(node, issue)
             self._link_issue_to_labels(node, issue)
             self._link_issue_to_pull_request(node,issue)
-    
+
+        self.people.flush()
+        self.logger.info(f"{self.people.linked} people linked, {self.people.created} people created")
+        self.references.flush()
+        self._report_missing_references()
+        self._create_pull_request_placeholders(self.references.missing[PART_OF_PULL_REQUEST])
+
+    def _report_missing_references(self) -> None:
+        """Log once how many referenced labels, milestones and pull requests were not found."""
+        self.logger.info(f"{self.references.linked} labels, milestones and pull requests linked")
+        for reference, values in self.references.missing.items():
+            if values:
+                self.logger.warning(f"{len(values)} {reference.label} not found by {reference.key}")
+
+    def _create_pull_request_placeholders(self, urls: set) -> None:
+        """Create the pull requests referenced by issues but not extracted, flagged with ``problem``."""
+        ## TODO .. fazer uma chamada de API para buscar o pull request
+        rows = []
+        for url in urls:
+            pullrequest = {k: v for k, v in self.pull_request_refs[url].items() if v is not None}
+            rows.append({**pullrequest, "id": url, "problem": True})
+        now = datetime.now().isoformat()
+        for inicio in range(0, len(rows), self.references.batch_size):
+            self.sink.graph.run(QUERY_PULL_REQUEST_PLACEHOLDERS, rows=rows[inicio:inicio + self.references.batch_size], now=now)
+
     def _link_issue_to_pull_request(self, node: Node, issue: Any) -> None:
-        """create a link bettween issue and pullrquest"""
+        """Register the link between the Issue and its Pull Request, resolved in bulk."""
         pullrequest = issue.pull_request
         if pullrequest:
-            pull_request_node = self.get_node(PULLREQUEST, url=pullrequest["url"])
-
-            if pull_request_node:
+            self.pull_request_refs[pullrequest["url"]] = pullrequest
+            self.references.add(DEVELOPMENTTASK, node["id"], PART_OF_PULL_REQUEST, pullrequest["url"])
 
-                url = pullrequest["url"]
-                self.logger.debug(
-                        f"Processing ({url} pull request for issue: {issue.title}"
-                    )
-                
-                self.create_relationship(pull_request_node, HAS, node)
-               # self.create_relationship(node, PART_OF, pull_request_node)
-                self.logger.info(
-                        f"Linked Issue to Pull Request: {issue.title} - {url}"
-                    )
-            else:
-                ## TODO .. fazer uma chamada de API para buscar o pull request
-                pullrequest["id"] =  pullrequest["url"]
-                pullrequest["problem"] =  True
-                pull_request_node = self.create_node(pullrequest, PULLREQUEST, "id")
-                self.logger.warning(f"Pull Request not found for issue: {issue.title}")
-
-        
     def _create_issue_node(self, data: dict[str, Any], issue: Any) -> Node:
         """Create the Issue node in Neo4j."""
         self.logger.debug("Creating Issue node...")
@@ -111,116 +142,70 @@ class ExtractSRO(ExtractBase):
             self.logger.warning(f"Repository not found for issue: {issue.title}")
 
     def _link_issue_to_milestone(self, node: Node, issue: Any) -> None:
-        """Link the Issue to its Milestone, if any."""
+        """Register the link of the Issue to its Milestone, if any."""
         if issue.milestone:
-            self.logger.debug(f"Linking Issue to Milestone: {issue.title}")
-            milestone = issue.milestone
-            milestone_id = milestone["id"]
-            milestone_node = self.get_node(MILESTONE, id=milestone_id)
-            if milestone_node:
-                self.create_relationship(milestone_node, HAS, node)
-                self.logger.info(
-                    f"Linked Milestone to Issue: {issue.title} - {milestone_id}"
-                )
-            else:
-                self.logger.warning(f"Milestone not found for issue: {issue.title}")
+            self.references.add(DEVELOPMENTTASK, node["id"], IN_MILESTONE, issue.milestone["id"])
 
-    def _link_issue_to_users(self, node: Node, issue: Any) -> None:
-        """Link the Issue to its creator and assignees."""
-        if issue.user:
-            self._create_user_relationship(node, issue.user, CREATED_BY, issue.title)
+    def _link_issue_to_users(self, node: Node, issue: Any, label: str = DEVELOPMENTTASK) -> None:
+        """Register the links of the Issue (or Pull Request) to its creator and assignees.
 
-        if issue.assignee:
-            self._create_user_relationship(
-                node, issue.assignee, ASSIGNED_TO, issue.title
-            )
+        People are resolved, created when missing and linked in bulk by
+        ``self.people`` (see :class:`~.person_resolver.PersonResolver`).
+        """
+        self.people.add_link(label, node["id"], CREATED_BY, issue.user)
+        self.people.add_link(label, node["id"], ASSIGNED_TO, issue.assignee)
 
         if issue.assignees:
-            assignees = issue.assignees
             self.logger.debug(
-                f"Processing {len(assignees)} assignees for issue: {issue.title}"
-            )
-            for assignee in assignees:
-                self._create_user_relationship(
-                    node, assignee, ASSIGNED_TO, issue.title
-                )
-         
-
-    def _create_user_relationship(
-        self, node: Node, user_data: Any, rel_type: str, issue_title: str
-    ) -> None:
-        """Create a relationship between the Issue and a user (creator or assignee)."""
-        user = (
-            user_data
-            if isinstance(user_data, dict)
-            else self.transform_object(user_data)
-        )
-        login = user.get("login") if isinstance(user, dict) else user.login
-        user_node = self.get_node(PERSON, id=login)
-        if user_node:
-            self.create_relationship(node, rel_type, user_node)
-            self.logger.info(
-                f"Linked {rel_type} between Issue and User: {login} - {issue_title}"
-            )
-        else:
-            self.logger.warning(
-                f"User node not found: {login} for {rel_type} on {issue_title}"
-            )
-            login = user["login"]
-            user["id"] = login
-            user["name"] = login
-
-            user_node = self.create_node(user, PERSON, "id")
-            self.create_relationship(user_node, PRESENT_IN, self.organization_node)
-            self.create_relationship(node, rel_type, user_node)
-          
-            self.logger.info(
-                f"Linked {rel_type} between Issue and User: {login} - {issue_title}"
+                f"Processing {len(issue.assignees)} assignees for issue: {issue.title}"
             )
+            for assignee in issue.assignees:
+                self.people.add_link(label, node["id"], ASSIGNED_TO, assignee)
 
-
-    def _link_issue_to_labels(self, node: Node, issue: Any) -> None:
-        """Link the Issue to its associated Labels."""
+    def _link_issue_to_labels(self, node: Node, issue: Any, label: str = DEVELOPMENTTASK) -> None:
+        """Register the links of the Issue (or Pull Request) to its Labels."""
         if issue.labels:
-            labels = issue.labels
-            self.logger.debug(
-                f"Processing {len(labels)} labels for issue: {issue.title}"
-            )
-            for label in labels:
-                label_node = self.get_node(LABEL, id=label["id"])
-                if label_node:
-                    self.create_relationship(node, LABELED, label_node)
-                    self.logger.info(
-                        f"Labeled issue {issue.title} with {label['name']}"
-                    )
-                else:
-                    self.logger.warning(
-                        f"Label not found: {label['id']} for issue {issue.title}"
-                    )
+            for item in issue.labels:
+                self.references.add(label, node["id"], LABELED_WITH, item["id"])
 
     def __load_pull_request_commit(self) -> None:
         """Link commits to their respective Pull Requests."""
         self.logger.info("Linking commits to pull requests...")
-        for pr_commit in self.pull_request_commits.itertuples(index=False):
-            data = self.transform(pr_commit)
-            commit_node = self.get_node(COMMIT, sha=data["sha"])
-            pr_node = self.get_node(
-                PULLREQUEST, repository=data["repository"], number=data["pull_number"]
-            )
-            if commit_node and pr_node:
-                self.create_relationship(commit_node, COMMITTED_IN, pr_node)
-               # self.create_relationship(pr_node, HAS, commit_node)
-                self.logger.info("Linked commit to pull_request")
-            else:
-                self.logger.warning(
-                    "Commit or PullRequest not found for commit SHA: %s", data["sha"]
-                )
+        triples = [
+            {"sha": row.sha, "repository": row.repository, "pull_number": int(row.pull_number)}
+            for row in self.pull_request_commits[["sha", "repository", "pull_number"]].dropna().itertuples(index=False)
+        ]
+        unmatched = self.link_pull_request_commits(triples)
+        self.logger.info(f"{len(triples) - unmatched} commits linked to pull requests")
+        if unmatched:
+            self.logger.warning(f"{unmatched} pull request commits without commit or pull request in the graph")
+
+    def link_pull_request_commits(self, triples: list[dict], batch_size: int = BATCH_SIZE) -> int:
+        """Link commits to pull requests from ``(sha, repository, pull_number)`` triples, matched server-side.
+
+        Args:
+        ----
+            triples (list[dict]): Rows with ``sha``, ``repository`` and ``pull_number``.
+            batch_size (int): Triples per ``UNWIND`` statement.
+
+        Returns:
+        -------
+            int: Number of triples whose commit or pull request is not in the graph.
+
+        """
+        unmatched = 0
+        for inicio in range(0, len(triples), batch_size):
+            result = self.sink.graph.run(QUERY_PULL_REQUEST_COMMITS, rows=triples[inicio:inicio + batch_size]).data()
+            unmatched += result[0]["unmatched"] if result else 0
+        return unmatched
 
     def __load_pull_requests(self) -> None:
         """Create Pull Request nodes and link."""
         self.logger.info("Loading pull requests...")
+        self.people = PersonResolver(self.sink.graph, self.organization)
+        self.references = ReferenceResolver(self.sink.graph)
         for pr in self.pull_requests.itertuples(index=False):
-            data = self.transform(pr)
+            data = self.transform(pr, PULLREQUEST)
             node = self.create_node(data, PULLREQUEST, "id")
             self.logger.debug(f"Created PullRequest node: {pr.title}")
 
@@ -228,18 +213,9 @@ class ExtractSRO(ExtractBase):
             if repository_node:
                 self.create_relationship(repository_node, HAS, node)
 
-            if pr.labels:
-                labels = pr.labels
-                for label in labels:
-                    label_node = self.get_node(LABEL, id=label["id"])
-                    if label_node:
-                        self.create_relationship(node, LABELED, label_node)
-
+            self._link_issue_to_labels(node, pr, PULLREQUEST)
             if pr.milestone:
-                milestone = pr.milestone
-                milestone_node = self.get_node(MILESTONE, id=milestone["id"])
-                if milestone_node:
-                    self.create_relationship(node, HAS, milestone_node)
+                self.references.add(PULLREQUEST, node["id"], HAS_MILESTONE, pr.milestone["id"])
 
             if pr.merge_commit_sha:
                 commit_node = self.get_node(COMMIT, sha=pr.merge_commit_sha)
@@ -248,35 +224,21 @@ class ExtractSRO(ExtractBase):
                     #self.create_relationship(commit_node, MERGED_INTO, node)
 
             self.logger.info(f"Linking users to pull request: {pr.title}")
-            self._link_issue_to_users(node, pr)
-            
+            self._link_issue_to_users(node, pr, PULLREQUEST)
+
             if pr.requested_reviewers:
                 reviewers = pr.requested_reviewers
                 self.logger.debug(
                     f"Procssing {len(reviewers)} reviewers for pull: {pr.title}"
                 )
                 for reviewer in reviewers:
-                    login = reviewer.get("login")
-                    user_node = self.get_node(PERSON, id=login)
-                    if user_node:
-                        self.create_relationship(
-                                node, REVIEWED_BY, user_node)
-                        self.logger.info(
-                            f"Pull Request {node} reviewed by : {user_node}"
-                        )
-                    else:
-                        login = reviewer["login"]
-                        reviewer["id"] = login
-                        reviewer["name"] = login
-
-                        user_node = self.create_node(reviewer, PERSON, "id")
-                        self.create_relationship(user_node, PRESENT_IN, self.organization_node)
-                        self.create_relationship(node, REVIEWED_BY, user_node)
-
-                        self.logger.info(
-                            f"Linked present_in between Pull Request and Reviewe: {login} - {node}"
-                        )   
-    
+                    self.people.add_link(PULLREQUEST, node["id"], REVIEWED_BY, reviewer)
+
+        self.people.flush()
+        self.logger.info(f"{self.people.linked} people linked, {self.people.created} people created")
+        self.references.flush()
+        self._report_missing_references()
+
 
 
     def run(self) -> None:
@@ -0,0 +1,94 @@
+"""Persistent cache of GitHub API responses, revalidated with conditional requests.
+
+Each response is kept on disk (gzip JSON, one file per URL) with its
+``ETag`` and ``Last-Modified``. A cached URL is requested again with
+``If-None-Match`` / ``If-Modified-Since``: GitHub answers ``304 Not Modified``
+without counting it against the rate limit, and the stored body is used.
+Responses of a commit addressed by its full SHA never change, so they are
+served from disk without any request.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import NamedTuple
+
+DEFAULT_CACHE_DIR = Path(os.getenv("GITHUB_CACHE_DIR", Path(os.getenv("REPORT_CACHE_DIR", "cache")) / "github"))
+KEPT_HEADERS = ("etag", "last-modified", "link", "content-type")
+
+IMMUTABLE = re.compile(r"/repos/[^/]+/[^/]+/commits/[0-9a-f]{40}(\?|$)")
+
+
+def is_immutable(url: str) -> bool:
+    """True for URLs whose response never changes (a commit by its full SHA)."""
+    return IMMUTABLE.search(url) is not None
+
+
+class CachedResponse(NamedTuple):
+    """A stored response."""
+
+    status: int
+    headers: dict[str, str]
+    content: bytes
+    immutable: bool
+
+    def validators(self) -> dict[str, str]:
+        """Headers of the conditional request that revalidates this response."""
+        headers = {}
+        if "etag" in self.headers:
+            headers["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["last-modified"]
+        return headers
+
+
+class ResponseCache:
+    """Responses on disk, keyed by the SHA-256 of the URL and its parameters.
+
+    Args:
+    ----
+        cache_dir (Path | str): Where the responses are kept.
+
+    """
+
+    def __init__(self, cache_dir: Path | str = DEFAULT_CACHE_DIR) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.not_modified = 0
+        self.stored = 0
+
+    def key(self, url: str, params: dict | None = None) -> str:
+        payload = json.dumps({"url": url, "params": params or {}}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def get(self, key: str) -> CachedResponse | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(gzip.decompress(path.read_bytes()))
+        except (OSError, ValueError):
+            # Arquivo corrompido (ex.: escrita interrompida): trata como ausente
+            return None
+        return CachedResponse(data["status"], data["headers"], data["content"].encode("utf-8"), data["immutable"])
+
+    def put(self, key: str, url: str, status: int, headers: dict[str, str], content: bytes) -> bool:
+        """Store a successful response that can be reused; True when it was stored."""
+        immutable = is_immutable(url)
+        kept = {name: headers[name] for name in KEPT_HEADERS if name in headers}
+        if status != 200 or not (immutable or "etag" in kept or "last-modified" in kept):
+            return False
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"status": status, "headers": kept, "content": content.decode("utf-8"), "immutable": immutable}
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(gzip.compress(json.dumps(data).encode("utf-8")))
+        tmp.replace(path)
+        self.stored += 1
+        return True
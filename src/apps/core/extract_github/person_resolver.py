@@ -0,0 +1,142 @@
+"""Batch resolution of the people referenced by commits, issues and pull requests.
+
+Authors, committers, creators, assignees and reviewers are registered with
+:meth:`PersonResolver.add_link` while the nodes are loaded. :meth:`flush`
+then, for the whole batch:
+
+1. looks the logins up in one query;
+2. creates the missing people, linked to the organization, in one ``UNWIND MERGE``;
+3. writes the relationships to them, one ``UNWIND`` per label and type.
+"""
+
+import json
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+from apps.core.extract_github.property_schema import node_properties
+from apps.core.extract_github.seon_concepts_dictionary import PERSON, PRESENT_IN
+
+BATCH_SIZE = 5000
+
+QUERY_PEOPLE = f"""
+UNWIND $logins AS login
+MATCH (p:{PERSON} {{id: login}})
+RETURN p
+"""
+
+QUERY_CREATE_PEOPLE = f"""
+UNWIND $people AS person
+MERGE (p:{PERSON} {{id: person.id}})
+ON CREATE SET p += person, p.created_node_at = $now
+WITH p
+OPTIONAL MATCH (o:Organization {{id: $organization}})
+FOREACH (_ IN CASE WHEN o IS NULL THEN [] ELSE [1] END | MERGE (p)-[:{PRESENT_IN}]->(o))
+RETURN p
+"""
+
+QUERY_LINK = """
+UNWIND $rows AS row
+MATCH (n:`{label}` {{id: row.node}})
+MATCH (p:{person} {{id: row.login}})
+MERGE (n)-[:`{rel_type}`]->(p)
+"""
+
+
+def parse_user(user: Any) -> tuple[str | None, dict | None]:
+    """Login and data of a GitHub user given as a dict, a JSON text, an object or a login."""
+    if isinstance(user, str):
+        if not user.startswith("{"):
+            return user or None, None
+        try:
+            user = json.loads(user)
+        except ValueError:
+            return None, None
+    if isinstance(user, dict):
+        return user.get("login"), user
+    return getattr(user, "login", None), None
+
+
+def person_data(login: str, user: dict | None) -> dict:
+    """Properties of a new ``person`` node."""
+    data = node_properties(PERSON, user) if user else {}
+    data.update(id=login, login=login, name=login)
+    return {k: v for k, v in data.items() if v is not None}
+
+
+class PersonResolver:
+    """Resolve logins to ``person`` nodes and link them in bulk.
+
+    Args:
+    ----
+        graph: py2neo ``Graph``.
+        organization (str): Id of the ``Organization`` new people are present in.
+        batch_size (int): Logins or relationships per statement; pending links
+            are flushed when this many are registered.
+
+    """
+
+    def __init__(self, graph: Any, organization: str, batch_size: int = BATCH_SIZE) -> None:
+        self.graph = graph
+        self.organization = organization
+        self.batch_size = batch_size
+        self.nodes: dict[str, Any] = {}
+        self.users: dict[str, dict | None] = {}
+        self.links: dict[tuple[str, str], list[dict]] = defaultdict(list)
+        self.pending = 0
+        self.created = 0
+        self.linked = 0
+
+    def _chunks(self, items: list) -> Iterable[list]:
+        for inicio in range(0, len(items), self.batch_size):
+            yield items[inicio:inicio + self.batch_size]
+
+    def add(self, user: Any) -> str | None:
+        """Register a user to resolve; returns its login (None when it has none)."""
+        login, data = parse_user(user)
+        # Guarda os dados completos do usuário quando aparecerem (só o login não basta para criar)
+        if login and login not in self.nodes and self.users.get(login) is None:
+            self.users[login] = data
+        return login
+
+    def resolve(self, users: Iterable[Any] = ()) -> dict[str, Any]:
+        """``{login: node}`` of ``users`` and of every user registered, creating the missing people."""
+        logins = {login for login in map(self.add, users) if login}
+        pendentes = [login for login in self.users if login not in self.nodes]
+        for chunk in self._chunks(pendentes):
+            for row in self.graph.run(QUERY_PEOPLE, logins=chunk).data():
+                self.nodes[row["p"]["id"]] = row["p"]
+
+        novos = [person_data(login, self.users[login]) for login in pendentes if login not in self.nodes]
+        now = datetime.now().isoformat()
+        for chunk in self._chunks(novos):
+            for row in self.graph.run(QUERY_CREATE_PEOPLE, people=chunk, organization=self.organization, now=now).data():
+                self.nodes[row["p"]["id"]] = row["p"]
+        self.created += len(novos)
+        self.users.clear()
+        return {login: self.nodes[login] for login in logins if login in self.nodes}
+
+    def add_link(self, label: str, node_id: Any, rel_type: str, user: Any) -> None:
+        """Register ``(node)-[rel_type]->(person)``; the node must exist when :meth:`flush` runs."""
+        login = self.add(user)
+        if login is None or node_id is None:
+            return
+        self.links[(label, rel_type)].append({"node": node_id, "login": login})
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> int:
+        """Resolve the registered people and write the pending links; returns the links written."""
+        self.resolve()
+        written = 0
+        for (label, rel_type), rows in self.links.items():
+            query = QUERY_LINK.format(label=label, person=PERSON, rel_type=rel_type)
+            for chunk in self._chunks(rows):
+                self.graph.run(query, rows=chunk)
+            written += len(rows)
+        self.links.clear()
+        self.pending = 0
+        self.linked += written
+        return written
@@ -0,0 +1,242 @@
+"""Properties kept on each SEON node, declared per label.
+
+``PROPERTY_SCHEMA[label]`` maps a node property to a :class:`Prop`: where
+it comes from in the Airbyte record (a dotted path into the nested
+structs) and how it is typed. Everything else in the record is dropped,
+instead of every nested struct being flattened and stringified into the
+node. :func:`node_properties` applies the transform compiled from the
+schema; labels without a schema keep the generic flattening of
+:meth:`~.extract_base.ExtractBase.data_clean`.
+
+Properties read by the loaders (``get_node`` lookups), by the relation
+derivations and by the repositories must stay in the schema.
+"""
+
+import json
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from apps.core.extract_github.seon_concepts_dictionary import (
+    BRANCH, COMMIT, DEVELOPMENTTASK, MILESTONE, PERSON, PROJECT, PULLREQUEST, SOURCEREPOSITORY, TEAM, TEAM_MEMBER,
+)
+
+
+class Prop(NamedTuple):
+    """Source and type of a node property."""
+
+    source: str  # dotted path in the record, e.g. "commit.author.date"
+    type: Callable[[Any], Any] | None = None  # None keeps primitives and stringifies the rest
+
+
+def names(items: Any) -> list[str]:
+    """``name`` of each item of a list of structs (labels)."""
+    return [i["name"] for i in items if isinstance(i, dict) and i.get("name") is not None]
+
+
+def logins(items: Any) -> list[str]:
+    """``login`` of each item of a list of users (assignees, reviewers)."""
+    return [i["login"] for i in items if isinstance(i, dict) and i.get("login") is not None]
+
+
+def shas(items: Any) -> list[str]:
+    """``sha`` of each item of a list of commits (parents)."""
+    return [i["sha"] for i in items if isinstance(i, dict) and i.get("sha") is not None]
+
+
+USER = {
+    "login": Prop("login", str),
+    "name": Prop("login", str),
+    "type": Prop("type", str),
+    "site_admin": Prop("site_admin", bool),
+    "html_url": Prop("html_url", str),
+    "avatar_url": Prop("avatar_url", str),
+}
+
+PROPERTY_SCHEMA: dict[str, dict[str, Prop]] = {
+    SOURCEREPOSITORY: {
+        "id": Prop("id"),
+        "name": Prop("name", str),
+        "full_name": Prop("full_name", str),
+        "description": Prop("description", str),
+        "html_url": Prop("html_url", str),
+        "url": Prop("url", str),
+        "private": Prop("private", bool),
+        "fork": Prop("fork", bool),
+        "archived": Prop("archived", bool),
+        "language": Prop("language", str),
+        "default_branch": Prop("default_branch", str),
+        "owner": Prop("owner.login", str),
+        "created_at": Prop("created_at", str),
+        "updated_at": Prop("updated_at", str),
+        "pushed_at": Prop("pushed_at", str),
+    },
+    BRANCH: {
+        "name": Prop("name", str),
+        "repository": Prop("repository", str),
+        "protected": Prop("protected", bool),
+        "commit_sha": Prop("commit.sha", str),
+    },
+    COMMIT: {
+        "id": Prop("sha", str),
+        "sha": Prop("sha", str),
+        "repository": Prop("repository", str),
+        "branch": Prop("branch", str),
+        "created_at": Prop("created_at", str),
+        "html_url": Prop("html_url", str),
+        "url": Prop("url", str),
+        "message": Prop("commit.message", str),
+        "author_name": Prop("commit.author.name", str),
+        "author_email": Prop("commit.author.email", str),
+        "author_date": Prop("commit.author.date", str),
+        "author_login": Prop("author.login", str),
+        "committer_name": Prop("commit.committer.name", str),
+        "committer_email": Prop("commit.committer.email", str),
+        "committer_date": Prop("commit.committer.date", str),
+        "committer_login": Prop("committer.login", str),
+        "comment_count": Prop("commit.comment_count", int),
+        "verified": Prop("commit.verification.verified", bool),
+        "parents": Prop("parents", shas),
+    },
+    DEVELOPMENTTASK: {
+        "id": Prop("id"),
+        "number": Prop("number", int),
+        "title": Prop("title", str),
+        "description": Prop("body", str),
+        "state": Prop("state", str),
+        "state_reason": Prop("state_reason", str),
+        "repository": Prop("repository", str),
+        "html_url": Prop("html_url", str),
+        "url": Prop("url", str),
+        "user_login": Prop("user.login", str),
+        "assignees": Prop("assignees", logins),
+        "labels": Prop("labels", names),
+        "milestone": Prop("milestone.title", str),
+        "pull_request_url": Prop("pull_request.url", str),
+        "comments": Prop("comments", int),
+        "locked": Prop("locked", bool),
+        "author_association": Prop("author_association", str),
+        "created_at": Prop("created_at", str),
+        "updated_at": Prop("updated_at", str),
+        "closed_at": Prop("closed_at", str),
+    },
+    PULLREQUEST: {
+        "id": Prop("id"),
+        "number": Prop("number", int),
+        "title": Prop("title", str),
+        "description": Prop("body", str),
+        "state": Prop("state", str),
+        "draft": Prop("draft", bool),
+        "locked": Prop("locked", bool),
+        "repository": Prop("repository", str),
+        "html_url": Prop("html_url", str),
+        "url": Prop("url", str),
+        "user_login": Prop("user.login", str),
+        "assignees": Prop("assignees", logins),
+        "requested_reviewers": Prop("requested_reviewers", logins),
+        "labels": Prop("labels", names),
+        "milestone": Prop("milestone.title", str),
+        "head_ref": Prop("head.ref", str),
+        "base_ref": Prop("base.ref", str),
+        "merge_commit_sha": Prop("merge_commit_sha", str),
+        "author_association": Prop("author_association", str),
+        "created_at": Prop("created_at", str),
+        "updated_at": Prop("updated_at", str),
+        "closed_at": Prop("closed_at", str),
+        "merged_at": Prop("merged_at", str),
+    },
+    MILESTONE: {
+        "id": Prop("id"),
+        "number": Prop("number", int),
+        "title": Prop("title", str),
+        "description": Prop("description", str),
+        "state": Prop("state", str),
+        "repository": Prop("repository", str),
+        "html_url": Prop("html_url", str),
+        "url": Prop("url", str),
+        "creator_login": Prop("creator.login", str),
+        "open_issues": Prop("open_issues", int),
+        "closed_issues": Prop("closed_issues", int),
+        "created_at": Prop("created_at", str),
+        "updated_at": Prop("updated_at", str),
+        "closed_at": Prop("closed_at", str),
+        "due_on": Prop("due_on", str),
+    },
+    PROJECT: {
+        "id": Prop("id"),
+        "number": Prop("number", int),
+        "title": Prop("title", str),
+        "short_description": Prop("short_description", str),
+        "repository": Prop("repository", str),
+        "url": Prop("url", str),
+        "public": Prop("public", bool),
+        "closed": Prop("closed", bool),
+        "created_at": Prop("created_at", str),
+        "updated_at": Prop("updated_at", str),
+        "closed_at": Prop("closed_at", str),
+    },
+    TEAM: {
+        "id": Prop("id"),
+        "name": Prop("name", str),
+        "slug": Prop("slug", str),
+        "description": Prop("description", str),
+        "privacy": Prop("privacy", str),
+        "organization": Prop("organization", str),
+        "parent": Prop("parent.slug", str),
+        "html_url": Prop("html_url", str),
+        "url": Prop("url", str),
+    },
+    PERSON: {
+        **USER,
+        "organization": Prop("organization", str),
+        "team_slug": Prop("team_slug", str),
+    },
+    TEAM_MEMBER: {
+        **USER,
+        "organization": Prop("organization", str),
+        "team_slug": Prop("team_slug", str),
+        "role": Prop("role", str),
+    },
+}
+
+
+def _primitive(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _get(record: Any, path: tuple[str, ...]) -> Any:
+    value = record
+    for part in path:
+        if isinstance(value, str) and value.startswith("{"):
+            # Structs que chegam do cache como texto JSON
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return None
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def compile_schema(schema: dict[str, Prop]) -> Callable[[dict], dict]:
+    """Transform from a record to the node properties declared in ``schema``."""
+    fields = [(name, tuple(prop.source.split(".")), prop.type or _primitive) for name, prop in schema.items()]
+
+    def transform(record: dict) -> dict:
+        properties = {}
+        for name, path, cast in fields:
+            value = _get(record, path)
+            properties[name] = None if value is None else cast(value)
+        return properties
+
+    return transform
+
+
+TRANSFORMS = {label: compile_schema(schema) for label, schema in PROPERTY_SCHEMA.items()}
+
+
+def node_properties(label: str, record: dict) -> dict:
+    """Properties of a ``label`` node from an Airbyte record; ``KeyError`` for labels without a schema."""
+    return TRANSFORMS[label](record)
@@ -0,0 +1,93 @@
+"""Side store for large text properties (patches, issue bodies, commit messages).
+
+A string property longer than ``threshold`` bytes is not written to the
+node. It is compressed into a file named by the SHA-256 of its text, and
+the node keeps:
+
+- ``<field>``: a preview of the first ``preview`` characters;
+- ``<field>_ref``: the key in the store;
+- ``<field>_size``: the length of the full text.
+
+The same text is stored once however many nodes hold it. The full text is
+served by the ``core/property/<key>/`` endpoint or :meth:`PropertyStore.resolve`.
+"""
+
+import hashlib
+import os
+import re
+import zlib
+from pathlib import Path
+
+THRESHOLD = int(os.getenv("PROPERTY_OFFLOAD_THRESHOLD", "4096"))
+PREVIEW = 280
+# Caminho absoluto (src/property_store, como PROPERTY_STORE_DIR nas settings): API e workers usam o mesmo
+DEFAULT_STORE_DIR = Path(os.getenv("PROPERTY_STORE_DIR") or Path(__file__).resolve().parents[3] / "property_store")
+REF_SUFFIX = "_ref"
+SIZE_SUFFIX = "_size"
+
+KEY = re.compile(r"[0-9a-f]{64}")
+
+
+class PropertyStore:
+    """Compressed texts on disk, addressed by content hash.
+
+    Args:
+    ----
+        root (Path | str): Directory of the store, shared by the workers and the API.
+        threshold (int): Size in bytes above which a property is offloaded.
+        preview (int): Characters kept on the node.
+
+    """
+
+    def __init__(self, root: Path | str | None = None, threshold: int = THRESHOLD, preview: int = PREVIEW) -> None:
+        self.root = Path(root) if root is not None else DEFAULT_STORE_DIR
+        self.threshold = threshold
+        self.preview = preview
+
+    def _path(self, key: str) -> Path:
+        if not KEY.fullmatch(key):
+            raise ValueError(f"Invalid property key: {key!r}")
+        return self.root / key[:2] / f"{key}.z"
+
+    def put(self, text: str) -> str:
+        """Store ``text`` (once) and return its key."""
+        raw = text.encode("utf-8")
+        key = hashlib.sha256(raw).hexdigest()
+        path = self._path(key)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(zlib.compress(raw))
+            tmp.replace(path)
+        return key
+
+    def get(self, key: str) -> str | None:
+        """Full text of ``key``, or None when it is not in the store."""
+        path = self._path(key)
+        return zlib.decompress(path.read_bytes()).decode("utf-8") if path.exists() else None
+
+    def offload(self, data: dict, keep: tuple[str, ...] = ("id",)) -> dict:
+        """Copy of ``data`` with its large strings replaced by a preview and a reference."""
+        result = {}
+        for field, value in data.items():
+            if (
+                isinstance(value, str) and field not in keep
+                and not field.endswith((REF_SUFFIX, SIZE_SUFFIX))
+                and len(value.encode("utf-8")) > self.threshold
+            ):
+                result[field] = value[:self.preview]
+                result[field + REF_SUFFIX] = self.put(value)
+                result[field + SIZE_SUFFIX] = len(value)
+            else:
+                result[field] = value
+        return result
+
+    def resolve(self, data: dict, field: str) -> str | None:
+        """Full value of ``field`` of node properties, reading the store when it was offloaded."""
+        key, value = data.get(field + REF_SUFFIX), data.get(field)
+        if key:
+            text = self.get(key)
+            # Uma referência antiga (o texto encolheu depois) não bate com o valor atual
+            if text is not None and text.startswith(value or ""):
+                return text
+        return value
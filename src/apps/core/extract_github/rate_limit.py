@@ -0,0 +1,206 @@
+"""Token-bucket pacing of GitHub API calls, shared by every worker using the same token.
+
+Each token has one bucket, kept in Redis (so all Celery workers draw from
+it) or in-process when Redis is not configured. The bucket refills at the
+rate the last response allows: the ``X-RateLimit-Remaining`` calls spread
+evenly until ``X-RateLimit-Reset``, capped at ``MAX_RATE`` to stay under
+the secondary limits. An exhausted quota, or a secondary limit answer
+(429, or a 403 with ``Retry-After`` or a rate limit message), blocks the
+bucket until the reset or for the ``Retry-After`` / exponential back-off
+time. Other 403s (missing permissions) are left to the caller.
+
+Priorities are served by headroom: a ``NORMAL`` call only takes a token
+while ``RESERVE[NORMAL]`` of the bucket stays free, a ``LOW`` one while
+``RESERVE[LOW]`` does, so interactive calls keep flowing while backfills
+use whatever is left. The GitHub token itself is never stored, only a hash.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from .logging_config import LoggerFactory
+
+logger = LoggerFactory.get_logger(__name__)
+
+HIGH, NORMAL, LOW = 0, 1, 2
+RESERVE = {HIGH: 0.0, NORMAL: 0.2, LOW: 0.5}
+
+CAPACITY = 100                 # rajada máxima
+DEFAULT_RATE = 5000 / 3600     # limite primário de um token, em chamadas por segundo
+MAX_RATE = 10.0                # abaixo do limite secundário (900 pontos/min)
+MIN_RATE = 0.01
+SECONDARY_BACKOFF = 60.0
+MAX_BACKOFF = 900.0
+KEY_PREFIX = "github:ratelimit"
+KEY_TTL = 2 * 3600
+RATE_LIMIT_MESSAGE = re.compile(rb"rate limit", re.IGNORECASE)
+
+TAKE_SCRIPT = """
+local now, capacity, default_rate, cost, reserve = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5])
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'rate', 'blocked_until')
+local blocked = tonumber(b[4]) or 0
+if blocked > now then return tostring(blocked - now) end
+local rate = tonumber(b[3]) or default_rate
+local tokens = math.min(capacity, (tonumber(b[1]) or capacity) + (now - (tonumber(b[2]) or now)) * rate)
+local wait = 0
+if tokens >= cost + reserve then tokens = tokens - cost else wait = (cost + reserve - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[6]))
+return tostring(wait)
+"""
+
+UPDATE_SCRIPT = """
+local rate, blocked_until, strike = ARGV[1], tonumber(ARGV[2]), ARGV[3]
+if rate ~= '' then redis.call('HSET', KEYS[1], 'rate', rate) end
+if blocked_until > (tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0) then
+    redis.call('HSET', KEYS[1], 'blocked_until', tostring(blocked_until))
+end
+local strikes = 0
+if strike == '1' then strikes = redis.call('HINCRBY', KEYS[1], 'strikes', 1)
+elseif strike == '0' then redis.call('HSET', KEYS[1], 'strikes', 0) end
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+return strikes
+"""
+
+
+class LocalBucket:
+    """In-process bucket, for a single worker or when Redis is not available."""
+
+    def __init__(self) -> None:
+        self.state: dict[str, dict[str, float]] = {}
+        self.lock = threading.Lock()
+
+    def take(self, key: str, now: float, capacity: float, default_rate: float, cost: float, reserve: float) -> float:
+        """Take ``cost`` tokens if ``reserve`` stays free; otherwise the seconds to wait."""
+        with self.lock:
+            b = self.state.setdefault(key, {"tokens": capacity, "ts": now, "rate": default_rate, "blocked_until": 0.0})
+            if b["blocked_until"] > now:
+                return b["blocked_until"] - now
+            b["tokens"] = min(capacity, b["tokens"] + (now - b["ts"]) * b["rate"])
+            b["ts"] = now
+            if b["tokens"] >= cost + reserve:
+                b["tokens"] -= cost
+                return 0.0
+            return (cost + reserve - b["tokens"]) / b["rate"]
+
+    def update(self, key: str, now: float, rate: float | None = None, blocked_until: float = 0.0,
+               strike: bool | None = None) -> int:
+        """Set the refill rate, block until a moment and count (or clear) secondary-limit strikes."""
+        with self.lock:
+            b = self.state.setdefault(key, {"tokens": CAPACITY, "ts": now, "rate": DEFAULT_RATE, "blocked_until": 0.0})
+            if rate is not None:
+                b["rate"] = rate
+            b["blocked_until"] = max(b["blocked_until"], blocked_until)
+            if strike is True:
+                b["strikes"] = b.get("strikes", 0) + 1
+            elif strike is False:
+                b["strikes"] = 0
+            return int(b.get("strikes", 0)) if strike else 0
+
+
+class RedisBucket:
+    """Bucket shared by every process through Redis, updated atomically by Lua scripts."""
+
+    def __init__(self, client: Any) -> None:
+        self.client = client
+        self._take = client.register_script(TAKE_SCRIPT)
+        self._update = client.register_script(UPDATE_SCRIPT)
+
+    def take(self, key: str, now: float, capacity: float, default_rate: float, cost: float, reserve: float) -> float:
+        return float(self._take(keys=[key], args=[now, capacity, default_rate, cost, reserve, KEY_TTL]))
+
+    def update(self, key: str, now: float, rate: float | None = None, blocked_until: float = 0.0,
+               strike: bool | None = None) -> int:
+        flag = "" if strike is None else ("1" if strike else "0")
+        return int(self._update(keys=[key], args=["" if rate is None else rate, blocked_until, flag, KEY_TTL]))
+
+
+class RateLimiter:
+    """Pace the calls made with one GitHub token.
+
+    Args:
+    ----
+        token (str): GitHub token; only its hash is used as key.
+        bucket (LocalBucket | RedisBucket): Where the bucket state lives.
+        capacity (float): Burst size.
+        clock (Callable): Time source, in seconds.
+
+    """
+
+    def __init__(self, token: str, bucket: LocalBucket | RedisBucket | None = None, capacity: float = CAPACITY,
+                 clock: Callable[[], float] = time.time) -> None:
+        self.key = f"{KEY_PREFIX}:{hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]}"
+        self.bucket = bucket or LocalBucket()
+        self.capacity = capacity
+        self.clock = clock
+
+    def wait_time(self, priority: int = NORMAL) -> float:
+        """Take a token for a call of ``priority`` (0 returned) or the seconds to wait before trying again."""
+        return self.bucket.take(self.key, self.clock(), self.capacity, DEFAULT_RATE, 1, RESERVE[priority] * self.capacity)
+
+    def acquire(self, priority: int = NORMAL) -> None:
+        """Block until a call of ``priority`` may be made."""
+        while (wait := self.wait_time(priority)) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, priority: int = NORMAL) -> None:
+        """Wait, without blocking the event loop, until a call of ``priority`` may be made."""
+        while (wait := self.wait_time(priority)) > 0:
+            await asyncio.sleep(wait)
+
+    def observe(self, status: int, headers: Mapping[str, str], body: bytes | str = b"") -> float:
+        """Adjust the pace to a response; returns the back-off in seconds when it was rate limited."""
+        now = self.clock()
+        remaining, reset = headers.get("x-ratelimit-remaining"), headers.get("x-ratelimit-reset")
+        retry_after = headers.get("retry-after")
+        rate = None
+        if remaining is not None and reset is not None:
+            rate = min(MAX_RATE, max(MIN_RATE, int(remaining) / max(float(reset) - now, 1.0)))
+
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        limited = status == 429 or (
+            status == 403 and (retry_after is not None or remaining == "0" or bool(RATE_LIMIT_MESSAGE.search(body)))
+        )
+        if status == 403 and not limited:
+            # Falta de permissão, não limite: quem chamou trata o erro (raise_for_status)
+            self.bucket.update(self.key, now, rate)
+            return 0.0
+
+        if limited:
+            if retry_after is None and remaining == "0" and reset is not None:
+                # Limite primário esgotado: espera o reset, quando a janela nova volta ao ritmo padrão
+                backoff = max(float(reset) - now, 1.0)
+                self.bucket.update(self.key, now, DEFAULT_RATE, now + backoff)
+            else:
+                # Limite secundário: Retry-After ou espera exponencial
+                strikes = self.bucket.update(self.key, now, rate, strike=True)
+                backoff = float(retry_after) if retry_after else min(MAX_BACKOFF, SECONDARY_BACKOFF * 2 ** (strikes - 1))
+                self.bucket.update(self.key, now, blocked_until=now + backoff)
+            logger.warning(f"GitHub rate limit ({status}): backing off {backoff:.0f}s")
+            return backoff
+
+        self.bucket.update(self.key, now, rate, strike=False)
+        return 0.0
+
+
+_limiters: dict[str, RateLimiter] = {}
+
+
+def limiter_for(token: str) -> RateLimiter:
+    """The process-wide limiter of a token, on Redis when ``GITHUB_RATELIMIT_REDIS_URL`` or ``CELERY_BROKER_URL`` is set."""
+    if token not in _limiters:
+        url = os.getenv("GITHUB_RATELIMIT_REDIS_URL") or os.getenv("CELERY_BROKER_URL")
+        bucket = None
+        if url:
+            import redis
+
+            bucket = RedisBucket(redis.Redis.from_url(url))
+        _limiters[token] = RateLimiter(token, bucket)
+    return _limiters[token]
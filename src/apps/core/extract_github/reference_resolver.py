@@ -0,0 +1,111 @@
+"""Batch linking of issues and pull requests to the labels, milestones and PRs they reference.
+
+References are registered with :meth:`ReferenceResolver.add` while the
+nodes are loaded. :meth:`flush` then looks up each kind of referenced node
+once for the whole batch (one query each for labels, milestones and pull
+requests) and writes the edges to the ones found with one ``UNWIND`` per
+:class:`Reference`. The values not found
+are kept in ``missing`` so the caller can report them or create placeholders.
+"""
+
+from collections import defaultdict
+from typing import Any, NamedTuple
+
+from apps.core.extract_github.seon_concepts_dictionary import HAS, LABEL, LABELED, MILESTONE, PULLREQUEST
+
+BATCH_SIZE = 5000
+
+
+class Reference(NamedTuple):
+    """A kind of reference from a loaded node to another node."""
+
+    label: str  # label of the referenced node
+    key: str  # property matched against the referenced value
+    rel_type: str
+    outgoing: bool  # True: (node)-[rel_type]->(referenced); False: (referenced)-[rel_type]->(node)
+
+
+LABELED_WITH = Reference(LABEL, "id", LABELED, True)
+IN_MILESTONE = Reference(MILESTONE, "id", HAS, False)  # (milestone)-[has]->(issue)
+HAS_MILESTONE = Reference(MILESTONE, "id", HAS, True)  # (pullrequest)-[has]->(milestone)
+PART_OF_PULL_REQUEST = Reference(PULLREQUEST, "url", HAS, False)  # (pullrequest)-[has]->(issue)
+
+QUERY_FOUND = """
+UNWIND $values AS value
+MATCH (n:`{label}` {{`{key}`: value}})
+RETURN DISTINCT value
+"""
+
+QUERY_LINK = """
+UNWIND $rows AS row
+MATCH (n:`{node_label}` {{id: row.node}})
+MATCH (ref:`{label}` {{`{key}`: row.value}})
+MERGE {pattern}
+"""
+
+
+class ReferenceResolver:
+    """Resolve the references of a batch of nodes and link them in bulk.
+
+    Args:
+    ----
+        graph: py2neo ``Graph``.
+        batch_size (int): Values or edges per statement; pending references
+            are flushed when this many are registered.
+
+    """
+
+    def __init__(self, graph: Any, batch_size: int = BATCH_SIZE) -> None:
+        self.graph = graph
+        self.batch_size = batch_size
+        self.rows: dict[tuple[str, Reference], list[dict]] = defaultdict(list)
+        self.missing: dict[Reference, set] = defaultdict(set)
+        self.pending = 0
+        self.linked = 0
+
+    def _chunks(self, items: list) -> list[list]:
+        return [items[inicio:inicio + self.batch_size] for inicio in range(0, len(items), self.batch_size)]
+
+    def add(self, node_label: str, node_id: Any, reference: Reference, value: Any) -> None:
+        """Register that node ``node_id`` references the node whose ``reference.key`` is ``value``."""
+        if node_id is None or value is None:
+            return
+        self.rows[(node_label, reference)].append({"node": node_id, "value": value})
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def found(self, label: str, key: str, values: set) -> set:
+        """The ``values`` of ``key`` of existing ``label`` nodes."""
+        query = QUERY_FOUND.format(label=label, key=key)
+        found = set()
+        for chunk in self._chunks(list(values)):
+            found.update(row["value"] for row in self.graph.run(query, values=chunk).data())
+        return found
+
+    def flush(self) -> int:
+        """Look up the referenced nodes and write the edges to them; returns the edges written."""
+        por_tipo = defaultdict(set)
+        for (_, reference), rows in self.rows.items():
+            por_tipo[(reference.label, reference.key)].update(row["value"] for row in rows)
+        # Uma consulta por tipo de nó referenciado (rótulos, milestones, PRs), não por referência
+        encontrados = {tipo: self.found(*tipo, values) for tipo, values in por_tipo.items()}
+
+        written = 0
+        for (node_label, reference), rows in self.rows.items():
+            found = encontrados[(reference.label, reference.key)]
+            self.missing[reference].update(row["value"] for row in rows if row["value"] not in found)
+            rows = [row for row in rows if row["value"] in found]
+            pattern = (
+                f"(n)-[:`{reference.rel_type}`]->(ref)" if reference.outgoing
+                else f"(ref)-[:`{reference.rel_type}`]->(n)"
+            )
+            query = QUERY_LINK.format(node_label=node_label, label=reference.label, key=reference.key, pattern=pattern)
+            for chunk in self._chunks(rows):
+                self.graph.run(query, rows=chunk)
+            written += len(rows)
+
+        self.rows.clear()
+        self.pending = 0
+        self.linked += written
+        return written
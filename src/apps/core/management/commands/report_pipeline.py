@@ -0,0 +1,57 @@
+import os
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.report.pipeline import SKIPPED, Pipeline
+from apps.core.report.stages import report_stages
+from apps.core.tasks import neo4j_driver, store_community_smells
+
+DEFAULT_WORK_DIR = Path(os.getenv("REPORT_CACHE_DIR", "cache")) / "pipeline"
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the report stages (relations → roles → smells → charts, summary) as a DAG, "
+        "skipping stages whose inputs did not change, and print the time of each stage."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("organization", nargs="?", default=os.getenv("ORGANIZATION"))
+        parser.add_argument("--stages", nargs="+", help="Run only these stages (and what they depend on)")
+        parser.add_argument("--force", nargs="+", default=[], help="Run these stages even if unchanged")
+        parser.add_argument("--roles-file", type=Path, help="Role mapping file instead of the EO memberships")
+        parser.add_argument("--work-dir", type=Path, default=DEFAULT_WORK_DIR, help="Artifacts and manifests")
+        parser.add_argument("--workers", type=int, default=None, help="Processes of the smell analyses")
+        parser.add_argument("--summary-workers", type=int, default=4, help="Concurrent Gemini requests")
+
+    def handle(self, *args, **options):
+        organization = options["organization"]
+        if not organization:
+            raise CommandError("organization is required (argument or ORGANIZATION)")
+
+        driver = neo4j_driver()
+        try:
+            pipeline = Pipeline(self.stages(driver, organization, options), options["work_dir"] / organization)
+            targets = options["stages"]
+            if targets is None and not os.getenv("GEMINI_KEY"):
+                self.stdout.write(self.style.WARNING("GEMINI_KEY is not set: skipping the summary stage"))
+                targets = [name for name in pipeline.order if name != "summary"]
+            try:
+                runs = pipeline.run(targets, force=options["force"])
+            except ValueError as e:
+                raise CommandError(str(e)) from e
+        finally:
+            driver.close()
+
+        for run in runs:
+            style = self.style.NOTICE if run.status == SKIPPED else self.style.SUCCESS
+            self.stdout.write(style(f"{run.name:<10} {run.status:<8} {run.seconds:8.2f}s"))
+        self.stdout.write(f"Total: {sum(run.seconds for run in runs):.2f}s")
+
+    def stages(self, driver, organization, options):
+        return report_stages(
+            driver, organization, options["work_dir"], roles_file=options["roles_file"],
+            workers=options["workers"], summary_workers=options["summary_workers"],
+            store=store_community_smells, echo=self.stdout.write,
+        )
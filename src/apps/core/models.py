@@ -36,3 +36,44 @@ class Configuration(models.Model):
     class Meta:
         db_table = 'configuration'
 
+
+class CommunitySmell(models.Model):
+    """
+    Community smells of an organization in one period, computed by the
+    ``analyse_community_smells`` task from the collaboration network.
+
+    Attributes:
+        organization (str): GitHub organization analysed.
+        team (str): Team slug, empty for the organization-wide analysis.
+        period_start (datetime): Start of the period.
+        period_end (datetime): End of the period.
+        people (int): People in the analysed graph (team members for a team).
+        silos (list): Communities, each a list of people.
+        truck_factor (list): People whose removal disconnects the network.
+        boundary_spanners (list): Articulation points linking two or more teams.
+        bottlenecks (list): Leaders with twice the average degree or betweenness.
+        lone_wolves (list): People without collaboration.
+        betweenness (dict): How betweenness was computed (mode, pivots, error bound).
+        generation (str): Snapshot generation the results come from.
+        created_at (datetime): Timestamp of when the record was created.
+    """
+    organization = models.CharField(max_length=300, db_index=True)
+    team = models.CharField(max_length=300, blank=True, default="")
+    period_start = models.DateTimeField(blank=True, null=True)
+    period_end = models.DateTimeField(blank=True, null=True)
+    people = models.PositiveIntegerField(default=0)
+    silos = models.JSONField(default=list)
+    truck_factor = models.JSONField(default=list)
+    boundary_spanners = models.JSONField(default=list)
+    bottlenecks = models.JSONField(default=list)
+    lone_wolves = models.JSONField(default=list)
+    betweenness = models.JSONField(blank=True, null=True)
+    generation = models.CharField(max_length=64, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'community_smell'
+        indexes = [models.Index(fields=['organization', 'team', 'period_start'])]
+
+    def __str__(self):
+        return f"{self.organization}-{self.team or 'all'}-{self.period_start}"
@@ -0,0 +1,184 @@
+"""Community smell analysis of an organization, shared by the report scripts and the Celery task.
+
+The organization-wide smells are computed per quarter and the team smells
+over the whole period, as in ``report/community_smells``. :func:`community_smells`
+returns them as rows ready to be stored in
+:class:`~apps.core.models.CommunitySmell`.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from .graph import ISOLATED, edge_array, label_with_team
+from .runner import run_parallel
+from .smells import AUTO, PIVOTS, analyse_period, analyse_team
+from .snapshot import DEFAULT_CACHE_DIR, CollaborationSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+def quarters(inicio: pd.Timestamp, fim: pd.Timestamp) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+    """Consecutive three-month ``(inicio, fim)`` periods from ``inicio``, the last one cut at ``fim``."""
+    periodos = []
+    while inicio < fim:
+        proximo = inicio + relativedelta(months=3)
+        periodos.append((inicio, min(proximo, fim)))
+        inicio = proximo
+    return periodos
+
+
+def isolated_people(df_edges: pd.DataFrame) -> list[str]:
+    """Labelled people of the ``ISOLATED`` rows, present in every period."""
+    return list(df_edges.loc[df_edges["relation"] == ISOLATED, "source"].unique())
+
+
+def analyse_quarters(df_edges: pd.DataFrame, periodos: list[tuple[pd.Timestamp, pd.Timestamp]],
+                     isolated: list[str], mode: str = AUTO, pivots: int = PIVOTS,
+                     workers: int | None = None) -> list[dict | None]:
+    """Organization-wide smells of each period, ``None`` for periods without data.
+
+    Args:
+    ----
+        df_edges (DataFrame): Labelled edges with ``created_at`` as datetimes.
+        periodos (list): ``(inicio, fim)`` periods, see :func:`quarters`.
+        isolated (list[str]): People added to every period, see :func:`isolated_people`.
+        mode (str): Betweenness mode, see :func:`~apps.core.report.smells.betweenness`.
+        pivots (int): Sampled sources in approximate betweenness mode.
+        workers (int): Worker processes, see :func:`~apps.core.report.runner.run_parallel`.
+
+    """
+    grafos = {}
+    for inicio, fim in periodos:
+        df_periodo = df_edges[
+            (df_edges["created_at"].notna()) &
+            (df_edges["created_at"] >= inicio) &
+            (df_edges["created_at"] < fim)
+        ]
+        if df_periodo.empty and not isolated:
+            continue
+        grafos[inicio, fim] = edge_array(df_periodo, isolated=isolated)
+
+    n = len(grafos)
+    resultados = dict(zip(grafos, run_parallel(
+        analyse_period, grafos.values(), [mode] * n, [pivots] * n, max_workers=workers
+    )))
+    return [resultados.get(periodo) for periodo in periodos]
+
+
+def analyse_teams(df_edges: pd.DataFrame, mode: str = AUTO, pivots: int = PIVOTS,
+                  workers: int | None = None) -> list[tuple[str, dict]]:
+    """Smells of each team on the relations started by its members, skipping empty graphs."""
+    times, grafos = [], []
+    for team, grupo in df_edges.groupby("team1"):
+        arr = edge_array(grupo)
+        if len(arr.nodes) == 0:
+            continue
+        times.append(team)
+        grafos.append(arr)
+    n = len(times)
+    return list(zip(times, run_parallel(analyse_team, grafos, times, [mode] * n, [pivots] * n, max_workers=workers)))
+
+
+def _datetime(moment):
+    return None if pd.isna(moment) else pd.Timestamp(moment).to_pydatetime()
+
+
+def result_row(team: str, inicio, fim, resultado: dict | None) -> dict:
+    """Fields of :class:`~apps.core.models.CommunitySmell` for one analysis result."""
+    resultado = resultado or {}
+    return {
+        "team": team,
+        "period_start": _datetime(inicio),
+        "period_end": _datetime(fim),
+        "people": len(resultado.get("members", [])),
+        "silos": resultado.get("silos", []),
+        "truck_factor": resultado.get("truck", []),
+        "boundary_spanners": resultado.get("boundary", []),
+        "bottlenecks": resultado.get("bottlenecks", []),
+        "lone_wolves": resultado.get("lone", []),
+        "betweenness": resultado.get("betweenness"),
+    }
+
+
+def community_smells(driver: Any, organization: str, cache_dir: Path | str = DEFAULT_CACHE_DIR,
+                     mode: str = AUTO, pivots: int = PIVOTS, workers: int | None = None,
+                     refresh: bool = False) -> tuple[str | None, list[dict]]:
+    """Quarterly organization smells and whole-period team smells of an organization.
+
+    ``workers`` is passed to :func:`~apps.core.report.runner.run_parallel`;
+    use 1 where child processes are not allowed (e.g. a Celery prefork worker).
+    ``refresh`` reloads the snapshot from Neo4j even if the generation is
+    cached, e.g. after person roles changed.
+
+    Returns
+    -------
+        tuple: The snapshot generation analysed and one row per quarter
+        (``team`` empty) and per team, with the fields of
+        :class:`~apps.core.models.CommunitySmell`.
+
+    """
+    snapshot = CollaborationSnapshot(driver, organization, cache_dir=cache_dir)
+    df_edges = snapshot.edges(refresh=refresh)
+    if df_edges.empty:
+        logger.warning(f"No collaboration relations for {organization}")
+        return snapshot.generation, []
+
+    df_edges["created_at"] = pd.to_datetime(df_edges["created_at"], errors="coerce", utc=True)
+    df_edges = label_with_team(df_edges)
+    inicio, fim = df_edges["created_at"].min(), df_edges["created_at"].max()
+
+    rows = []
+    if not (pd.isna(inicio) or pd.isna(fim)):
+        periodos = quarters(inicio, fim)
+        resultados = analyse_quarters(df_edges, periodos, isolated_people(df_edges), mode, pivots, workers)
+        rows += [result_row("", i, f, r) for (i, f), r in zip(periodos, resultados)]
+
+    rows += [result_row(team, inicio, fim, r) for team, r in analyse_teams(df_edges, mode, pivots, workers)]
+    return snapshot.generation, rows
+
+
+def global_smells(driver: Any, organization: str, cache_dir: Path | str = DEFAULT_CACHE_DIR,
+                  mode: str = AUTO, pivots: int = PIVOTS) -> dict | None:
+    """Organization smells over the whole period, as a :func:`result_row` with ``team`` empty.
+
+    Reads the same snapshot as :func:`community_smells`, so after it no
+    query is sent to Neo4j other than the generation and membership lookups.
+    """
+    df_edges = CollaborationSnapshot(driver, organization, cache_dir=cache_dir).edges()
+    if df_edges.empty:
+        return None
+    df_edges["created_at"] = pd.to_datetime(df_edges["created_at"], errors="coerce", utc=True)
+    df_edges = label_with_team(df_edges)
+    resultado = analyse_period(edge_array(df_edges, isolated=isolated_people(df_edges)), mode, pivots)
+    return result_row("", df_edges["created_at"].min(), df_edges["created_at"].max(), resultado)
+
+
+def write_results(path: Path | str, organization: str, generation: str | None, rows: list[dict],
+                  global_row: dict | None = None) -> Path:
+    """Save smell results as JSON for the stages that consume them (e.g. the infographic).
+
+    The document holds the ``organization``, the snapshot ``generation``,
+    the whole-period organization result as ``global`` and the ``results``
+    rows (see :func:`result_row`), with dates in ISO format.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {"organization": organization, "generation": generation, "global": global_row, "results": rows}
+    path.write_text(json.dumps(document, ensure_ascii=False, indent=2, default=_isoformat), encoding="utf-8")
+    return path
+
+
+def read_results(path: Path | str) -> dict:
+    """Load a document written by :func:`write_results`."""
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def _isoformat(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
@@ -0,0 +1,262 @@
+"""Chunked export of query results to Parquet, or CSV as a fallback.
+
+Records are consumed as they arrive from Bolt and written ``chunk_rows`` at
+a time, as Arrow record batches into a compressed Parquet file, so memory
+stays bounded by one chunk whatever the size of the export. CSV is written
+when asked for (``fmt="csv"``) or when pyarrow is not installed.
+
+Without an explicit ``schema`` the Parquet schema is inferred from the
+first chunk and promoted when a later chunk does not fit it: null types
+(including the items of empty lists and struct fields) take the type of
+their first values, integers widen to floats and anything else to text.
+The rows written before a promotion stay in their own part file, and the
+parts are merged batch by batch under the final schema when the export
+ends, so pass ``schema`` when the types are known to skip the merge.
+Columns mixing types within a chunk are written as text. Neo4j temporal
+values are written in ISO format and NaN as null.
+"""
+
+import logging
+import os
+from collections.abc import Iterable, Iterator, Mapping
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PARQUET = "parquet"
+CSV = "csv"
+FORMATS = (PARQUET, CSV)
+
+DEFAULT_FORMAT = os.getenv("REPORT_EXPORT_FORMAT", PARQUET)
+COMPRESSION = "zstd"
+CHUNK_ROWS = 10000
+
+
+def _pyarrow():
+    """``(pyarrow, pyarrow.parquet)``, or ``None`` when pyarrow is not installed."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+    return pa, pq
+
+
+def _plain(value: Any) -> Any:
+    # neo4j.time.* expõem iso_format(); datetime/date do Python, isoformat()
+    if hasattr(value, "iso_format"):
+        return value.iso_format()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, float) and value != value:  # NaN/NaT vindos do pandas
+        return None
+    return value
+
+
+def chunks(records: Iterable[Mapping], chunk_rows: int = CHUNK_ROWS) -> Iterator[list[dict]]:
+    """Lists of up to ``chunk_rows`` plain dicts, consuming ``records`` lazily."""
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows must be positive")
+    records = iter(records)
+    while chunk := [{k: _plain(v) for k, v in r.items()} for r in islice(records, chunk_rows)]:
+        yield chunk
+
+
+def _text(pa, values: list) -> Any:
+    return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def _infer(pa, rows: list[dict]) -> Any:
+    """Record batch of ``rows`` with inferred types; a column that fits no single type becomes text."""
+    names = list(dict.fromkeys(k for r in rows for k in r))
+    arrays = []
+    for name in names:
+        values = [r.get(name) for r in rows]
+        try:
+            arrays.append(pa.array(values))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays.append(_text(pa, values))
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def _fields(pa, type_: Any) -> list:
+    return [type_.field(i) for i in range(type_.num_fields)]
+
+
+def _promote(pa, current: Any, incoming: Any) -> Any:
+    """Narrowest type holding values of both ``current`` and ``incoming``."""
+    if current == incoming or pa.types.is_null(incoming):
+        return current
+    if pa.types.is_null(current):
+        return incoming
+    if pa.types.is_integer(current) and pa.types.is_floating(incoming):
+        return incoming
+    if pa.types.is_floating(current) and pa.types.is_integer(incoming):
+        return current
+    # Listas vazias chegam como list<null> e structs parciais sem alguns campos
+    if pa.types.is_list(current) and pa.types.is_list(incoming):
+        return pa.list_(_promote(pa, current.value_type, incoming.value_type))
+    if pa.types.is_struct(current) and pa.types.is_struct(incoming):
+        return pa.struct(_merge(pa, _fields(pa, current), _fields(pa, incoming)))
+    return pa.string()
+
+
+def _merge(pa, fields: list, incoming: list) -> list:
+    types = {f.name: f.type for f in incoming}
+    merged = [f.with_type(_promote(pa, f.type, types[f.name])) if f.name in types else f for f in fields]
+    names = {f.name for f in fields}
+    return merged + [f for f in incoming if f.name not in names]
+
+
+def _unify(pa, schema: Any, incoming: Any) -> Any:
+    return pa.schema(_merge(pa, list(schema), list(incoming)))
+
+
+def _cast(pa, array: Any, type_: Any) -> Any:
+    """``array`` cast to ``type_``, recursing into lists and structs; text when the types do not convert."""
+    if array.type == type_:
+        return array
+    try:
+        if pa.types.is_list(type_) and pa.types.is_list(array.type):
+            return pa.ListArray.from_arrays(array.offsets, _cast(pa, array.values, type_.value_type),
+                                            mask=array.is_null())
+        if pa.types.is_struct(type_) and pa.types.is_struct(array.type):
+            names = {array.type.field(i).name for i in range(array.type.num_fields)}
+            children = [_cast(pa, array.field(f.name), f.type) if f.name in names else pa.nulls(len(array), f.type)
+                        for f in _fields(pa, type_)]
+            return pa.StructArray.from_arrays(children, fields=_fields(pa, type_), mask=array.is_null())
+        return array.cast(type_)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        if not pa.types.is_string(type_):
+            raise
+        return _text(pa, array.to_pylist())
+
+
+def _conform(pa, columns: dict, schema: Any, num_rows: int) -> Any:
+    """Record batch of ``columns`` (name → Arrow array) cast to ``schema``."""
+    arrays = []
+    for field in schema:
+        array = columns.get(field.name)
+        arrays.append(pa.nulls(num_rows, type=field.type) if array is None else _cast(pa, array, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _columns(batch: Any) -> dict:
+    return dict(zip(batch.schema.names, batch.columns))
+
+
+def _merge_parts(pa, pq, parts: list[Path], path: Path, schema: Any, compression: str) -> None:
+    """Concatenate ``parts`` into ``path`` under ``schema``, one record batch at a time."""
+    if len(parts) == 1:
+        parts[0].replace(path)
+        return
+    with pq.ParquetWriter(path, schema, compression=compression) as writer:
+        for part in parts:
+            for batch in pq.ParquetFile(part).iter_batches():
+                writer.write_batch(_conform(pa, _columns(batch), schema, batch.num_rows))
+            part.unlink()
+
+
+def _write_parquet(pa, pq, batches: Iterator[list[dict]], path: Path, compression: str, schema,
+                   columns: list[str] | None) -> int:
+    total, writer, parts = 0, None, []
+    inferred = schema is None
+    try:
+        for rows in batches:
+            if not inferred:
+                batch = pa.RecordBatch.from_pylist(rows, schema=schema)
+            else:
+                batch = _infer(pa, rows)
+                if schema is None:
+                    schema = batch.schema
+                elif (unified := _unify(pa, schema, batch.schema)) != schema:
+                    # O bloco não cabe no esquema: fecha a parte atual e segue numa nova, unidas no fim
+                    logger.info(f"Promoting the schema of {path} after {total} rows: {unified}")
+                    writer.close()
+                    writer, schema = None, unified
+                batch = _conform(pa, _columns(batch), schema, batch.num_rows)
+            if writer is None:
+                parts.append(path.with_name(f".{path.name}.part{len(parts)}"))
+                writer = pq.ParquetWriter(parts[-1], schema, compression=compression)
+            writer.write_batch(batch)
+            total += len(rows)
+        if writer is None:
+            # Exportação vazia: só o esquema, com as colunas conhecidas
+            schema = schema or pa.schema([(c, pa.string()) for c in columns or []])
+            parts.append(path.with_name(f".{path.name}.part0"))
+            writer = pq.ParquetWriter(parts[-1], schema, compression=compression)
+        writer.close()
+        writer = None
+        _merge_parts(pa, pq, parts, path, schema, compression)
+    finally:
+        if writer is not None:
+            writer.close()
+        for part in parts:
+            part.unlink(missing_ok=True)
+    return total
+
+
+def _write_csv(batches: Iterator[list[dict]], path: Path, columns: list[str] | None) -> int:
+    total = 0
+    for rows in batches:
+        pd.DataFrame(rows, columns=columns).to_csv(
+            path, mode="w" if total == 0 else "a", header=total == 0, index=False, encoding="utf-8"
+        )
+        columns = columns or list(rows[0])
+        total += len(rows)
+    if total == 0:
+        pd.DataFrame(columns=columns).to_csv(path, index=False, encoding="utf-8")
+    return total
+
+
+def write_records(records: Iterable[Mapping], path: Path | str, fmt: str = DEFAULT_FORMAT,
+                  chunk_rows: int = CHUNK_ROWS, compression: str = COMPRESSION,
+                  schema: Any = None, columns: list[str] | None = None) -> tuple[Path, int]:
+    """Write ``records`` chunk by chunk to ``path`` with the suffix of the format used.
+
+    Args:
+    ----
+        records (Iterable[Mapping]): Rows, e.g. ``record.data()`` of a Bolt result.
+        path (Path | str): Output file; its suffix is replaced by ``.parquet`` or ``.csv``.
+        fmt (str): ``"parquet"`` or ``"csv"``; Parquet falls back to CSV without pyarrow.
+        chunk_rows (int): Rows per record batch (and per CSV append).
+        compression (str): Parquet codec.
+        schema (pyarrow.Schema): Parquet schema, inferred (and promoted) from the chunks when omitted.
+        columns (list[str]): CSV column order, and the columns of an empty export.
+
+    Returns
+    -------
+        tuple: The path written and the number of rows.
+
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {', '.join(FORMATS)})")
+
+    arrow = _pyarrow() if fmt == PARQUET else None
+    if fmt == PARQUET and arrow is None:
+        logger.warning("pyarrow is not installed, exporting as CSV")
+        fmt = CSV
+
+    path = Path(path).with_suffix(f".{fmt}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    batches = chunks(records, chunk_rows)
+    if fmt == PARQUET:
+        total = _write_parquet(*arrow, batches, path, compression, schema, columns)
+    else:
+        total = _write_csv(batches, path, columns)
+    logger.info(f"Exported {total} rows to {path}")
+    return path, total
+
+
+def export_query(driver: Any, query: str, path: Path | str, params: dict | None = None,
+                 **kwargs) -> tuple[Path, int]:
+    """Stream the records of ``query`` into ``path``, see :func:`write_records`."""
+    with driver.session() as session:
+        result = session.run(query, **(params or {}))
+        return write_records((record.data() for record in result), path, **kwargs)
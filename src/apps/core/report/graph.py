@@ -0,0 +1,131 @@
+"""Vectorized construction of the collaboration graphs used by the smell analyses."""
+
+from collections.abc import Iterable
+from typing import NamedTuple
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+SYMMETRIC = ("CO_COMMIT_IN", "CO_ASSIGNED")
+ISOLATED = "ISOLATED"
+
+
+def _with_team(names: pd.Series, teams: pd.Series, keep: pd.Series) -> pd.Series:
+    """Append ``" (team)"`` to the names where ``keep`` is true."""
+    return names.where(~keep, names + " (" + teams + ")")
+
+
+def _truthy(column: pd.Series) -> pd.Series:
+    return column.notna() & (column != "")
+
+
+def label_with_team(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of the edge list with ``source``/``target`` labelled as ``"name (team)"``.
+
+    People without a team keep their bare name, as do targets without a name.
+    """
+    df = df.copy()
+    df["source"] = _with_team(df["source"], df["team1"], _truthy(df["team1"]))
+    df["target"] = _with_team(
+        df["target"], df["team2"], _truthy(df["target"]) & _truthy(df["team2"])
+    )
+    return df
+
+
+def _interleave(first: pd.DataFrame, second: pd.DataFrame) -> pd.DataFrame:
+    """Merge two frames sharing an index, keeping row order with ``first`` before ``second``."""
+    order = np.argsort(
+        np.concatenate([first.index.to_numpy() * 2, second.index.to_numpy() * 2 + 1]), kind="stable"
+    )
+    return pd.DataFrame({
+        column: np.concatenate([first[column].to_numpy(object), second[column].to_numpy(object)])[order]
+        for column in first.columns
+    })
+
+
+def roles_of(df: pd.DataFrame) -> dict[str, str]:
+    """Map each labelled node to its role; the last row mentioning a node wins."""
+    df = df.reset_index(drop=True)
+    sources = df[["source", "role1"]].set_axis(["node", "role"], axis=1)
+    targets = df[["target", "role2"]].set_axis(["node", "role"], axis=1)
+    targets = targets[_truthy(targets["node"])]
+    pairs = _interleave(sources, targets)
+    pairs = pairs[_truthy(pairs["role"])]
+    pairs = pairs[~pairs["node"].duplicated(keep="last")]
+    return dict(zip(pairs["node"], pairs["role"]))
+
+
+def edge_list(df: pd.DataFrame, extra: Iterable[str] = ()) -> pd.DataFrame:
+    """Directed ``source``/``target``/``relation`` rows for a labelled edge list.
+
+    Symmetric relations (co-commit, co-assignment) yield both directions,
+    ``ISOLATED`` rows yield none and every other relation is kept as is.
+    The original row order is preserved. ``extra`` columns (e.g.
+    ``created_at``) are carried along.
+    """
+    df = df.reset_index(drop=True)
+    extra = list(extra)
+    connected = df[df["relation"] != ISOLATED]
+    forward = connected[["source", "target", "relation", *extra]]
+    symmetric = connected[connected["relation"].isin(SYMMETRIC)]
+    backward = symmetric[["target", "source", "relation", *extra]].set_axis(forward.columns, axis=1)
+    return _interleave(forward, backward)
+
+
+class EdgeArray(NamedTuple):
+    """Compact form of a collaboration graph, cheap to send to worker processes."""
+
+    nodes: np.ndarray  # node labels, in insertion order
+    edges: np.ndarray  # (n, 2) int32 node codes of the distinct directed edges
+    roles: np.ndarray  # role of each node, None when unknown
+
+
+def edge_array(df: pd.DataFrame, isolated: Iterable[str] = ()) -> EdgeArray:
+    """Reduce a labelled edge list to node codes.
+
+    Args:
+    ----
+        df (DataFrame): Rows with ``source``, ``target``, ``relation``, ``role1`` and ``role2``.
+        isolated (Iterable[str]): Extra nodes to include even without edges.
+
+    """
+    edges = edge_list(df)
+
+    # Nodes in order of first appearance, as repeated add_edge calls would insert them
+    ends = np.column_stack([edges["source"].to_numpy(object), edges["target"].to_numpy(object)]).ravel()
+    lone = df.loc[df["relation"] == ISOLATED, "source"].to_numpy(object)
+    extra = np.asarray(list(isolated), dtype=object)
+    codes, nodes = pd.factorize(np.concatenate([ends, lone, extra]))
+    codes = codes[: len(ends)].reshape(-1, 2)
+
+    # One edge per (source, target)
+    keys = pd.Series(codes[:, 0].astype(np.int64) * max(len(nodes), 1) + codes[:, 1])
+    codes = codes[~keys.duplicated().to_numpy()].astype(np.int32)
+
+    roles = roles_of(df)
+    return EdgeArray(
+        nodes=np.asarray(nodes, dtype=object),
+        edges=codes,
+        roles=np.array([roles.get(n) for n in nodes], dtype=object),
+    )
+
+
+def to_graph(edges: EdgeArray) -> tuple[nx.DiGraph, dict[str, str]]:
+    """Rebuild the directed graph and the node → role map of an :class:`EdgeArray`."""
+    G = nx.DiGraph()
+    G.add_nodes_from(edges.nodes)
+    G.add_edges_from(zip(edges.nodes[edges.edges[:, 0]], edges.nodes[edges.edges[:, 1]]))
+    roles = {n: r for n, r in zip(edges.nodes, edges.roles) if r}
+    return G, roles
+
+
+def build_graph(df: pd.DataFrame, isolated: Iterable[str] = ()) -> tuple[nx.DiGraph, dict[str, str]]:
+    """Build the directed collaboration graph of a labelled edge list.
+
+    Returns
+    -------
+        tuple: The graph and the node → role map.
+
+    """
+    return to_graph(edge_array(df, isolated))
@@ -0,0 +1,181 @@
+"""Run the report stages as a DAG, skipping the ones whose inputs did not change.
+
+A :class:`Stage` reads the files produced by its dependencies and writes its
+own artifacts under the pipeline directory. Its key is the SHA-256 of its
+name, ``version``, optional ``fingerprint`` (for inputs outside the pipeline,
+e.g. the graph generation) and the content hashes of its dependencies'
+artifacts. When a stage's key matches the last run and its artifacts are
+intact (or can be restored from the content-addressed store), it is skipped;
+a stage that re-runs but produces the same content does not invalidate its
+dependents.
+"""
+
+import hashlib
+import json
+import logging
+import shutil
+import time
+from collections.abc import Callable, Iterable
+from graphlib import CycleError, TopologicalSorter
+from pathlib import Path
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+RAN = "ran"
+SKIPPED = "skipped"
+
+
+class Stage(NamedTuple):
+    """One step of the pipeline.
+
+    ``run(inputs, out_dir)`` receives ``{dependency: {artifact: path}}`` and
+    returns its own ``{artifact: path}``, written under ``out_dir``. Stages
+    with ``cache=False`` (e.g. syncing external data) always run; their
+    dependents are still skipped when the artifacts come out the same.
+    """
+
+    name: str
+    run: Callable[[dict[str, dict[str, Path]], Path], dict[str, Path]]
+    deps: tuple[str, ...] = ()
+    fingerprint: Callable[[], str] | None = None
+    version: str = "1"
+    cache: bool = True
+
+
+class StageRun(NamedTuple):
+    """Outcome of a stage in a pipeline run."""
+
+    name: str
+    status: str
+    seconds: float
+    key: str
+
+
+def file_hash(path: Path | str) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Pipeline:
+    """Ordered, cached execution of :class:`Stage` objects.
+
+    Args:
+    ----
+        stages (Iterable[Stage]): The stages; dependencies must be among them.
+        work_dir (Path | str): Artifacts (one directory per stage), manifests and the object store.
+
+    """
+
+    def __init__(self, stages: Iterable[Stage], work_dir: Path | str) -> None:
+        self.stages = {stage.name: stage for stage in stages}
+        self.work_dir = Path(work_dir)
+        for stage in self.stages.values():
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {', '.join(missing)}")
+        try:
+            self.order = list(TopologicalSorter({s.name: s.deps for s in self.stages.values()}).static_order())
+        except CycleError as e:
+            raise ValueError(f"Pipeline stages have a cycle: {e.args[1]}") from e
+
+    def _manifest_path(self, name: str) -> Path:
+        return self.work_dir / "manifests" / f"{name}.json"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.work_dir / "objects" / digest[:2] / digest
+
+    def _manifest(self, name: str) -> dict | None:
+        path = self._manifest_path(name)
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+    def _key(self, stage: Stage, hashes: dict[str, dict[str, str]]) -> str:
+        payload = {
+            "stage": stage.name,
+            "version": stage.version,
+            "fingerprint": stage.fingerprint() if stage.fingerprint else None,
+            "inputs": {dep: hashes[dep] for dep in stage.deps},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _restore(self, manifest: dict) -> dict[str, Path] | None:
+        """Artifacts of a previous run, copied back from the object store when missing or changed."""
+        artifacts = {}
+        for artifact, entry in manifest["artifacts"].items():
+            path = Path(entry["path"])
+            if not (path.exists() and file_hash(path) == entry["sha256"]):
+                stored = self._object_path(entry["sha256"])
+                if not stored.exists():
+                    return None
+                path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(stored, path)
+            artifacts[artifact] = path
+        return artifacts
+
+    def _store(self, name: str, key: str, artifacts: dict[str, Path]) -> dict[str, str]:
+        entries = {}
+        for artifact, path in artifacts.items():
+            digest = file_hash(path)
+            stored = self._object_path(digest)
+            if not stored.exists():
+                stored.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(path, stored)
+            entries[artifact] = {"path": str(path), "sha256": digest}
+        manifest = self._manifest_path(name)
+        manifest.parent.mkdir(parents=True, exist_ok=True)
+        manifest.write_text(json.dumps({"key": key, "artifacts": entries}, indent=2), encoding="utf-8")
+        return {artifact: entry["sha256"] for artifact, entry in entries.items()}
+
+    def selected(self, targets: Iterable[str] | None = None) -> list[str]:
+        """Stages needed for ``targets`` (all by default), in execution order."""
+        if targets is None:
+            return list(self.order)
+        needed, pending = set(), list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.stages[name].deps)
+        return [name for name in self.order if name in needed]
+
+    def run(self, targets: Iterable[str] | None = None, force: Iterable[str] = ()) -> list[StageRun]:
+        """Run the stages needed for ``targets``, skipping unchanged ones unless in ``force``.
+
+        Returns
+        -------
+            list[StageRun]: Status, duration and key of each stage, in execution order.
+
+        """
+        force = set(force)
+        paths: dict[str, dict[str, Path]] = {}
+        hashes: dict[str, dict[str, str]] = {}
+        runs = []
+        for name in self.selected(targets):
+            stage = self.stages[name]
+            started = time.perf_counter()
+            key = self._key(stage, hashes)
+            manifest = self._manifest(name)
+
+            artifacts = None
+            if stage.cache and name not in force and manifest is not None and manifest["key"] == key:
+                artifacts = self._restore(manifest)
+            if artifacts is not None:
+                status = SKIPPED
+                hashes[name] = {a: e["sha256"] for a, e in manifest["artifacts"].items()}
+            else:
+                status = RAN
+                out_dir = self.work_dir / name
+                out_dir.mkdir(parents=True, exist_ok=True)
+                artifacts = {a: Path(p) for a, p in stage.run({d: paths[d] for d in stage.deps}, out_dir).items()}
+                hashes[name] = self._store(name, key, artifacts)
+
+            paths[name] = artifacts
+            runs.append(StageRun(name, status, time.perf_counter() - started, key))
+            logger.info(f"Stage {name}: {status} in {runs[-1].seconds:.2f}s")
+        return runs
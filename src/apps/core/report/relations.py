@@ -0,0 +1,459 @@
+"""Derivation of the collaboration relationships used by the community smell reports.
+
+The relationships (``COORDINATES``, ``SELF_COORDINATES``, ``CO_ASSIGNED``,
+``CO_COMMIT_IN`` and ``ISOLATED``) are derived from pull requests and
+development tasks. Each derived relationship is keyed by the id of the
+pull request or task it came from, so only the sources written since the
+last run need to be recomputed.
+
+Pairwise relationships (co-commit, co-assignment) first collect the
+distinct people of each source and then pair them, so the work grows with
+the number of people per source and not with the number of commits.
+
+A group's watermark only moves when it had sources to re-derive, and each
+group keeps a hash of the relationships it holds (``derived_hash_<group>``).
+The snapshot generation is built from those hashes (see :func:`generation`),
+so a sync that re-writes the same sources leaves it unchanged.
+"""
+
+import hashlib
+import json
+import logging
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+PR = "pr"
+TASK = "task"
+ISOLATED = "isolated"
+
+GROUPS = (PR, TASK, ISOLATED)
+
+CONFIG_LABEL = "Config_RelationDerivation"
+WATERMARK_PREFIX = "last_derived_at_"
+HASH_PREFIX = "derived_hash_"
+ROLES_WATERMARK = "roles_synced_at"
+
+
+class Derivation(NamedTuple):
+    """A derived relationship and the query that builds it for one source node."""
+
+    name: str
+    group: str
+    source: str  # label of the node the relationship is derived from
+    rel_type: str
+    via: str
+    key: str  # relationship property holding the source id
+    body: str  # runs with `src` bound to the source node, must RETURN qtd
+
+
+DERIVATIONS = [
+    # ==============================================================
+    # PULL REQUESTS
+    # ==============================================================
+    Derivation("pr_assignee", PR, "pullrequest", "COORDINATES", "pr_assignee", "pr_id", """
+    MATCH (creator:person {organization:$organization})<-[:created_by]-(src)-[:assigned_to]->(assignee:person {organization:$organization})
+    WHERE creator <> assignee
+    MERGE (creator)-[r:COORDINATES {via:"pr_assignee", pr_id:src.id}]->(assignee)
+    SET r.created_at = src.created_at,
+        r.ended_at   = src.merged_at,
+        r.html_url   = src.html_url,
+        r.title      = src.title
+    RETURN count(r) AS qtd
+    """),
+
+    Derivation("pr_self", PR, "pullrequest", "SELF_COORDINATES", "pr_self", "pr_id", """
+    MATCH (creator:person {organization:$organization})<-[:created_by]-(src)-[:assigned_to]->(assignee:person {organization:$organization})
+    WHERE creator = assignee
+    MERGE (creator)-[r:SELF_COORDINATES {via:"pr_self", pr_id:src.id}]->(creator)
+    SET r.created_at = src.created_at,
+        r.ended_at   = src.merged_at,
+        r.html_url   = src.html_url,
+        r.title      = src.title
+    RETURN count(r) AS qtd
+    """),
+
+    Derivation("pr_no_assignee", PR, "pullrequest", "SELF_COORDINATES", "pr_no_assignee", "pr_id", """
+    MATCH (creator:person {organization:$organization})<-[:created_by]-(src)
+    WHERE NOT (src)-[:assigned_to]->(:person {organization:$organization})
+    MERGE (creator)-[r:SELF_COORDINATES {via:"pr_no_assignee", pr_id:src.id}]->(creator)
+    SET r.created_at = src.created_at,
+        r.ended_at   = src.merged_at,
+        r.html_url   = src.html_url,
+        r.title      = src.title
+    RETURN count(r) AS qtd
+    """),
+
+    Derivation("co_assigned_pr", PR, "pullrequest", "CO_ASSIGNED", "pr", "pr_id", """
+    MATCH (src)-[:assigned_to]->(a:person {organization:$organization})
+    WITH src, collect(DISTINCT a) AS assignees
+    UNWIND assignees AS a1
+    UNWIND assignees AS a2
+    WITH src, a1, a2
+    WHERE a1 <> a2
+    MERGE (a1)-[r:CO_ASSIGNED {via:"pr", pr_id:src.id}]->(a2)
+    SET r.created_at = src.created_at,
+        r.ended_at   = src.merged_at,
+        r.html_url   = src.html_url,
+        r.title      = src.title
+    RETURN count(r) AS qtd
+    """),
+
+    Derivation("pr_review", PR, "pullrequest", "COORDINATES", "pr_review", "pr_id", """
+    MATCH (creator:person {organization:$organization})<-[:created_by]-(src)-[:reviewed_by]->(reviewer:person {organization:$organization})
+    WHERE creator <> reviewer
+    MERGE (creator)-[r:COORDINATES {via:"pr_review", pr_id:src.id}]->(reviewer)
+    SET r.created_at = src.created_at,
+        r.ended_at   = src.merged_at,
+        r.html_url   = src.html_url,
+        r.title      = src.title
+    RETURN count(r) AS qtd
+    """),
+
+    Derivation("pr_commits", PR, "pullrequest", "CO_COMMIT_IN", "pr_commits", "pr_id", """
+    MATCH (src)<-[:committed_in]-(:commit)-[:created_by]->(p:person {organization:$organization})
+    WITH src, collect(DISTINCT p) AS autores
+    UNWIND autores AS p1
+    UNWIND autores AS p2
+    WITH src, p1, p2
+    WHERE p1 <> p2
+    MERGE (p1)-[r:CO_COMMIT_IN {via:"pr_commits", pr_id:src.id}]->(p2)
+    SET r.created_at = src.created_at,
+        r.ended_at   = src.merged_at,
+        r.html_url   = src.html_url,
+        r.title      = src.title
+    RETURN count(r) AS qtd
+    """),
+
+    # ==============================================================
+    # TASKS
+    # ==============================================================
+    Derivation("task_assignee", TASK, "developmenttask", "COORDINATES", "task_assignee", "task_id", """
+    MATCH (creator:person {organization:$organization})<-[:created_by]-(src)-[:assigned_to]->(assignee:person {organization:$organization})
+    WHERE creator <> assignee
+    MERGE (creator)-[r:COORDINATES {via:"task_assignee", task_id:src.id}]->(assignee)
+    SET r.created_at = src.created_at,
+        r.ended_at   = src.closed_at,
+        r.html_url   = src.html_url,
+        r.title      = src.title
+    RETURN count(r) AS qtd
+    """),
+
+    Derivation("task_self", TASK, "developmenttask", "SELF_COORDINATES", "task_self", "task_id", """
+    MATCH (creator:person {organization:$organization})<-[:created_by]-(src)-[:assigned_to]->(assignee:person {organization:$organization})
+    WHERE creator = assignee
+    MERGE (creator)-[r:SELF_COORDINATES {via:"task_self", task_id:src.id}]->(creator)
+    SET r.created_at = src.created_at,
+        r.ended_at   = src.closed_at,
+        r.html_url   = src.html_url,
+        r.title      = src.title
+    RETURN count(r) AS qtd
+    """),
+
+    Derivation("task_no_assignee", TASK, "developmenttask", "SELF_COORDINATES", "task_no_assignee", "task_id", """
+    MATCH (creator:person {organization:$organization})<-[:created_by]-(src)
+    WHERE NOT (src)-[:assigned_to]->(:person {organization:$organization})
+    MERGE (creator)-[r:SELF_COORDINATES {via:"task_no_assignee", task_id:src.id}]->(creator)
+    SET r.created_at = src.created_at,
+        r.ended_at   = src.closed_at,
+        r.html_url   = src.html_url,
+        r.title      = src.title
+    RETURN count(r) AS qtd
+    """),
+
+    Derivation("co_assigned_task", TASK, "developmenttask", "CO_ASSIGNED", "task", "task_id", """
+    MATCH (src)-[:assigned_to]->(a:person {organization:$organization})
+    WITH src, collect(DISTINCT a) AS assignees
+    UNWIND assignees AS a1
+    UNWIND assignees AS a2
+    WITH src, a1, a2
+    WHERE a1 <> a2
+    MERGE (a1)-[r:CO_ASSIGNED {via:"task", task_id:src.id}]->(a2)
+    SET r.created_at = src.created_at,
+        r.ended_at   = src.closed_at,
+        r.html_url   = src.html_url,
+        r.title      = src.title
+    RETURN count(r) AS qtd
+    """),
+
+    # ==============================================================
+    # ISOLATED
+    # ==============================================================
+    Derivation("isolated_commits", ISOLATED, "pullrequest", "ISOLATED", "commit", "obj_id", """
+    MATCH (p:person {organization:$organization})<-[:created_by]-(:commit)-[:committed_in]->(src)
+    WITH src, collect(DISTINCT p) AS autores
+    WHERE size(autores) = 1
+    UNWIND autores AS isolado
+    MERGE (isolado)-[r:ISOLATED {via:"commit", obj_id:src.id}]->(isolado)
+    SET r.created_at = src.created_at,
+        r.ended_at   = src.merged_at,
+        r.html_url   = src.html_url,
+        r.title      = src.title
+    RETURN count(r) AS qtd
+    """),
+
+    Derivation("isolated_prs", ISOLATED, "pullrequest", "ISOLATED", "pr", "obj_id", """
+    MATCH (creator:person {organization:$organization})<-[:created_by]-(src)
+    OPTIONAL MATCH (src)-[:assigned_to]->(assignee:person {organization:$organization})
+    OPTIONAL MATCH (src)-[:reviewed_by]->(reviewer:person {organization:$organization})
+    WITH src, collect(DISTINCT creator) + collect(DISTINCT assignee) + collect(DISTINCT reviewer) AS envolvidos
+    WHERE size(envolvidos) = 1
+    UNWIND envolvidos AS isolado
+    MERGE (isolado)-[r:ISOLATED {via:"pr", obj_id:src.id}]->(isolado)
+    SET r.created_at = src.created_at,
+        r.ended_at   = src.merged_at,
+        r.html_url   = src.html_url,
+        r.title      = src.title
+    RETURN count(r) AS qtd
+    """),
+
+    Derivation("isolated_tasks", ISOLATED, "developmenttask", "ISOLATED", "task", "obj_id", """
+    MATCH (src)<-[:created_by]-(creator:person {organization:$organization})
+    OPTIONAL MATCH (src)-[:assigned_to]->(assignee:person {organization:$organization})
+    WITH src, collect(DISTINCT creator) + collect(DISTINCT assignee) AS pessoas
+    WHERE size(pessoas) = 1
+    UNWIND pessoas AS isolado
+    MERGE (isolado)-[r:ISOLATED {via:"task", obj_id:src.id}]->(isolado)
+    SET r.created_at = src.created_at,
+        r.ended_at   = src.ended_at,
+        r.title      = src.title
+    RETURN count(r) AS qtd
+    """),
+]
+
+CHANGED_SOURCES = """
+MATCH (src:`{label}`)
+WHERE $since IS NULL OR src.created_node_at >= $since
+RETURN collect(src.id) AS ids
+"""
+
+DELETE_ALL = """
+MATCH (:person {{organization:$organization}})-[r:{rel_type} {{via:$via}}]->(:person)
+CALL {{
+  WITH r
+  DELETE r
+}} IN TRANSACTIONS OF $batch_size ROWS
+"""
+
+DELETE_CHANGED = """
+UNWIND $ids AS id
+CALL {{
+  WITH id
+  MATCH (a:person)-[r:{rel_type} {{{key}:id}}]->(:person)
+  WHERE r.via = $via AND a.organization = $organization
+  DELETE r
+}} IN TRANSACTIONS OF $batch_size ROWS
+"""
+
+SOURCES_STATE = """
+MATCH (src:`{label}`)
+RETURN count(src) AS total, max(src.created_node_at) AS last
+"""
+
+DERIVED_EDGES = """
+MATCH (a:person {{organization:$organization}})-[r:{rel_type} {{via:$via}}]->(b:person)
+RETURN a.id AS source, b.id AS target, properties(r) AS props
+"""
+
+MERGE_CHANGED = """
+UNWIND $ids AS id
+CALL {{
+  WITH id
+  MATCH (src:`{label}` {{id:id}})
+  {body}
+}} IN TRANSACTIONS OF $batch_size ROWS
+RETURN sum(qtd) AS qtd
+"""
+
+
+def generation(config: Mapping[str, Any]) -> str | None:
+    """Generation of the derived relationships from the properties of the config node.
+
+    Hash of the per-group content hashes and of the roles watermark, or
+    None when no group was ever derived.
+    """
+    hashes = {k: v for k, v in config.items() if k.startswith(HASH_PREFIX) and v}
+    if not hashes:
+        return None
+    payload = json.dumps([hashes, config.get(ROLES_WATERMARK)], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class RelationDerivation:
+    """Recompute the derived collaboration relationships of an organization.
+
+    Args:
+    ----
+        driver: Neo4j driver (``neo4j.GraphDatabase.driver``).
+        organization (str): Value of ``person.organization`` to derive for.
+        batch_size (int): Rows committed per transaction.
+
+    """
+
+    def __init__(self, driver: Any, organization: str, batch_size: int = 1000) -> None:
+        if not organization:
+            raise ValueError("organization is required to derive relations")
+        self.driver = driver
+        self.organization = organization
+        self.batch_size = batch_size
+
+    def ensure_indexes(self) -> None:
+        """Create the indexes used to find sources and their derived relationships."""
+        statements = set()
+        for derivation in DERIVATIONS:
+            statements.add(
+                f"CREATE INDEX {derivation.source}_id IF NOT EXISTS "
+                f"FOR (n:`{derivation.source}`) ON (n.id)"
+            )
+            statements.add(
+                f"CREATE INDEX {derivation.source}_created_node_at IF NOT EXISTS "
+                f"FOR (n:`{derivation.source}`) ON (n.created_node_at)"
+            )
+            statements.add(
+                f"CREATE INDEX {derivation.rel_type.lower()}_{derivation.key} IF NOT EXISTS "
+                f"FOR ()-[r:{derivation.rel_type}]-() ON (r.{derivation.key})"
+            )
+        with self.driver.session() as session:
+            for statement in sorted(statements):
+                session.run(statement).consume()
+
+    def config(self) -> dict[str, Any]:
+        """Properties of the config node of the organization (watermarks and hashes)."""
+        with self.driver.session() as session:
+            record = session.run(
+                f"MATCH (c:{CONFIG_LABEL} {{id:$organization}}) RETURN properties(c) AS props",
+                organization=self.organization,
+            ).single()
+        return dict(record["props"]) if record and record["props"] else {}
+
+    def last_run(self) -> dict[str, str]:
+        """Return the watermark of each group, keyed by group name."""
+        props = self.config()
+        return {group: props.get(f"{WATERMARK_PREFIX}{group}") for group in GROUPS}
+
+    def sources_state(self) -> dict[str, list]:
+        """Number of source nodes and latest ``created_node_at`` per source label.
+
+        It changes whenever :meth:`run` would find changed sources, so it
+        fingerprints the input of the derivation.
+        """
+        state = {}
+        with self.driver.session() as session:
+            for label in sorted({derivation.source for derivation in DERIVATIONS}):
+                record = session.run(SOURCES_STATE.format(label=label)).single()
+                state[label] = [record["total"], record["last"]] if record else [0, None]
+        return state
+
+    def _save_config(self, props: dict[str, Any]) -> None:
+        with self.driver.session() as session:
+            session.run(
+                f"""
+                MERGE (c:{CONFIG_LABEL} {{id:$organization}})
+                SET c.name = $organization
+                SET c += $props
+                """,
+                organization=self.organization,
+                props=props,
+            ).consume()
+
+    def _group_hash(self, session: Any, group: str) -> str:
+        """Order-independent hash of the relationships derived by a group."""
+        digest = hashlib.sha256()
+        for derivation in DERIVATIONS:
+            if derivation.group != group:
+                continue
+            # Soma dos hashes das arestas: não depende da ordem em que o Neo4j as devolve
+            total, count = 0, 0
+            result = session.run(
+                DERIVED_EDGES.format(rel_type=derivation.rel_type),
+                via=derivation.via, organization=self.organization,
+            )
+            for record in result:
+                row = json.dumps([record["source"], record["target"], record["props"]], sort_keys=True, default=str)
+                total = (total + int(hashlib.sha256(row.encode("utf-8")).hexdigest()[:16], 16)) % (1 << 64)
+                count += 1
+            digest.update(f"{derivation.name}:{count}:{total:016x};".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def _changed_sources(self, session: Any, label: str, since: str | None) -> list:
+        record = session.run(CHANGED_SOURCES.format(label=label), since=since).single()
+        return record["ids"] if record else []
+
+    def run(self, groups: list[str] | None = None, full: bool = False) -> dict[str, int]:
+        """Derive the relationships of the given groups.
+
+        Args:
+        ----
+            groups (list[str]): Any of ``pr``, ``task`` and ``isolated``. Defaults to all.
+            full (bool): Rebuild everything instead of only the sources written
+                since the last run. A group that never ran is always rebuilt.
+
+        Returns:
+        -------
+            dict[str, int]: Number of relationships created or updated per derivation.
+
+        """
+        groups = list(groups or GROUPS)
+        unknown = set(groups) - set(GROUPS)
+        if unknown:
+            raise ValueError(f"Unknown relation groups: {', '.join(sorted(unknown))}")
+
+        started_at = datetime.now().isoformat()
+        config = self.config()
+        watermarks = {} if full else {group: config.get(f"{WATERMARK_PREFIX}{group}") for group in GROUPS}
+        self.ensure_indexes()
+
+        params = {"organization": self.organization, "batch_size": self.batch_size}
+        results = {}
+        touched = set()
+        with self.driver.session() as session:
+            changed = {}
+            for derivation in DERIVATIONS:
+                if derivation.group not in groups:
+                    continue
+
+                since = watermarks.get(derivation.group)
+                cache_key = (derivation.source, since)
+                if cache_key not in changed:
+                    changed[cache_key] = self._changed_sources(session, derivation.source, since)
+                ids = changed[cache_key]
+                if since is not None and not ids:
+                    results[derivation.name] = 0
+                    continue
+                touched.add(derivation.group)
+
+                logger.info(
+                    f"Deriving {derivation.name} for {self.organization}: "
+                    f"{'all' if since is None else len(ids)} sources"
+                )
+                if since is None:
+                    session.run(
+                        DELETE_ALL.format(rel_type=derivation.rel_type),
+                        via=derivation.via, **params,
+                    ).consume()
+                else:
+                    session.run(
+                        DELETE_CHANGED.format(rel_type=derivation.rel_type, key=derivation.key),
+                        ids=ids, via=derivation.via, **params,
+                    ).consume()
+
+                record = session.run(
+                    MERGE_CHANGED.format(label=derivation.source, body=derivation.body),
+                    ids=ids, **params,
+                ).single()
+                results[derivation.name] = record["qtd"] if record else 0
+                logger.info(f"{derivation.name}: {results[derivation.name]} relationships")
+
+            # Só avança a marca (e refaz o hash) dos grupos com algo a derivar
+            props = {}
+            for group in groups:
+                if group in touched or not config.get(f"{HASH_PREFIX}{group}"):
+                    props[f"{HASH_PREFIX}{group}"] = self._group_hash(session, group)
+                if group in touched:
+                    props[f"{WATERMARK_PREFIX}{group}"] = started_at
+
+        if props:
+            self._save_config(props)
+        return results
@@ -0,0 +1,205 @@
+"""Headless rendering of the community smell charts, cached by content hash.
+
+Rendering is a separate, optional stage: the analyses only persist their
+statistics and this module draws them. matplotlib is imported on the first
+chart actually drawn, always with the non-interactive Agg backend, so the
+analyses (and Celery workers) neither need a display nor pay the import.
+
+Each chart is keyed by the SHA-256 of its kind, its data and
+``RENDER_VERSION``; an unchanged chart is copied from the cache instead of
+being redrawn. Bump ``RENDER_VERSION`` when the drawing code changes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+RENDER_VERSION = "2"
+DPI = 300
+DEFAULT_CACHE_DIR = Path(os.getenv("REPORT_CACHE_DIR", "cache")) / "charts"
+
+SMELL_LABELS = {
+    "silos": ("Organizational Silos", "o"),
+    "truck": ("Truck Factor", "s"),
+    "boundary": ("Boundary Spanners", "d"),
+    "bottlenecks": ("Bottleneck Leaders", "^"),
+    "lone": ("Lone Wolves", "x"),
+}
+
+
+def pyplot():
+    """``matplotlib.pyplot`` on the Agg backend, imported on first use."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def content_hash(kind: str, data) -> str:
+    """SHA-256 of a chart's kind, data and the renderer version."""
+    payload = json.dumps({"kind": kind, "version": RENDER_VERSION, "data": data}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ChartCache:
+    """Draw charts into ``cache_dir`` once per content hash and copy them to their destination.
+
+    Args:
+    ----
+        cache_dir (Path | str): Directory of the rendered PNGs.
+
+    """
+
+    def __init__(self, cache_dir: Path | str = DEFAULT_CACHE_DIR) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.drawn = 0
+        self.reused = 0
+
+    def render(self, kind: str, data, destino: Path | str, draw: Callable[[object, Path], None]) -> Path:
+        """Write the chart of ``data`` to ``destino``, calling ``draw(data, path)`` only on a cache miss."""
+        cached = self.cache_dir / f"{kind}-{content_hash(kind, data)}.png"
+        if cached.exists():
+            self.reused += 1
+            logger.info(f"Chart {kind} unchanged, reusing {cached.name}")
+        else:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = cached.with_suffix(".tmp.png")
+            draw(data, tmp)
+            tmp.replace(cached)
+            self.drawn += 1
+
+        destino = Path(destino)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(cached, destino)
+        return destino
+
+
+def _records(df: pd.DataFrame) -> list[dict]:
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+def draw_trend(data: dict, path: Path) -> None:
+    """Line chart of the smell counts over ``data["x"]`` (one series per smell)."""
+    plt = pyplot()
+    df = pd.DataFrame(data["rows"])
+    x = pd.to_datetime(df[data["x"]])
+
+    fig, ax = plt.subplots(figsize=data.get("figsize", (10, 6)))
+    for coluna, (label, marker) in SMELL_LABELS.items():
+        ax.plot(x, df[coluna], marker=marker if data.get("markers", True) else None, label=label)
+    ax.set_title(data["title"])
+    ax.set_xlabel(data["xlabel"])
+    ax.set_ylabel("Quantidade")
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(path, dpi=DPI, format="png")
+    plt.close(fig)
+
+
+def draw_teams(data: dict, path: Path) -> None:
+    """Horizontal bars of the smell counts and size of each team."""
+    plt = pyplot()
+    df_stats = pd.DataFrame(data["rows"]).set_index("team")
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    df_stats.plot(kind="barh", ax=ax)
+    ax.set_title("Community Smells por Time (incluindo tamanho do time)")
+    ax.set_ylabel("Times")
+    ax.set_xlabel("Quantidade")
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.legend(title="Indicadores", loc="upper right")
+    ax.grid(axis="y", linestyle="--", alpha=0.7)
+    fig.tight_layout()
+    fig.savefig(path, dpi=DPI, format="png")
+    plt.close(fig)
+
+
+def trend_chart(cache: ChartCache, df_stats: pd.DataFrame, destino: Path | str, x: str, title: str,
+                xlabel: str, markers: bool = True, figsize: tuple = (10, 6)) -> Path:
+    """Render (or reuse) the trend chart of a per-period stats table."""
+    data = {
+        "rows": _records(df_stats[[x, *SMELL_LABELS]]), "x": x, "title": title,
+        "xlabel": xlabel, "markers": markers, "figsize": list(figsize),
+    }
+    return cache.render("trend", data, destino, draw_trend)
+
+
+def teams_chart(cache: ChartCache, df_stats: pd.DataFrame, destino: Path | str) -> Path:
+    """Render (or reuse) the per-team bar chart of a per-team stats table."""
+    return cache.render("teams", {"rows": _records(df_stats)}, destino, draw_teams)
+
+
+def draw_infographic(data: dict, path: Path) -> None:
+    """Community graph with truck factor, bottleneck and lone wolf people highlighted.
+
+    People are matched by their exact ``"name (team)"`` label.
+    """
+    import matplotlib.patches as mpatches
+    import networkx as nx
+
+    plt = pyplot()
+    G = nx.Graph()
+    for cid, membros in data["comunidades"]:
+        for i in range(len(membros)-1):
+            G.add_edge(membros[i], membros[i+1], comunidade=cid)
+        if len(membros) == 1:  # comunidade isolada
+            G.add_node(membros[0], comunidade=cid)
+
+    truck, bottlenecks, lone = set(data["truck"]), set(data["bottlenecks"]), set(data["lone"])
+    node_colors = []
+    node_sizes = []
+    for n in G.nodes():
+        if n in truck:
+            node_colors.append("red")     # Truck Factor
+            node_sizes.append(1600)
+        elif n in bottlenecks:
+            node_colors.append("orange")  # Bottleneck
+            node_sizes.append(1400)
+        elif n in lone:
+            node_colors.append("gray")    # Lone Wolf
+            node_sizes.append(1200)
+        else:
+            node_colors.append("skyblue") # Normal
+            node_sizes.append(600)
+
+    pos = nx.spring_layout(G, seed=42, k=0.5)
+
+    fig, ax = plt.subplots(figsize=(16, 12))
+    nx.draw_networkx_edges(G, pos, ax=ax, alpha=0.3)
+    nx.draw_networkx_nodes(G, pos, ax=ax, node_color=node_colors, node_size=node_sizes, alpha=0.9)
+    nx.draw_networkx_labels(G, pos, ax=ax, font_size=8, font_family="sans-serif")
+
+    legend_elements = [
+        mpatches.Patch(color="orange", label="Bottleneck Leaders"),
+        mpatches.Patch(color="red", label="Truck Factor"),
+        mpatches.Patch(color="gray", label="Lone Wolf"),
+        mpatches.Patch(color="skyblue", label="Outros membros")
+    ]
+    ax.legend(handles=legend_elements, loc="upper right")
+    ax.set_title("📊 Infográfico de Community Smells\n(Organizational Silos, Truck Factor, Bottlenecks e Lone Wolves)",
+                 fontsize=14, fontweight="bold")
+    ax.axis("off")
+    fig.tight_layout()
+    fig.savefig(path, dpi=DPI, format="png")
+    plt.close(fig)
+
+
+def infographic_chart(cache: ChartCache, comunidades: dict[int, list[str]], truck: list[str],
+                      bottlenecks: list[str], lone: list[str], destino: Path | str) -> Path:
+    """Render (or reuse) the community infographic."""
+    data = {
+        "comunidades": sorted(comunidades.items()),
+        "truck": sorted(truck), "bottlenecks": sorted(bottlenecks), "lone": sorted(lone),
+    }
+    return cache.render("infographic", data, destino, draw_infographic)
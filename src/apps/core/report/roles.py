@@ -0,0 +1,174 @@
+"""Sync of the ``role`` property of person nodes from a role mapping.
+
+The mapping (GitHub login → role) comes from a file, see :func:`roles_from_file`,
+or from the EO memberships, see :func:`roles_from_eo`. :func:`sync_roles`
+applies all of it in one ``UNWIND`` statement, only to the people present in
+the organization and writing only the roles that changed, and returns the
+diff. When a role changes it also bumps the roles watermark, so the
+collaboration snapshot (whose rows carry the roles) gets a new generation.
+"""
+
+import csv
+import json
+import logging
+from collections.abc import Mapping
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from .relations import CONFIG_LABEL, ROLES_WATERMARK
+
+logger = logging.getLogger(__name__)
+
+QUERY_SYNC = """
+UNWIND $rows AS row
+MATCH (p:person {id: row.login})-[:present_in]->(:Organization {id: $organization})
+WITH DISTINCT p, row, p.role AS before
+FOREACH (_ IN CASE WHEN before IS NULL OR before <> row.role THEN [1] ELSE [] END |
+    SET p.role = row.role
+)
+RETURN row.login AS login, before, row.role AS after
+"""
+
+QUERY_CURRENT = """
+UNWIND $rows AS row
+MATCH (p:person {id: row.login})-[:present_in]->(:Organization {id: $organization})
+WITH DISTINCT p, row
+RETURN row.login AS login, p.role AS before, row.role AS after
+"""
+
+QUERY_BUMP = f"""
+MERGE (c:{CONFIG_LABEL} {{id: $organization}})
+SET c.name = $organization, c.{ROLES_WATERMARK} = $now
+"""
+
+QUERY_LOGINS = """
+UNWIND $emails AS email
+MATCH (c:commit {author_email: email})
+WHERE c.author_login IS NOT NULL
+RETURN email, collect(DISTINCT c.author_login)[0] AS login
+"""
+
+
+class RoleDiff(NamedTuple):
+    """Outcome of a role sync."""
+
+    changed: list[tuple[str, str | None, str]]  # (login, before, after)
+    unchanged: int
+    missing: list[str]                           # logins without a person node in the organization
+
+
+def invert(roles: Mapping[str, Any]) -> dict[str, str]:
+    """``{login: role}`` from ``{role: [logins]}``, rejecting people listed under two roles."""
+    mapping = {}
+    for role, pessoas in roles.items():
+        for pessoa in pessoas:
+            if mapping.get(pessoa, role) != role:
+                raise ValueError(f"{pessoa} has two roles: {mapping[pessoa]} and {role}")
+            mapping[pessoa] = role
+    return mapping
+
+
+def _group(pairs) -> dict[str, list[str]]:
+    roles: dict[str, list[str]] = {}
+    for name, role in pairs:
+        roles.setdefault(role, []).append(name)
+    return roles
+
+
+def roles_from_file(path: Path | str) -> dict[str, str]:
+    """Role mapping from a JSON ``{role: [logins]}`` or a CSV with ``login`` (or ``name``) and ``role`` columns."""
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        return invert(json.loads(path.read_text(encoding="utf-8")))
+    if path.suffix.lower() == ".csv":
+        with path.open(encoding="utf-8", newline="") as f:
+            return invert(_group(
+                ((row.get("login") or row["name"]).strip(), row["role"].strip()) for row in csv.DictReader(f)
+            ))
+    raise ValueError(f"Unsupported role file: {path} (expected .json or .csv)")
+
+
+def logins_by_email(driver: Any, emails: list[str]) -> dict[str, str]:
+    """GitHub login of each e-mail, taken from the authors of the commits in the graph."""
+    with driver.session() as session:
+        result = session.run(QUERY_LOGINS, emails=sorted(set(emails)))
+        return {r["email"]: r["login"] for r in result}
+
+
+def roles_from_eo(driver: Any, organization: str | None = None, on: date | None = None) -> dict[str, str]:
+    """Role mapping of the EO memberships active ``on`` a day (default today).
+
+    Roles are the lowercased ``OrganizationalRole`` names; a person with more
+    than one active membership gets the role of the most recent one. EO
+    people have no GitHub login, so it is looked up by their e-mail among the
+    commit authors; people without one are logged and left out. Needs a
+    configured Django.
+
+    Args:
+    ----
+        driver: Neo4j driver, to find the logins.
+        organization (str): Only teams of this organization (organizational or project teams).
+        on (date): Day the memberships must be active on.
+
+    """
+    from django.db.models import Q
+
+    from apps.eo.models import TeamMembership
+
+    on = on or date.today()
+    memberships = TeamMembership.objects.filter(
+        Q(end_date__isnull=True) | Q(end_date__gte=on), start_date__lte=on
+    )
+    if organization:
+        memberships = memberships.filter(
+            Q(team__organizationalteam__organization__name=organization)
+            | Q(team__projectteam__project__organization__name=organization)
+        )
+    rows = list(memberships.order_by("start_date", "id").values_list(
+        "member__person__name", "member__person__email", "role__name"
+    ))
+    logins = logins_by_email(driver, [email for _, email, _ in rows if email])
+
+    mapping, sem_login = {}, set()
+    # Ordenado por início: a associação mais recente sobrescreve as anteriores
+    for name, email, role in rows:
+        if logins.get(email):
+            mapping[logins[email]] = role.lower()
+        else:
+            sem_login.add(name)
+    if sem_login:
+        logger.warning(f"No GitHub login for {len(sem_login)} EO people: {', '.join(sorted(sem_login))}")
+    return mapping
+
+
+def sync_roles(driver: Any, mapping: Mapping[str, str], organization: str, dry_run: bool = False) -> RoleDiff:
+    """Set ``role`` on the person nodes of ``organization`` listed in ``mapping`` in a single statement.
+
+    Args:
+    ----
+        driver: Neo4j driver.
+        mapping (Mapping[str, str]): GitHub login → role.
+        organization (str): Id of the ``Organization`` the people must be present in.
+        dry_run (bool): Only compute the diff, without writing.
+
+    Returns
+    -------
+        RoleDiff: Roles changed, number already up to date and logins not found.
+
+    """
+    if not organization:
+        raise ValueError("organization is required to sync roles")
+    rows = [{"login": login, "role": role} for login, role in sorted(mapping.items())]
+    with driver.session() as session:
+        result = session.run(QUERY_CURRENT if dry_run else QUERY_SYNC, rows=rows, organization=organization)
+        records = [(r["login"], r["before"], r["after"]) for r in result]
+
+        found = {login for login, _, _ in records}
+        changed = [(login, before, after) for login, before, after in records if before != after]
+        if changed and not dry_run:
+            session.run(QUERY_BUMP, organization=organization, now=datetime.now().isoformat()).consume()
+
+    diff = RoleDiff(changed, len(records) - len(changed), sorted(set(mapping) - found))
+    logger.info(f"Roles: {len(diff.changed)} changed, {diff.unchanged} unchanged, {len(diff.missing)} missing")
+    return diff
@@ -0,0 +1,45 @@
+"""Parallel execution of independent, CPU-bound analyses (one per period or team)."""
+
+import logging
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def default_workers() -> int:
+    """Worker processes to use: ``REPORT_WORKERS`` or the number of CPUs."""
+    return int(os.getenv("REPORT_WORKERS", 0)) or os.cpu_count() or 1
+
+
+def run_parallel(fn: Callable, *iterables: Iterable, max_workers: int | None = None) -> list:
+    """Apply ``fn`` to the items of ``iterables`` in a process pool.
+
+    ``fn`` must be a module-level function and its arguments picklable
+    (e.g. :class:`~apps.core.report.graph.EdgeArray`). Results come back in
+    the order of the inputs. With one worker or one item everything runs in
+    the current process.
+
+    Args:
+    ----
+        fn (Callable): Analysis to run, called as ``fn(*items)``.
+        *iterables (Iterable): One iterable per positional argument of ``fn``.
+        max_workers (int): Worker processes. Defaults to :func:`default_workers`.
+
+    Returns:
+    -------
+        list: One result per input, in input order.
+
+    """
+    args = [list(iterable) for iterable in iterables]
+    total = len(args[0]) if args else 0
+    workers = min(max_workers or default_workers(), total)
+
+    if workers <= 1:
+        return [fn(*items) for items in zip(*args)]
+
+    logger.info(f"Running {total} {fn.__name__} jobs on {workers} processes")
+    chunksize = max(1, total // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fn, *args, chunksize=chunksize))
@@ -0,0 +1,179 @@
+"""Community smell metrics of a collaboration graph.
+
+The functions take an :class:`~apps.core.report.graph.EdgeArray` so they can
+run in worker processes (see :mod:`apps.core.report.runner`).
+
+- Organizational Silos: ``greedy_modularity_communities``.
+- Truck Factor: articulation points of the undirected graph.
+- Boundary Spanners: articulation points with neighbours in two or more teams.
+- Bottleneck Leaders: leaders whose degree or betweenness centrality is at
+  least twice the average.
+- Lone Wolves: nodes of degree zero.
+
+Exact betweenness is O(V·E). Above ``EXACT_MAX_NODES`` people (or always,
+with ``betweenness="approx"``) it is estimated from ``PIVOTS`` sampled
+sources with a fixed seed, and the Hoeffding error bound of the estimate is
+returned with the result.
+"""
+
+import math
+
+import networkx as nx
+from networkx.algorithms import community
+
+from .graph import EdgeArray, to_graph
+
+EXACT = "exact"
+APPROX = "approx"
+AUTO = "auto"
+BETWEENNESS_MODES = (AUTO, EXACT, APPROX)
+
+EXACT_MAX_NODES = 500
+PIVOTS = 256
+SEED = 42
+CONFIDENCE = 0.95
+
+
+def team_of(label: str) -> str:
+    """Team of a ``"name (team)"`` label."""
+    return label.split("(")[-1].replace(")", "")
+
+
+def silos(G: nx.Graph) -> list[list[str]]:
+    """Communities of the undirected graph, each with its members sorted."""
+    return [sorted(c) for c in community.greedy_modularity_communities(G)]
+
+
+def boundary_spanners(G: nx.DiGraph, articulation: list[str]) -> list[str]:
+    """Articulation points connected to people of two or more teams."""
+    spanners = []
+    for n in articulation:
+        vizinhos = set(G.neighbors(n)) | set(G.predecessors(n))
+        times_vizinhos = {team_of(v) for v in vizinhos if "(" in v}
+        if len(times_vizinhos) >= 2:
+            spanners.append(n)
+    return spanners
+
+
+def error_bound(nodes: int, pivots: int, confidence: float = CONFIDENCE) -> float:
+    """Largest error of the ``pivots``-source betweenness estimate over all nodes.
+
+    The normalized estimate is ``nodes`` times the mean of one bounded term
+    per sampled source, each in ``[0, 1 / (nodes - 1)]``. Hoeffding's bound
+    with a union bound over the nodes holds with probability ``confidence``.
+    """
+    if nodes < 3:
+        return 0.0
+    span = nodes / (nodes - 1)
+    return span * math.sqrt(math.log(2 * nodes / (1 - confidence)) / (2 * pivots))
+
+
+def betweenness_pivots(nodes: int, mode: str = AUTO, pivots: int = PIVOTS) -> int | None:
+    """Sources to sample for a graph of ``nodes`` nodes, ``None`` for the exact computation."""
+    if mode not in BETWEENNESS_MODES:
+        raise ValueError(f"Unknown betweenness mode {mode!r}, expected one of {BETWEENNESS_MODES}")
+    if mode == EXACT or pivots >= nodes or (mode == AUTO and nodes <= EXACT_MAX_NODES):
+        return None
+    return pivots
+
+
+def betweenness(G: nx.DiGraph, mode: str = AUTO, pivots: int = PIVOTS, seed: int = SEED) -> tuple[dict, dict]:
+    """Normalized betweenness centrality, exact or estimated from sampled sources.
+
+    Returns
+    -------
+        tuple: The centrality of each node and how it was computed
+        (``mode``, ``pivots``, ``seed`` and the ``error`` bound, 0 when exact,
+        holding with probability ``confidence``).
+
+    """
+    k = betweenness_pivots(G.number_of_nodes(), mode, pivots)
+    if k is None:
+        return nx.betweenness_centrality(G, normalized=True), {"mode": EXACT, "pivots": None, "seed": None, "error": 0.0, "confidence": 1.0}
+    values = nx.betweenness_centrality(G, k=k, normalized=True, seed=seed)
+    return values, {
+        "mode": APPROX, "pivots": k, "seed": seed,
+        "error": error_bound(G.number_of_nodes(), k), "confidence": CONFIDENCE,
+    }
+
+
+def bottleneck_leaders(G: nx.DiGraph, roles_map: dict[str, str], centrality: dict[str, float]) -> list[str]:
+    """Leaders with degree or betweenness centrality (``centrality``) at least twice the average."""
+    degree_centrality = nx.degree_centrality(G)
+
+    num_pessoas = G.number_of_nodes()
+    cota_degree = sum(degree_centrality.values()) / num_pessoas if num_pessoas else 0
+    cota_betw = sum(centrality.values()) / num_pessoas if num_pessoas else 0
+
+    bottlenecks = []
+    for n in G.nodes():
+        if roles_map.get(n) == "leader":
+            grau = degree_centrality.get(n, 0)
+            betw = centrality.get(n, 0)
+            if grau >= 2 * cota_degree or betw >= 2 * cota_betw:
+                bottlenecks.append(n)
+    return bottlenecks
+
+
+def lone_wolves(G: nx.DiGraph) -> list[str]:
+    return [n for n, d in G.degree() if d == 0]
+
+
+def structure_smells(G: nx.DiGraph, undirected_G: nx.Graph) -> dict:
+    """Smells that only depend on the undirected structure: silos, truck factor, boundary spanners, lone wolves."""
+    articulation = list(nx.articulation_points(undirected_G))
+    return {
+        "silos": silos(undirected_G),
+        "truck": articulation,
+        "boundary": boundary_spanners(G, articulation),
+        "lone": lone_wolves(G),
+    }
+
+
+def centrality_smells(G: nx.DiGraph, roles_map: dict[str, str], mode: str = AUTO, pivots: int = PIVOTS) -> dict:
+    """Bottleneck leaders, which depend on the edge directions, and how betweenness was computed."""
+    centrality, metodo = betweenness(G, mode, pivots)
+    return {"bottlenecks": bottleneck_leaders(G, roles_map, centrality), "betweenness": metodo}
+
+
+def analyse_period(edges: EdgeArray, mode: str = AUTO, pivots: int = PIVOTS) -> dict:
+    """Smells of the whole organization in one period.
+
+    ``mode`` and ``pivots`` select how betweenness is computed (see
+    :func:`betweenness`); the result's ``betweenness`` entry describes it.
+    ``members`` lists every node of the graph.
+    """
+    G, roles_map = to_graph(edges)
+    return {
+        "members": list(G.nodes()),
+        **structure_smells(G, G.to_undirected()),
+        **centrality_smells(G, roles_map, mode, pivots),
+    }
+
+
+def analyse_team(edges: EdgeArray, team: str, mode: str = AUTO, pivots: int = PIVOTS) -> dict:
+    """Smells of one team, on the graph of the relations started by its members.
+
+    ``truck`` and ``silos`` are computed inside the team; ``articulation``,
+    ``boundary``, ``lone`` and ``bottlenecks`` on the whole graph.
+    """
+    G, roles_map = to_graph(edges)
+    undirected_G = G.to_undirected()
+
+    membros_time = [n for n in G.nodes() if f"({team})" in n]
+    truck, silos_time = [], []
+    if membros_time:
+        undirected_sub = G.subgraph(membros_time).to_undirected()
+        truck = list(nx.articulation_points(undirected_sub))
+        silos_time = silos(undirected_sub)
+
+    articulation = list(nx.articulation_points(undirected_G))
+    return {
+        "members": membros_time,
+        "truck": truck,
+        "articulation": articulation,
+        "boundary": boundary_spanners(G, articulation),
+        "lone": lone_wolves(G),
+        "silos": silos_time,
+        **centrality_smells(G, roles_map, mode, pivots),
+    }
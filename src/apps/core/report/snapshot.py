@@ -0,0 +1,167 @@
+"""Columnar snapshot of the person collaboration network used by the smell analyses.
+
+The edge list is pulled from Neo4j once per organization and sync
+generation and kept as Parquet, so repeated report runs read it from disk
+instead of querying the graph again. The generation is built from the
+content hashes left by :class:`~apps.core.report.relations.RelationDerivation`,
+the roles watermark and a hash of the people of the organization (name,
+team and role), so only a sync that changes the relationships or the
+membership produces a new snapshot.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from .relations import CONFIG_LABEL, generation as derived_generation
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(os.getenv("REPORT_CACHE_DIR", "cache")) / "snapshots"
+
+EDGE_COLUMNS = ["team1", "team2", "source", "target", "relation", "via", "created_at", "role1", "role2"]
+MEMBER_COLUMNS = ["time", "pessoa", "role"]
+
+QUERY_EDGES = """
+// Colaboração
+MATCH (p1:person {organization:$organization})-[r:CO_COMMIT_IN|CO_ASSIGNED]->(p2:person {organization:$organization})
+WHERE r.created_at IS NOT NULL
+  AND coalesce(p1.role, "none") <> "consultant"
+  AND coalesce(p2.role, "none") <> "consultant"
+RETURN p1.team_slug AS team1, p2.team_slug AS team2,
+       p1.name AS source, p2.name AS target,
+       type(r) AS relation, r.via AS via, r.created_at AS created_at,
+       p1.role AS role1, p2.role AS role2
+
+UNION ALL
+
+// Coordenação
+MATCH (c:person {organization:$organization})-[r:COORDINATES]->(a:person {organization:$organization})
+WHERE r.created_at IS NOT NULL
+  AND coalesce(c.role, "none") <> "consultant"
+  AND coalesce(a.role, "none") <> "consultant"
+RETURN c.team_slug AS team1, a.team_slug AS team2,
+       c.name AS source, a.name AS target,
+       type(r) AS relation, r.via AS via, r.created_at AS created_at,
+       c.role AS role1, a.role AS role2
+
+UNION ALL
+
+// Isolados (auto-relação ISOLATED)
+MATCH (c:person {organization:$organization})-[r:ISOLATED]->(a:person)
+WHERE r.created_at IS NOT NULL
+  AND coalesce(c.role, "none") <> "consultant"
+RETURN c.team_slug AS team1, a.team_slug AS team2,
+       c.name AS source, a.name AS target,
+       type(r) AS relation, r.via AS via, r.created_at AS created_at,
+       c.role AS role1, a.role AS role2
+"""
+
+QUERY_MEMBERS = """
+MATCH (p:person {organization:$organization})
+WHERE coalesce(p.role, "none") <> "consultant"
+RETURN DISTINCT p.team_slug AS time, p.name AS pessoa, p.role AS role
+ORDER BY time, pessoa
+"""
+
+QUERY_MEMBERSHIP = """
+MATCH (p:person {organization:$organization})
+RETURN p.id AS id, p.name AS name, p.team_slug AS team_slug, p.role AS role
+ORDER BY id, name
+"""
+
+QUERY_GENERATION = f"""
+MATCH (c:{CONFIG_LABEL} {{id:$organization}})
+RETURN properties(c) AS props
+"""
+
+
+class CollaborationSnapshot:
+    """Load the collaboration edges and team members of an organization.
+
+    Args:
+    ----
+        driver: Neo4j driver. Only used when the snapshot is not on disk yet.
+        organization (str): Value of ``person.organization``.
+        cache_dir (Path): Root directory of the snapshots.
+        generation (str): Force a generation instead of reading it from the graph.
+
+    """
+
+    def __init__(self, driver: Any, organization: str, cache_dir: Path | str = DEFAULT_CACHE_DIR,
+                 generation: str | None = None) -> None:
+        if not organization:
+            raise ValueError("organization is required to load a snapshot")
+        self.driver = driver
+        self.organization = organization
+        self.cache_dir = Path(cache_dir)
+        self._generation = generation
+
+    def membership(self) -> str:
+        """Hash of the id, name, team and role of every person of the organization.
+
+        The edges and members read these from the person nodes, so a team
+        change or a new member invalidates the snapshot even when no
+        relationship changed.
+        """
+        digest = hashlib.sha256()
+        with self.driver.session() as session:
+            for record in session.run(QUERY_MEMBERSHIP, organization=self.organization):
+                row = [record["id"], record["name"], record["team_slug"], record["role"]]
+                digest.update(json.dumps(row, default=str).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    @property
+    def generation(self) -> str | None:
+        """Sync generation of the derived relationships and membership, or None if never derived."""
+        if self._generation is None and self.driver is not None:
+            with self.driver.session() as session:
+                record = session.run(QUERY_GENERATION, organization=self.organization).single()
+            derived = derived_generation(record["props"] if record and record["props"] else {})
+            if derived is not None:
+                self._generation = f"{derived}-{self.membership()}"
+        return self._generation
+
+    def path(self, name: str) -> Path | None:
+        """Parquet file of a snapshot table for the current generation."""
+        if self.generation is None:
+            return None
+        slug = re.sub(r"[^0-9A-Za-z_.-]", "_", str(self.generation))
+        return self.cache_dir / self.organization / f"{slug}-{name}.parquet"
+
+    def _fetch(self, query: str, columns: list[str]) -> pd.DataFrame:
+        with self.driver.session() as session:
+            result = session.run(query, organization=self.organization)
+            return pd.DataFrame(result.values(), columns=result.keys() or columns)
+
+    def _load(self, name: str, query: str, columns: list[str], refresh: bool) -> pd.DataFrame:
+        path = self.path(name)
+        if path is not None and path.exists() and not refresh:
+            logger.info(f"Reading {name} snapshot from {path}")
+            return pd.read_parquet(path)
+
+        logger.info(f"Loading {name} of {self.organization} from Neo4j")
+        df = self._fetch(query, columns)
+        if "created_at" in df.columns:
+            df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce", utc=True)
+
+        if path is None:
+            logger.warning(f"No derivation generation for {self.organization}; snapshot not cached")
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(path, index=False)
+        return df
+
+    def edges(self, refresh: bool = False) -> pd.DataFrame:
+        """Collaboration, coordination and isolation edges (one row per relationship)."""
+        return self._load("edges", QUERY_EDGES, EDGE_COLUMNS, refresh)
+
+    def members(self, refresh: bool = False) -> pd.DataFrame:
+        """Non-consultant people of the organization and their teams."""
+        return self._load("members", QUERY_MEMBERS, MEMBER_COLUMNS, refresh)
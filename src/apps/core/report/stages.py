@@ -0,0 +1,151 @@
+"""Stages of the report pipeline of an organization (relations → roles → smells → charts, summary).
+
+Used by the ``report_pipeline`` command. Every stage is cached: ``relations``
+and ``roles`` are fingerprinted by their inputs outside the pipeline (the
+state of the source nodes, the membership and the role mapping), so a
+re-run over an unchanged graph skips every stage. The relations artifact
+is the snapshot generation, which only changes with the derived
+relationships, the roles or the membership, so ``smells`` reads the
+cached snapshot.
+"""
+
+import json
+import os
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from .community import community_smells, global_smells, read_results, write_results
+from .pipeline import Stage
+from .relations import RelationDerivation
+from .render import ChartCache, infographic_chart, teams_chart, trend_chart
+from .roles import roles_from_eo, roles_from_file, sync_roles
+from .snapshot import CollaborationSnapshot
+from .summary import GeminiClient, SummaryCache, TeamSummarizer, team_sections, write_report
+
+
+def _write_json(path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+    return path
+
+
+def _counts(row):
+    return {
+        "silos": len(row["silos"]),
+        "truck": len(row["truck_factor"]),
+        "boundary": len(row["boundary_spanners"]),
+        "bottlenecks": len(row["bottlenecks"]),
+        "lone": len(row["lone_wolves"]),
+    }
+
+
+def report_stages(driver: Any, organization: str, work_dir: Path | str, roles_file: Path | str | None = None,
+                  workers: int | None = None, summary_workers: int = 4,
+                  store: Callable[[str, str | None, list[dict]], Any] | None = None,
+                  echo: Callable[[str], Any] = print) -> list[Stage]:
+    """Stages of the report pipeline.
+
+    Args:
+    ----
+        driver: Neo4j driver.
+        organization (str): Organization to report on.
+        work_dir (Path | str): Root of the chart and summary caches.
+        roles_file (Path | str): Role mapping file instead of the EO memberships.
+        workers (int): Processes of the smell analyses.
+        summary_workers (int): Concurrent Gemini requests.
+        store (Callable): Persists ``(organization, generation, rows)`` of the smells.
+        echo (Callable): Output of the stage messages.
+
+    """
+    work_dir = Path(work_dir)
+    derivation = RelationDerivation(driver, organization)
+    mapping: dict[str, dict[str, str]] = {}
+
+    def role_mapping():
+        if "roles" not in mapping:
+            mapping["roles"] = roles_from_file(roles_file) if roles_file else roles_from_eo(driver, organization)
+        return mapping["roles"]
+
+    def relations_fingerprint():
+        # Mudanças de time não criam arestas, mas mudam a geração do snapshot
+        membership = CollaborationSnapshot(driver, organization).membership()
+        return json.dumps([derivation.sources_state(), membership], sort_keys=True, default=str)
+
+    def roles_fingerprint():
+        # Pessoas novas no grafo também podem receber um papel do mesmo mapeamento
+        return json.dumps([role_mapping(), derivation.sources_state()], sort_keys=True, default=str)
+
+    def relations(inputs, out_dir):
+        # Incremental on its own: only re-derives what changed since the last run
+        derivation.run()
+        generation = CollaborationSnapshot(driver, organization).generation
+        return {"generation": _write_json(out_dir / "generation.json", {"generation": generation})}
+
+    def roles(inputs, out_dir):
+        roles = role_mapping()
+        if roles:
+            diff = sync_roles(driver, roles, organization)
+            for login, before, after in diff.changed:
+                echo(f"  role {login}: {before or '-'} → {after}")
+        else:
+            echo("  no roles to sync")
+        return {"roles": _write_json(out_dir / "roles.json", roles)}
+
+    def smells(inputs, out_dir):
+        # A role change bumps the generation, so the cached snapshot is never stale here
+        generation, rows = community_smells(driver, organization, workers=workers)
+        global_row = global_smells(driver, organization)
+        if store is not None:
+            store(organization, generation, rows)
+        path = write_results(out_dir / "community_smells.json", organization, generation, rows, global_row)
+        return {"results": path}
+
+    def charts(inputs, out_dir):
+        documento = read_results(inputs["smells"]["results"])
+        rows = documento["results"]
+        cache = ChartCache(work_dir / "charts")
+        artifacts = {}
+
+        quarters = [{"periodo": r["period_end"], **_counts(r)} for r in rows if not r["team"]]
+        if quarters:
+            artifacts["trend"] = trend_chart(
+                cache, pd.DataFrame(quarters), out_dir / "community_smells_evolucao.png",
+                x="periodo", title="Evolução dos Community Smells por Trimestre", xlabel="Período",
+            )
+
+        teams = [{"team": r["team"], "team_size": r["people"], **_counts(r)} for r in rows if r["team"]]
+        if teams:
+            artifacts["teams"] = teams_chart(cache, pd.DataFrame(teams), out_dir / "community_smells_por_time.png")
+
+        smells = documento["global"]
+        if smells:
+            artifacts["infographic"] = infographic_chart(
+                cache, dict(enumerate(smells["silos"], start=1)), smells["truck_factor"],
+                smells["bottlenecks"], smells["lone_wolves"], out_dir / "infografico_community_smells.png",
+            )
+        return artifacts
+
+    def summary(inputs, out_dir):
+        documento = read_results(inputs["smells"]["results"])
+        if not os.getenv("GEMINI_KEY"):
+            raise ValueError("GEMINI_KEY is required for the summary stage")
+        summarizer = TeamSummarizer(
+            GeminiClient(os.getenv("GEMINI_KEY")), SummaryCache(work_dir / "summaries"),
+            max_workers=summary_workers,
+        )
+        rows = documento["results"]
+        teams = [r for r in rows if r["team"]]
+        periodo = f"{teams[0]['period_start']} → {teams[0]['period_end']}" if teams else ""
+        summaries = summarizer.summarize(team_sections(rows), periodo)
+        echo(f"  summaries: {summarizer.sent} generated, {summarizer.reused} cached")
+        return {"report": write_report(summaries, out_dir / "relatorio_gestor_times.md")}
+
+    return [
+        Stage("relations", relations, fingerprint=relations_fingerprint, version="2"),
+        Stage("roles", roles, fingerprint=roles_fingerprint, version="2"),
+        Stage("smells", smells, deps=("relations", "roles"), version="2"),
+        Stage("charts", charts, deps=("smells",)),
+        Stage("summary", summary, deps=("smells",)),
+    ]
@@ -0,0 +1,233 @@
+"""Manager-friendly summaries of the team smells, generated per team and cached.
+
+The team report is split into one section per team and each section gets
+its own prompt. A summary is stored on disk under the SHA-256 of its section,
+analysed period, model and ``PROMPT_VERSION``, so a run only sends the teams
+whose results changed, at most ``max_workers`` at a time. Bump
+``PROMPT_VERSION`` when the prompt changes.
+
+The model is any object with a ``name`` and a ``generate(prompt) -> str``
+method: :class:`GeminiClient` in production, :class:`StubClient` in tests
+and benchmarks.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+PROMPT_VERSION = "1"
+DEFAULT_MODEL = "gemini-2.5-flash"
+DEFAULT_CACHE_DIR = Path(os.getenv("REPORT_CACHE_DIR", "cache")) / "summaries"
+MAX_WORKERS = 4
+
+EXPLICACOES = {
+    "bottleneck": "Bottleneck (leaders): Identifies leaders who concentrate many connections. In this case, leaders impose their participation in several tasks. A bottleneck leader can cause overload and block the workflow if not acting properly.",
+    "silos": "Organizational Silos: Subgroups that interact more with each other than with the rest. Indicates communication barriers between teams.",
+    "lone": "Lone Wolf: People in the team who cannot reach all others. They represent communication gaps that need to be addressed.",
+    "factor": "Truck Factor: Individuals whose removal disconnects the network. They are single points of vulnerability.",
+    "bound": "Boundary Spanners: Critical and disconnected people within the team who connect their team to other teams. They are vital links for inter-team collaboration.",
+}
+
+PROMPT = """
+You are a project management consultant and very knowledgeable about community smells.
+Below are the technical definitions of each smell that may appear:
+
+### Technical definitions of community smells:
+{definicoes}
+
+Now, here are the analyzed results from GitHub commits, pull requests, and issues regarding community smells for one team (in Markdown).
+Analysed period: {periodo}
+
+### Technical report of team {team} (.md):
+{secao}
+
+Task:
+- Analyze the technical report above and write it in corrected text form, as if it were a section of a formal report.
+- Do not generate recommendations for improvement, just analyze the smells.
+- Use a clear and accessible language for managers and entry-level leaders.
+- Use simple language, without technical jargon; use the terms of community smells but also explain what they mean.
+- Structure the output in Markdown, starting with a level-2 title with the team name.
+- Write the output in English.
+
+Output example for a team:
+
+Report from initial date x to end y, In team X, fulano is a key go-to person across tasks and conversations; that's great for coordination, but it also risks overload.
+We see small groups that mostly talk among themselves, and franciscorj is working apart from the rest; Person 1, Person 2 and person 2 don't reach everyone yet.
+On the bright side, the team doesn't hinge on any single person—if someone steps away, work can still move forward.
+"""
+
+
+class ModelClient(Protocol):
+    """Text generation model used by :class:`TeamSummarizer`."""
+
+    name: str
+
+    def generate(self, prompt: str) -> str: ...
+
+
+class GeminiClient:
+    """Gemini through ``google.generativeai``, imported on first use."""
+
+    def __init__(self, api_key: str, name: str = DEFAULT_MODEL) -> None:
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.name = name
+        self._model = genai.GenerativeModel(name)
+
+    def generate(self, prompt: str) -> str:
+        return self._model.generate_content(prompt).text.strip()
+
+
+class StubClient:
+    """Local stand-in for the model: echoes the team title after an optional delay."""
+
+    def __init__(self, delay: float = 0.0, name: str = "stub") -> None:
+        self.name = name
+        self.delay = delay
+        self.prompts: list[str] = []
+
+    def generate(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        if self.delay:
+            time.sleep(self.delay)
+        team = re.search(r"### Technical report of team (.+?) \(\.md\):", prompt)
+        return f"## {team.group(1) if team else 'Team'}\n\nSummary of {len(prompt)} characters."
+
+
+def split_teams(markdown: str) -> tuple[str, dict[str, str]]:
+    """Preamble and ``{team: section}`` of a report with one ``## ... Time: <team>`` section per team."""
+    preamble, sections = [], {}
+    team = None
+    for line in markdown.splitlines():
+        if line.startswith("## "):
+            match = re.search(r"Time:\s*(.+)$", line)
+            team = (match.group(1) if match else line[3:]).strip()
+            sections[team] = [line]
+        elif team is None:
+            preamble.append(line)
+        else:
+            sections[team].append(line)
+    return "\n".join(preamble).strip(), {t: "\n".join(linhas).strip() for t, linhas in sections.items()}
+
+
+def _names(names: Iterable[str]) -> str:
+    return ", ".join(sorted(names)) or "nenhum"
+
+
+def team_sections(rows: Iterable[dict]) -> dict[str, str]:
+    """``{team: section}`` in Markdown from team rows of :func:`~apps.core.report.community.result_row`."""
+    sections = {}
+    for row in rows:
+        if not row["team"]:
+            continue
+        linhas = [
+            f"## Time: {row['team']}",
+            f"- Pessoas no grafo: {row['people']}",
+            f"- Truck Factor: {_names(row['truck_factor'])}",
+            f"- Boundary Spanners: {_names(row['boundary_spanners'])}",
+            f"- Bottleneck Líderes: {_names(row['bottlenecks'])}",
+            f"- Lone Wolves: {_names(row['lone_wolves'])}",
+            f"- Organizational Silos: {len(row['silos'])} comunidades",
+        ]
+        linhas += [f"  - Comunidade {i}: {', '.join(c)}" for i, c in enumerate(row["silos"], 1)]
+        sections[row["team"]] = "\n".join(linhas)
+    return sections
+
+
+class SummaryCache:
+    """Summaries on disk, one Markdown file per key."""
+
+    def __init__(self, cache_dir: Path | str = DEFAULT_CACHE_DIR) -> None:
+        self.cache_dir = Path(cache_dir)
+
+    def key(self, model: str, periodo: str, secao: str) -> str:
+        payload = json.dumps({"model": model, "periodo": periodo, "secao": secao}, sort_keys=True)
+        return f"v{PROMPT_VERSION}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> str | None:
+        path = self.cache_dir / f"{key}.md"
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+    def put(self, key: str, text: str) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_dir / f"{key}.tmp"
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(self.cache_dir / f"{key}.md")
+
+
+class TeamSummarizer:
+    """Summarize each team section, sending only uncached ones to the model.
+
+    Args:
+    ----
+        client (ModelClient): The model.
+        cache (SummaryCache): Where summaries are kept between runs.
+        max_workers (int): Requests in flight at the same time.
+
+    """
+
+    def __init__(self, client: ModelClient, cache: SummaryCache | None = None, max_workers: int = MAX_WORKERS) -> None:
+        if max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        self.client = client
+        self.cache = cache or SummaryCache()
+        self.max_workers = max_workers
+        self.sent = 0
+        self.reused = 0
+
+    def prompt(self, team: str, secao: str, periodo: str) -> str:
+        definicoes = "\n".join(f"- {v}" for v in EXPLICACOES.values())
+        return PROMPT.format(definicoes=definicoes, periodo=periodo or "not informed", team=team, secao=secao)
+
+    def summarize(self, sections: dict[str, str], periodo: str = "") -> dict[str, str]:
+        """``{team: summary}`` in the order of ``sections``.
+
+        Each summary is cached as soon as it arrives, so when a request
+        fails (re-raised at the end) the other teams are still kept.
+        """
+        resumos, pendentes = {}, {}
+        for team, secao in sections.items():
+            key = self.cache.key(self.client.name, periodo, secao)
+            cached = self.cache.get(key)
+            if cached is None:
+                pendentes[team] = (key, self.prompt(team, secao, periodo))
+            else:
+                resumos[team] = cached
+        self.reused += len(resumos)
+        logger.info(f"Team summaries: {len(resumos)} cached, {len(pendentes)} to generate")
+
+        if pendentes:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pendentes))) as pool:
+                futures = {pool.submit(self.client.generate, prompt): team for team, (_, prompt) in pendentes.items()}
+                erros = []
+                for future in as_completed(futures):
+                    team = futures[future]
+                    try:
+                        resumos[team] = future.result()
+                    except Exception as e:
+                        logger.error(f"Summary of team {team} failed: {e}")
+                        erros.append(e)
+                        continue
+                    self.cache.put(pendentes[team][0], resumos[team])
+                    self.sent += 1
+            if erros:
+                raise erros[0]
+        return {team: resumos[team] for team in sections}
+
+
+def write_report(summaries: dict[str, str], path: Path | str, title: str = "# Community Smells Report by Team") -> Path:
+    """Join the team summaries into one Markdown report."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n\n".join([title, *summaries.values()]) + "\n", encoding="utf-8")
+    return path
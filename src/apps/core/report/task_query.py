@@ -0,0 +1,184 @@
+"""Filtered, paged queries over the development tasks.
+
+:func:`build_task_query` turns the task filters of the report scripts
+(status, assignee, text and creation date) into a parameterized Cypher
+``WHERE`` clause and projects only the requested columns, so Neo4j returns
+just the matching tasks and fields. :func:`task_pages` then reads the result
+``page_size`` tasks at a time, keeping each transaction and DataFrame bounded
+by the page instead of the whole graph. Pages are keyed by ``id`` (each
+one starts after the last id of the previous), so reading a page does not
+re-scan and re-sort the pages before it.
+
+Long descriptions are offloaded to the property store and only a preview
+stays on the node (see :mod:`apps.core.extract_github.property_store`).
+:func:`task_pages` replaces the preview by the full text, and the text
+filter also takes the tasks with an offloaded description and checks their
+full text once it is read.
+"""
+
+import logging
+from collections.abc import Iterable, Iterator
+from typing import Any, NamedTuple
+
+import pandas as pd
+
+from apps.core.extract_github.property_store import REF_SUFFIX, PropertyStore
+
+logger = logging.getLogger(__name__)
+
+TASK_LABEL = "developmenttask"
+PAGE_SIZE = 5000
+
+# Coluna do resultado -> expressão Cypher sobre a tarefa ``t``
+COLUMNS = {
+    "id": "t.id",
+    "labels": "labels(t)",
+    "title": "t.title",
+    "status": "t.state",
+    "create_date": "t.created_at",
+    "closed_date": "t.closed_at",
+    "description": "t.description",
+    "assignees": "[(t)-[:assigned_to]->(p:person) | p.id]",
+    "tema": "t.tema",
+    "prefix_tag": "t.prefix_tag",
+    "prefix_list": "t.prefix_list",
+    "title_wo_prefix": "t.title_wo_prefix",
+}
+
+DEFAULT_COLUMNS = ("labels", "title", "create_date", "description")
+
+# Filtro -> condição Cypher, aplicada só quando o parâmetro não é None.
+# Datas são comparadas pelo dia (YYYY-MM-DD) de ``created_at``.
+FILTERS = {
+    "status": "toLower(t.state) = toLower($status)",
+    "assignee": "size([(t)-[:assigned_to]->(p:person) WHERE p.id = $assignee OR p.name = $assignee | p]) > 0",
+    "q": "(toLower(coalesce(t.title, '')) CONTAINS toLower($q)"
+         " OR toLower(coalesce(t.description, '')) CONTAINS toLower($q)"
+         " OR t.description_ref IS NOT NULL)",
+    "due_from": "left(toString(t.created_at), 10) >= $due_from",
+    "due_to": "left(toString(t.created_at), 10) <= $due_to",
+    "tema": "t.tema = $tema",
+}
+
+
+# Colunas internas, lidas por task_pages e retiradas das páginas
+DESCRIPTION_REF = "_description_ref"
+Q_MATCH = "_q_match"
+PAGE_KEY = "_page_key"
+
+
+class TaskQuery(NamedTuple):
+    """Cypher text and parameters of a task query, paged by ``$after``/``$limit``."""
+
+    query: str
+    params: dict
+
+
+def task_conditions(filters: dict | None = None, where: Iterable[str] = ()) -> tuple[list[str], dict]:
+    """``WHERE`` conditions on ``t`` and their parameters for ``filters``, shared by lists and aggregates.
+
+    Args:
+    ----
+        filters (dict): Values for :data:`FILTERS`; ``None`` values are ignored.
+        where (Iterable[str]): Extra fixed conditions on ``t`` (no user input).
+
+    """
+    filters = filters or {}
+    unknown = [f for f in filters if f not in FILTERS]
+    if unknown:
+        raise ValueError(f"Unknown task filters: {', '.join(unknown)}")
+    params = {name: value for name, value in filters.items() if value is not None}
+    return ["t.id IS NOT NULL", *where, *(FILTERS[name] for name in params)], params
+
+
+def build_task_query(label: str = TASK_LABEL, columns: Iterable[str] = DEFAULT_COLUMNS,
+                     filters: dict | None = None, where: Iterable[str] = ()) -> TaskQuery:
+    """Parameterized query of the tasks matching ``filters``, projecting ``columns``.
+
+    Tasks are ordered by ``id``, the key of the pages; tasks without ``id``
+    are left out.
+
+    Args:
+    ----
+        label (str): Label of the task nodes.
+        columns (Iterable[str]): Names from :data:`COLUMNS`, in output order.
+        filters (dict): Values for :data:`FILTERS`; ``None`` values are ignored.
+        where (Iterable[str]): Extra fixed conditions on ``t`` (no user input).
+
+    Returns
+    -------
+        TaskQuery: The query and its parameters, without ``after``/``limit``.
+
+    """
+    columns = list(columns)
+    unknown = [c for c in columns if c not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown task columns: {', '.join(unknown)}")
+    if not columns:
+        raise ValueError("At least one task column is required")
+
+    conditions, params = task_conditions(filters, where)
+    conditions.insert(1, "($after IS NULL OR t.id > $after)")
+
+    lines = [f"MATCH (t:`{label}`)", "WHERE " + "\n  AND ".join(conditions)]
+    projection = [f"{COLUMNS[c]} AS {c}" for c in columns] + [f"t.id AS {PAGE_KEY}"]
+    if "description" in columns or "q" in params:
+        projection.append(f"t.description{REF_SUFFIX} AS {DESCRIPTION_REF}")
+    if "q" in params:
+        # Verdadeiro quando o título ou a prévia já contêm o texto; senão a descrição completa é conferida
+        projection.append(f"(toLower(coalesce(t.title, '')) CONTAINS toLower($q)"
+                          f" OR toLower(coalesce(t.description, '')) CONTAINS toLower($q)) AS {Q_MATCH}")
+    lines.append("RETURN " + ",\n       ".join(projection))
+    lines.append("ORDER BY t.id")
+    lines.append("LIMIT $limit")
+    return TaskQuery("\n".join(lines), params)
+
+
+def _full_text(page: pd.DataFrame, q: str | None, store: PropertyStore) -> pd.DataFrame:
+    """Page with the full descriptions and, for a text filter, only the tasks whose full text matches."""
+    if DESCRIPTION_REF not in page.columns:
+        return page
+    previews = page["description"] if "description" in page.columns else pd.Series(None, index=page.index)
+    full = pd.Series([
+        store.resolve({"description": preview, f"description{REF_SUFFIX}": ref}, "description") if ref else preview
+        for preview, ref in zip(previews, page[DESCRIPTION_REF])
+    ], index=page.index, dtype=object)
+    if q is not None:
+        keep = page[Q_MATCH].fillna(False).astype(bool) | full.fillna("").str.lower().str.contains(q.lower(), regex=False)
+        page, full = page[keep], full[keep]
+    if "description" in page.columns:
+        page = page.assign(description=full)
+    return page.drop(columns=[c for c in (DESCRIPTION_REF, Q_MATCH) if c in page.columns]).reset_index(drop=True)
+
+
+def task_pages(driver: Any, task_query: TaskQuery, page_size: int = PAGE_SIZE,
+               store: PropertyStore | None = None) -> Iterator[pd.DataFrame]:
+    """Run ``task_query`` one page at a time, yielding a DataFrame per non-empty page.
+
+    Offloaded descriptions are read from ``store`` (the default store when omitted).
+    """
+    if page_size <= 0:
+        raise ValueError("page_size must be positive")
+    store = store or PropertyStore()
+    q = task_query.params.get("q")
+    after = None
+    with driver.session() as session:
+        while True:
+            result = session.run(task_query.query, after=after, limit=page_size, **task_query.params)
+            page = pd.DataFrame([dict(r) for r in result])
+            if page.empty:
+                return
+            logger.debug(f"Task page after {after}: {len(page)} tasks")
+            lidas, after = len(page), page[PAGE_KEY].tolist()[-1]
+            page = _full_text(page.drop(columns=PAGE_KEY), q, store)
+            if not page.empty:
+                yield page
+            if lidas < page_size:
+                return
+
+
+def fetch_tasks(driver: Any, task_query: TaskQuery, page_size: int = PAGE_SIZE,
+                store: PropertyStore | None = None) -> pd.DataFrame:
+    """All pages of ``task_query`` in one DataFrame."""
+    pages = list(task_pages(driver, task_query, page_size, store))
+    return pd.concat(pages, ignore_index=True) if pages else pd.DataFrame()
@@ -0,0 +1,215 @@
+"""Incremental theme classification of development tasks.
+
+The theme (``tema``) of a task comes from the ``[PREFIX]`` blocks at the
+start of its title, normalized and unified (``FIX``/``HOTFIX`` → ``BUG``,
+``FEAT`` → ``FEATURE``...), or ``REUNIAO`` when the title mentions a
+meeting. :class:`TaskThemes` stores it back on the task nodes together with
+``prefix_list``, ``prefix_tag`` and ``title_wo_prefix``, and only
+classifies tasks that are new, were written by a sync after their last
+classification (``created_node_at``), or were classified by an older
+``THEME_VERSION``. Reports are then aggregations of the stored values.
+"""
+
+import logging
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from typing import Any
+
+import pandas as pd
+
+from .task_query import PAGE_SIZE, TASK_LABEL, build_task_query, fetch_tasks, task_conditions, task_pages
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rules below change, so every task is classified again
+THEME_VERSION = 1
+
+NO_PREFIX = "NO_PREFIX"
+REUNIAO = "REUNIAO"
+
+EQUIV = {
+    # bugfix
+    "FIX": "BUG",
+    "HOTFIX": "BUG",
+    "HOT-FIX": "BUG",
+    "FIX+FEAT": "BUG",
+    "FEAT+FIX": "BUG",
+
+    # feature
+    "FEAT": "FEATURE",
+
+    # combos / otimização -> refatoração
+    "FEAT+REFACTOR": "REFRACTOR",
+    "OTIMIZACAO": "REFRACTOR",
+    "OTIMIZAÇÃO": "REFRACTOR",
+    "OTIMIZATION": "REFRACTOR",
+    "Teste" : "TESTE",
+    "Testes" : "TEST",
+    "Test" : "TEST",
+    "QA" : "TEST",
+
+    # pedido do usuário
+    "REFACT": "REFRACTOR",
+    "REFACTOR": "REFRACTOR",
+}
+
+QUERY_PENDING = """
+MATCH (t:`{label}`)
+WHERE t.tema IS NULL
+   OR coalesce(t.tema_version, 0) <> $version
+   OR coalesce(t.created_node_at, "") > coalesce(t.tema_classified_at, "")
+RETURN t.id AS id, t.title AS title
+"""
+
+QUERY_STORE = """
+UNWIND $rows AS row
+MATCH (t:`{label}` {{id: row.id}})
+SET t.tema               = row.tema,
+    t.prefix_list        = row.prefix_list,
+    t.prefix_tag         = row.prefix_tag,
+    t.title_wo_prefix    = row.title_wo_prefix,
+    t.tema_version       = $version,
+    t.tema_classified_at = $classified_at
+"""
+
+TASK_COLUMNS = ("tema", "labels", "prefix_tag", "prefix_list", "title", "title_wo_prefix", "create_date")
+
+QUERY_SUMMARY = """
+MATCH (t:`{label}`)
+WHERE {conditions}
+RETURN t.tema AS tema, count(t) AS qtd, max(t.created_at) AS ultima_data
+"""
+
+SUMMARY_COLUMNS = ["tema", "qtd", "ultima_data"]
+CLASSIFIED = ("t.tema IS NOT NULL",)
+
+
+def _strip_accents_lower(titles: pd.Series) -> pd.Series:
+    return titles.str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("utf-8").str.lower()
+
+
+def classify(titles: pd.Series) -> pd.DataFrame:
+    """Theme of each title, vectorized.
+
+    Returns
+    -------
+        DataFrame: ``tema``, ``prefix_list``, ``prefix_tag`` and
+        ``title_wo_prefix``, indexed like ``titles``.
+
+    """
+    titles = titles.astype(object).where(titles.notna(), None)
+    texto = titles.fillna("").astype(str)
+
+    # Blocos de prefixos do início do título: "[FEAT] [API] título"
+    block = texto.str.extract(r"^(\s*(?:\[[^\]]+\]\s*)+)", expand=False)
+    prefix_list = block.fillna("").str.findall(r"\[([^\]]+)\]")
+    prefix_tag = prefix_list.str[0]
+    title_wo_prefix = pd.Series(
+        [t[len(b):].strip() if isinstance(b, str) else t for t, b in zip(titles, block)],
+        index=titles.index, dtype=object,
+    )
+
+    tema = prefix_tag.fillna(NO_PREFIX).str.strip().str.upper()
+    tema = tema.where(~_strip_accents_lower(texto).str.contains(r"\breuniao\b", regex=True), REUNIAO)
+    tema = tema.replace(EQUIV)
+
+    return pd.DataFrame({
+        "tema": tema,
+        "prefix_list": prefix_list,
+        "prefix_tag": prefix_tag.astype(object).where(prefix_tag.notna(), None),
+        "title_wo_prefix": title_wo_prefix,
+    }, index=titles.index)
+
+
+class TaskThemes:
+    """Classify development tasks incrementally and aggregate their stored themes.
+
+    Args:
+    ----
+        driver: Neo4j driver.
+        label (str): Label of the task nodes.
+        batch_size (int): Tasks written per ``UNWIND``.
+
+    """
+
+    def __init__(self, driver: Any, label: str = TASK_LABEL, batch_size: int = 1000) -> None:
+        self.driver = driver
+        self.label = label
+        self.batch_size = batch_size
+
+    def _query(self, query: str, **params) -> pd.DataFrame:
+        with self.driver.session() as session:
+            result = session.run(query.format(label=self.label), **params)
+            return pd.DataFrame([dict(r) for r in result])
+
+    def pending(self) -> pd.DataFrame:
+        """``id`` and ``title`` of the tasks to (re)classify."""
+        return self._query(QUERY_PENDING, version=THEME_VERSION)
+
+    def run(self) -> int:
+        """Classify the pending tasks and store their themes on the nodes.
+
+        Returns
+        -------
+            int: Number of tasks classified.
+
+        """
+        # Taken before reading, so a sync writing meanwhile is picked up next run
+        classified_at = datetime.now().isoformat()
+        df = self.pending()
+        if df.empty:
+            logger.info("No tasks to classify")
+            return 0
+
+        temas = classify(df["title"])
+        rows = pd.concat([df[["id"]], temas], axis=1).to_dict("records")
+        with self.driver.session() as session:
+            for inicio in range(0, len(rows), self.batch_size):
+                session.run(
+                    QUERY_STORE.format(label=self.label),
+                    rows=rows[inicio:inicio + self.batch_size],
+                    version=THEME_VERSION,
+                    classified_at=classified_at,
+                ).consume()
+        logger.info(f"{len(rows)} tasks classified")
+        return len(rows)
+
+    def _task_query(self, columns: Iterable[str], filters: dict | None):
+        return build_task_query(self.label, columns, filters, where=CLASSIFIED)
+
+    def tasks(self, columns: Iterable[str] = TASK_COLUMNS, filters: dict | None = None,
+              page_size: int = PAGE_SIZE) -> pd.DataFrame:
+        """Classified tasks with their stored theme fields, see :func:`~apps.core.report.task_query.build_task_query`."""
+        return fetch_tasks(self.driver, self._task_query(columns, filters), page_size)
+
+    def pages(self, columns: Iterable[str] = TASK_COLUMNS, filters: dict | None = None,
+              page_size: int = PAGE_SIZE) -> Iterator[pd.DataFrame]:
+        """Like :meth:`tasks`, one page at a time."""
+        return task_pages(self.driver, self._task_query(columns, filters), page_size)
+
+    def summary(self, filters: dict | None = None, page_size: int = PAGE_SIZE) -> pd.DataFrame:
+        """Tasks per theme and latest creation date of the tasks :meth:`tasks` returns for ``filters``.
+
+        Aggregated in Neo4j, except with a text filter (``q``): offloaded
+        descriptions are only matched when read, so the tasks are then read
+        page by page and counted here.
+        """
+        if (filters or {}).get("q") is not None:
+            return self._summary_from_pages(filters, page_size)
+        conditions, params = task_conditions(filters, where=CLASSIFIED)
+        query = QUERY_SUMMARY.format(label=self.label, conditions="\n  AND ".join(conditions))
+        with self.driver.session() as session:
+            rows = [dict(r) for r in session.run(query, **params)]
+        return pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+
+    def _summary_from_pages(self, filters: dict, page_size: int) -> pd.DataFrame:
+        # Agrega cada página e depois os parciais: a memória fica em páginas × temas
+        parciais = [
+            page.astype({"create_date": "string"}).groupby("tema")
+                .agg(qtd=("tema", "size"), ultima_data=("create_date", "max"))
+            for page in self.pages(["tema", "create_date"], filters, page_size)
+        ]
+        if not parciais:
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
+        total = pd.concat(parciais).groupby(level=0).agg(qtd=("qtd", "sum"), ultima_data=("ultima_data", "max"))
+        return total.rename_axis("tema").reset_index()[SUMMARY_COLUMNS]
@@ -0,0 +1,157 @@
+"""Sliding-window smell analysis over one incrementally updated graph.
+
+Instead of rebuilding a graph for every window, :class:`SlidingWindow` keeps a
+single graph and, as the window advances by ``step``, adds the edges that
+entered it and expires the ones that left. A multiplicity count per directed
+edge decides when an edge really appears or disappears, and nodes leave the
+graph with their last edge (global isolated people always stay).
+
+Metrics are only recomputed when their inputs changed:
+
+- silos, truck factor, boundary spanners and lone wolves when the undirected
+  structure (node set or undirected edges) changed;
+- bottleneck leaders when a directed edge changed.
+"""
+
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from datetime import timedelta
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from .graph import edge_list, roles_of
+from .smells import AUTO, PIVOTS, centrality_smells, structure_smells
+
+DEFAULT_WINDOW = timedelta(days=90)
+DEFAULT_STEP = timedelta(days=7)
+
+
+def windows(start: pd.Timestamp, end: pd.Timestamp, window: timedelta = DEFAULT_WINDOW,
+            step: timedelta = DEFAULT_STEP) -> Iterator[tuple[pd.Timestamp, pd.Timestamp]]:
+    """``[inicio, fim)`` windows of length ``window`` starting every ``step`` from ``start`` until ``end`` is covered."""
+    if window <= timedelta(0) or step <= timedelta(0):
+        raise ValueError("window and step must be positive")
+    inicio = start
+    while True:
+        yield inicio, inicio + window
+        if inicio + window > end:
+            break
+        inicio += step
+
+
+class SlidingWindow:
+    """Smells of every window of a labelled, timestamped edge list.
+
+    Args:
+    ----
+        df (DataFrame): Labelled edges (see :func:`~apps.core.report.graph.label_with_team`)
+            with a ``created_at`` column. Rows without date are ignored.
+        isolated (Iterable[str]): Nodes kept in every window even without edges.
+        mode (str): Betweenness mode, see :func:`~apps.core.report.smells.betweenness`.
+        pivots (int): Sampled sources in approximate betweenness mode.
+
+    Roles come from the whole edge list, as a person's role does not depend
+    on the window.
+
+    """
+
+    def __init__(self, df: pd.DataFrame, isolated: Iterable[str] = (), mode: str = AUTO, pivots: int = PIVOTS):
+        self.roles = roles_of(df)
+        # Ordem preservada só para a inserção dos nós; a consulta em _expire usa o conjunto
+        ordered = list(dict.fromkeys(isolated))
+        self.isolated = set(ordered)
+        self.mode = mode
+        self.pivots = pivots
+
+        edges = edge_list(df, extra=["created_at"])
+        edges["created_at"] = pd.to_datetime(edges["created_at"], utc=True)
+        edges = edges[edges["created_at"].notna()].sort_values("created_at", kind="stable")
+        self._sources = edges["source"].to_numpy(object)
+        self._targets = edges["target"].to_numpy(object)
+        self._times = edges["created_at"].dt.tz_convert(None).to_numpy()
+
+        self.G = nx.DiGraph()
+        self.G.add_nodes_from(ordered)
+        self._directed = Counter()
+        self._undirected = Counter()
+        self._added = 0
+        self._expired = 0
+        self._structure_changed = True
+        self._direction_changed = True
+        self.recomputed = Counter()
+
+    def _add(self, u, v):
+        self._directed[u, v] += 1
+        if self._directed[u, v] > 1:
+            return
+        self._direction_changed = True
+        par = frozenset((u, v))
+        self._undirected[par] += 1
+        if self._undirected[par] == 1:
+            self._structure_changed = True
+        self.G.add_edge(u, v)
+
+    def _expire(self, u, v):
+        self._directed[u, v] -= 1
+        if self._directed[u, v] > 0:
+            return
+        del self._directed[u, v]
+        self._direction_changed = True
+        par = frozenset((u, v))
+        self._undirected[par] -= 1
+        if self._undirected[par] == 0:
+            del self._undirected[par]
+            self._structure_changed = True
+        self.G.remove_edge(u, v)
+        for n in (u, v):
+            if n in self.G and self.G.degree(n) == 0 and n not in self.isolated:
+                self.G.remove_node(n)
+
+    def advance(self, inicio: pd.Timestamp, fim: pd.Timestamp):
+        """Move the window to ``[inicio, fim)``; windows must move forward."""
+        inicio, fim = _utc(inicio), _utc(fim)
+        entra = np.searchsorted(self._times, fim, side="left")
+        for i in range(self._added, entra):
+            self._add(self._sources[i], self._targets[i])
+        self._added = max(self._added, entra)
+
+        sai = min(np.searchsorted(self._times, inicio, side="left"), self._added)
+        for i in range(self._expired, sai):
+            self._expire(self._sources[i], self._targets[i])
+        self._expired = max(self._expired, sai)
+
+    def run(self, periodos: Iterable[tuple[pd.Timestamp, pd.Timestamp]]) -> list[dict]:
+        """Smells of each window, in order.
+
+        Returns
+        -------
+            list: One dict per window with ``inicio``, ``fim``, ``pessoas``
+            and the keys of :func:`~apps.core.report.smells.analyse_period`.
+
+        """
+        resultados = []
+        estrutura = centralidade = None
+        for inicio, fim in periodos:
+            self.advance(inicio, fim)
+            if self._structure_changed or estrutura is None:
+                estrutura = structure_smells(self.G, self.G.to_undirected())
+                self.recomputed["structure"] += 1
+                self._structure_changed = False
+            if self._direction_changed or centralidade is None:
+                centralidade = centrality_smells(self.G, self.roles, self.mode, self.pivots)
+                self.recomputed["centrality"] += 1
+                self._direction_changed = False
+            resultados.append({
+                "inicio": inicio, "fim": fim, "pessoas": self.G.number_of_nodes(), **estrutura, **centralidade,
+            })
+        return resultados
+
+
+def _utc(moment: pd.Timestamp) -> np.datetime64:
+    """Naive UTC ``datetime64`` of a timestamp; naive timestamps are taken as UTC."""
+    moment = pd.Timestamp(moment)
+    if moment.tzinfo is not None:
+        moment = moment.tz_convert("UTC").tz_localize(None)
+    return moment.to_datetime64()
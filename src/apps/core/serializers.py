@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from .models import (
-    Application, Organization, Configuration
+    Application, Organization, Configuration, CommunitySmell
 )
 
 class ApplicationWriteSerializer(serializers.ModelSerializer):
@@ -41,5 +41,10 @@ class ConfigurationReadSerializer(serializers.ModelSerializer):
     class Meta:
         depth = 1
         model = Configuration
-        fields = '__all__' 
-        
+        fields = '__all__'
+
+
+class CommunitySmellReadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CommunitySmell
+        fields = '__all__'
@@ -3,23 +3,40 @@ import logging
 from celery import shared_task, chain
 from .extract_github.extract_eo import ExtractEO
 from .extract_github.extract_cmpo import ExtractCMPO
+from .extract_github.extract_cmpo_software_artifact import ExtractCMPOSoftwareArtifact
 from .extract_github.extract_smpo import ExtractSMPO
 from .extract_github.extract_sro import ExtractSRO
+from .report.relations import RelationDerivation
+from .report.community import community_smells
+from .models import CommunitySmell
+from django.db import transaction
+from neo4j import GraphDatabase
 from django_celery_beat.models import PeriodicTask, IntervalSchedule
 from django.db.utils import OperationalError, ProgrammingError
 import json
+import os
 
 
 logger = logging.getLogger(__name__)
 
+
+def neo4j_driver():
+    return GraphDatabase.driver(
+        os.getenv("NEO4J_URI", ""),
+        auth=(os.getenv("NEO4J_USERNAME", ""), os.getenv("NEO4J_PASSWORD", "")),
+    )
+
 @shared_task
 def retrieve_github_data(organization, secret, repository, start_date=None):
     
     chain(
         retrieve_github_eo_data.si(organization,secret,repository),
         retrieve_github_cmpo_data.si(organization,secret,repository,start_date).set(countdown=10),
+        retrieve_github_software_artifacts.si(organization,secret,repository).set(countdown=10),
         retrieve_github_smpo_data.si(organization,secret,repository,start_date).set(countdown=10),
         retrieve_github_sro_data.si(organization,secret,repository,start_date).set(countdown=10),
+        derive_relations.si(organization).set(countdown=10),
+        analyse_community_smells.si(organization).set(countdown=10),
     )()
 
 
@@ -56,6 +73,12 @@ def retrieve_github_cmpo_data(organization, secret, repository,start_date=None):
     instance.run()
     logger.info (f"{organization} - {secret} - {repository}")
 
+@shared_task(autoretry_for=(Exception,), retry_backoff=True)
+def retrieve_github_software_artifacts(organization, secret, repository):
+    logger.info (f" Retrieve software artifacts")
+    # Só os commits ainda sem arquivos extraídos: uma nova tentativa continua de onde parou
+    ExtractCMPOSoftwareArtifact(organization=organization, secret=secret, repository=repository).run()
+
 @shared_task(autoretry_for=(Exception,), retry_backoff=True)
 def retrieve_github_smpo_data(organization, secret, repository,start_date=None):
     logger.info (f" Retrieve SMPO Data")
@@ -70,3 +93,34 @@ def retrieve_github_sro_data(organization, secret, repository,start_date=None):
     instance.run()
     logger.info (f"{organization} - {secret} - {repository}")
 
+@shared_task(autoretry_for=(Exception,), retry_backoff=True)
+def derive_relations(organization, full=False):
+    logger.info (f" Derive collaboration relations")
+    driver = neo4j_driver()
+    try:
+        results = RelationDerivation(driver, organization).run(full=full)
+    finally:
+        driver.close()
+    logger.info (f"{organization} - {results}")
+
+@shared_task(autoretry_for=(Exception,), retry_backoff=True)
+def analyse_community_smells(organization):
+    logger.info (f" Analyse community smells")
+    driver = neo4j_driver()
+    try:
+        # Celery's prefork workers cannot start child processes: analyse in-process
+        generation, rows = community_smells(driver, organization, workers=1)
+    finally:
+        driver.close()
+
+    store_community_smells(organization, generation, rows)
+    logger.info (f"{organization} - {len(rows)} community smell results")
+
+
+def store_community_smells(organization, generation, rows):
+    """Replace the stored community smell results of an organization."""
+    with transaction.atomic():
+        CommunitySmell.objects.filter(organization=organization).delete()
+        CommunitySmell.objects.bulk_create(
+            CommunitySmell(organization=organization, generation=generation, **row) for row in rows
+        )
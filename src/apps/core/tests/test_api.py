@@ -0,0 +1,57 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from apps.core.models import CommunitySmell
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def admin_user(db):
+    return User.objects.create_superuser('admin', 'admin@test.com', 'password123')
+
+@pytest.fixture
+def smells(db):
+    CommunitySmell.objects.create(organization="org", team="", truck_factor=["ana (alpha)"], lone_wolves=["duda"])
+    CommunitySmell.objects.create(organization="org", team="alpha", people=2, silos=[["ana (alpha)", "bia (alpha)"]])
+    CommunitySmell.objects.create(organization="other", team="", bottlenecks=["caio (beta)"])
+
+@pytest.mark.django_db
+class TestCoreAPI:
+    """Test suite for the community smell endpoint."""
+
+    def test_unauthorized_access(self, api_client):
+        response = api_client.get(reverse('community-smell-list'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_filter_by_organization_and_team(self, api_client, admin_user, smells):
+        api_client.force_authenticate(user=admin_user)
+        url = reverse('community-smell-list')
+
+        response = api_client.get(url, {'organization': 'org'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['meta']['total'] == 2
+
+        response = api_client.get(url, {'organization': 'org', 'team': 'alpha'})
+        assert [r['silos'] for r in response.data['data']] == [[["ana (alpha)", "bia (alpha)"]]]
+
+    def test_read_only(self, api_client, admin_user):
+        api_client.force_authenticate(user=admin_user)
+        response = api_client.post(reverse('community-smell-list'), {'organization': 'org'})
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+    def test_offloaded_property(self, api_client, admin_user, tmp_path, settings):
+        from apps.core.extract_github.property_store import PropertyStore
+        settings.PROPERTY_STORE_DIR = str(tmp_path)
+        key = PropertyStore(tmp_path).put("diff " * 2000)
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.get(reverse('property-detail', args=[key]))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['data']['size'] == 10000
+
+        assert api_client.get(reverse('property-detail', args=["0" * 64])).status_code == status.HTTP_404_NOT_FOUND
+        assert api_client.get(reverse('property-detail', args=["bad"])).status_code == status.HTTP_400_BAD_REQUEST
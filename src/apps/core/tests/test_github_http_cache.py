@@ -0,0 +1,53 @@
+from apps.core.extract_github.http_cache import ResponseCache, is_immutable
+
+SHA = "a" * 40
+COMMIT_URL = f"/repos/org/repo/commits/{SHA}"
+
+
+class TestGitHubHttpCache:
+    """Test suite for the persistent GitHub response cache."""
+
+    def test_is_immutable(self):
+        assert is_immutable(COMMIT_URL)
+        assert is_immutable(f"https://api.github.com/repositories/1{COMMIT_URL}?per_page=100&page=2")
+        assert not is_immutable("/repos/org/repo/commits/main")
+        assert not is_immutable("/repos/org/repo")
+
+    def test_round_trip_and_validators(self, tmp_path):
+        cache = ResponseCache(tmp_path)
+        key = cache.key("/repos/org/repo", {"per_page": 100})
+        headers = {"etag": 'W/"abc"', "last-modified": "Mon, 01 Jan 2024 00:00:00 GMT", "x-other": "1"}
+        assert cache.put(key, "/repos/org/repo", 200, headers, b'{"full_name": "org/repo"}')
+
+        entry = ResponseCache(tmp_path).get(key)
+        assert entry.content == b'{"full_name": "org/repo"}'
+        assert "x-other" not in entry.headers
+        assert not entry.immutable
+        assert entry.validators() == {
+            "If-None-Match": 'W/"abc"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+        }
+
+    def test_immutable_commit_is_kept_without_validators(self, tmp_path):
+        cache = ResponseCache(tmp_path)
+        key = cache.key(COMMIT_URL)
+        assert cache.put(key, COMMIT_URL, 200, {}, b"{}")
+        assert cache.get(key).immutable
+
+    def test_not_stored(self, tmp_path):
+        cache = ResponseCache(tmp_path)
+        assert not cache.put(cache.key("/a"), "/a", 200, {}, b"{}")
+        assert not cache.put(cache.key(COMMIT_URL), COMMIT_URL, 404, {"etag": "x"}, b"{}")
+        assert cache.stored == 0
+        assert cache.get(cache.key("/a")) is None
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        cache = ResponseCache(tmp_path)
+        key = cache.key(COMMIT_URL)
+        cache.put(key, COMMIT_URL, 200, {}, b"{}")
+        cache._path(key).write_bytes(b"not gzip")
+        assert cache.get(key) is None
+
+    def test_key_depends_on_params(self):
+        cache = ResponseCache()
+        assert cache.key("/a", {"page": 1}) != cache.key("/a", {"page": 2})
+        assert cache.key("/a") == cache.key("/a", {})
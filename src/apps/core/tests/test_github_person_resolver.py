@@ -0,0 +1,75 @@
+from apps.core.extract_github.person_resolver import PersonResolver, parse_user
+
+
+class Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def data(self):
+        return self.rows
+
+
+class FakeGraph:
+    """Graph with the people of ``existing``, recording every statement."""
+
+    def __init__(self, existing=()):
+        self.people = {login: {"id": login} for login in existing}
+        self.calls = []
+
+    def run(self, query, **params):
+        self.calls.append((query, params))
+        if "people" in params:
+            for person in params["people"]:
+                self.people[person["id"]] = person
+            return Result([{"p": person} for person in params["people"]])
+        if "logins" in params:
+            return Result([{"p": self.people[login]} for login in params["logins"] if login in self.people])
+        return Result([])
+
+
+class TestGitHubPersonResolver:
+    """Test suite for the batch resolution of people."""
+
+    def test_parse_user(self):
+        assert parse_user({"login": "ana", "id": 1}) == ("ana", {"login": "ana", "id": 1})
+        assert parse_user('{"login": "bia"}') == ("bia", {"login": "bia"})
+        assert parse_user("caio") == ("caio", None)
+        assert parse_user(None) == (None, None)
+        assert parse_user(float("nan")) == (None, None)
+
+    def test_resolve_creates_only_missing_people(self):
+        graph = FakeGraph(existing=["ana"])
+        resolver = PersonResolver(graph, "org")
+        nodes = resolver.resolve([{"login": "ana"}, {"login": "bia", "type": "User", "url": "..."}, "ana", None])
+        assert set(nodes) == {"ana", "bia"}
+        assert resolver.created == 1
+        created = [p for _, params in graph.calls if "people" in params for p in params["people"]]
+        assert created == [{"id": "bia", "login": "bia", "name": "bia", "type": "User"}]
+        assert len(graph.calls) == 2
+
+        # Já resolvidos: nenhuma consulta nova
+        resolver.resolve(["ana", "bia"])
+        assert len(graph.calls) == 2
+
+    def test_links_are_written_per_label_and_type(self):
+        graph = FakeGraph()
+        resolver = PersonResolver(graph, "org")
+        resolver.add_link("commit", "c1", "created_by", {"login": "ana"})
+        resolver.add_link("commit", "c1", "committed_by", {"login": "ana"})
+        resolver.add_link("commit", "c2", "created_by", {"login": "bia"})
+        resolver.add_link("commit", "c3", "created_by", None)
+        assert resolver.flush() == 3
+
+        links = [(q, params["rows"]) for q, params in graph.calls if "rows" in params]
+        assert len(links) == 2
+        created_by = next(rows for q, rows in links if "`created_by`" in q)
+        assert created_by == [{"node": "c1", "login": "ana"}, {"node": "c2", "login": "bia"}]
+        assert resolver.flush() == 0
+
+    def test_flushes_when_batch_is_full(self):
+        graph = FakeGraph()
+        resolver = PersonResolver(graph, "org", batch_size=2)
+        resolver.add_link("pullrequest", 1, "reviewed_by", "ana")
+        assert resolver.linked == 0
+        resolver.add_link("pullrequest", 2, "reviewed_by", "bia")
+        assert resolver.linked == 2
@@ -0,0 +1,58 @@
+import json
+
+from apps.core.extract_github.property_schema import PROPERTY_SCHEMA, Prop, compile_schema, node_properties
+from apps.core.extract_github.seon_concepts_dictionary import COMMIT, DEVELOPMENTTASK, PULLREQUEST
+
+COMMIT_RECORD = {
+    "sha": "abc",
+    "repository": "org/repo",
+    "branch": "main",
+    "commit": {
+        "message": "Fix bug",
+        "author": {"name": "Ana", "email": "ana@x.org", "date": "2024-01-02T03:04:05Z"},
+        "committer": {"name": "GitHub", "date": "2024-01-02T03:04:06Z"},
+        "tree": {"sha": "t1", "url": "..."},
+        "verification": {"verified": True, "payload": "long"},
+    },
+    "author": {"login": "ana", "id": 1, "avatar_url": "..."},
+    "committer": None,
+    "parents": [{"sha": "p1", "url": "..."}, {"sha": "p2"}],
+    "stats": {"total": 3},
+}
+
+
+class TestGitHubPropertySchema:
+    """Test suite for the per-label property schema."""
+
+    def test_commit_keeps_only_declared_properties(self):
+        props = node_properties(COMMIT, COMMIT_RECORD)
+        assert set(props) == set(PROPERTY_SCHEMA[COMMIT])
+        assert props["id"] == props["sha"] == "abc"
+        assert props["message"] == "Fix bug"
+        assert props["author_date"] == "2024-01-02T03:04:05Z"
+        assert props["author_login"] == "ana"
+        assert props["committer_login"] is None
+        assert props["verified"] is True
+        assert props["parents"] == ["p1", "p2"]
+
+    def test_issue_renames_and_types(self):
+        record = {
+            "id": 7, "number": "12", "title": "Bug", "body": "Steps", "state": "open",
+            "user": {"login": "bia"}, "labels": [{"id": 1, "name": "bug"}, {"id": 2, "name": "ui"}],
+            "assignees": [{"login": "ana"}], "milestone": None, "reactions": {"+1": 3},
+        }
+        props = node_properties(DEVELOPMENTTASK, record)
+        assert props["description"] == "Steps"
+        assert props["number"] == 12
+        assert props["labels"] == ["bug", "ui"]
+        assert props["assignees"] == ["ana"]
+        assert props["milestone"] is None
+        assert "reactions" not in props and "body" not in props
+
+    def test_struct_as_json_text(self):
+        props = node_properties(PULLREQUEST, {"id": 1, "head": json.dumps({"ref": "feature"})})
+        assert props["head_ref"] == "feature"
+
+    def test_untyped_property_is_stringified_when_not_primitive(self):
+        transform = compile_schema({"id": Prop("id"), "extra": Prop("extra")})
+        assert transform({"id": 1, "extra": [1, 2]}) == {"id": 1, "extra": "[1, 2]"}
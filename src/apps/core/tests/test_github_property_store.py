@@ -0,0 +1,42 @@
+import pytest
+from apps.core.extract_github.property_store import PropertyStore
+
+
+class TestGitHubPropertyStore:
+    """Test suite for the offload of large text properties."""
+
+    def test_small_values_stay_on_the_node(self, tmp_path):
+        store = PropertyStore(tmp_path, threshold=10)
+        data = {"id": "1", "title": "short", "additions": 3, "body": None}
+        assert store.offload(data) == data
+        assert not any(tmp_path.iterdir())
+
+    def test_large_value_is_offloaded(self, tmp_path):
+        store = PropertyStore(tmp_path, threshold=10, preview=4)
+        patch = "@@ -1 +1 @@\n-a\n+b\n"
+        node = store.offload({"id": "x" * 20, "patch": patch})
+        assert node["id"] == "x" * 20
+        assert node["patch"] == "@@ -"
+        assert node["patch_size"] == len(patch)
+        assert store.get(node["patch_ref"]) == patch
+        assert store.resolve(node, "patch") == patch
+
+    def test_same_text_is_stored_once(self, tmp_path):
+        store = PropertyStore(tmp_path, threshold=1)
+        first = store.offload({"body": "é" * 100})
+        second = store.offload({"message": "é" * 100})
+        assert first["body_ref"] == second["message_ref"]
+        assert len(list(tmp_path.rglob("*.z"))) == 1
+
+    def test_resolve_ignores_stale_reference(self, tmp_path):
+        store = PropertyStore(tmp_path, threshold=1)
+        node = store.offload({"body": "old and long text"})
+        node["body"] = "new"
+        assert store.resolve(node, "body") == "new"
+        assert store.resolve({"body": "plain"}, "body") == "plain"
+
+    def test_invalid_key(self, tmp_path):
+        store = PropertyStore(tmp_path)
+        assert store.get("0" * 64) is None
+        with pytest.raises(ValueError):
+            store.get("../secret")
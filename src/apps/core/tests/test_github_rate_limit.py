@@ -0,0 +1,68 @@
+from apps.core.extract_github.rate_limit import HIGH, LOW, MAX_RATE, LocalBucket, RateLimiter
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestGitHubRateLimit:
+    """Test suite for the token-bucket pacing of GitHub calls."""
+
+    def limiter(self, capacity=10):
+        clock = Clock()
+        return RateLimiter("token", LocalBucket(), capacity=capacity, clock=clock), clock
+
+    def test_burst_then_wait(self):
+        limiter, _ = self.limiter()
+        assert [limiter.wait_time(HIGH) for _ in range(10)] == [0.0] * 10
+        assert limiter.wait_time(HIGH) > 0
+
+    def test_low_priority_leaves_headroom(self):
+        limiter, _ = self.limiter()
+        granted = 0
+        while limiter.wait_time(LOW) == 0:
+            granted += 1
+        assert granted == 5
+        assert limiter.wait_time(HIGH) == 0
+
+    def test_pace_follows_headers(self):
+        limiter, clock = self.limiter(capacity=1)
+        limiter.wait_time(HIGH)
+        limiter.observe(200, {"x-ratelimit-remaining": "100", "x-ratelimit-reset": str(clock.now + 50)})
+        assert limiter.wait_time(HIGH) == 0.5
+        limiter.observe(200, {"x-ratelimit-remaining": "4000", "x-ratelimit-reset": str(clock.now + 10)})
+        clock.now += 1 / MAX_RATE
+        assert limiter.wait_time(HIGH) == 0
+
+    def test_primary_limit_blocks_until_reset(self):
+        limiter, clock = self.limiter()
+        backoff = limiter.observe(403, {"x-ratelimit-remaining": "0", "x-ratelimit-reset": str(clock.now + 30)})
+        assert backoff == 30
+        assert limiter.wait_time(HIGH) == 30
+        clock.now += 30
+        assert limiter.wait_time(HIGH) == 0
+
+    def test_secondary_limit_backs_off(self):
+        limiter, clock = self.limiter()
+        assert limiter.observe(429, {"retry-after": "5"}) == 5
+        assert limiter.wait_time(HIGH) == 5
+        secundario = b'{"message": "You have exceeded a secondary rate limit."}'
+        assert limiter.observe(403, {}, secundario) == 120  # segunda vez seguida: espera exponencial
+        assert limiter.observe(200, {}) == 0
+        assert limiter.observe(403, {}, secundario.decode()) == 60
+
+    def test_plain_forbidden_is_not_a_limit(self):
+        limiter, clock = self.limiter()
+        headers = {"x-ratelimit-remaining": "4000", "x-ratelimit-reset": str(clock.now + 3600)}
+        assert limiter.observe(403, headers, b'{"message": "Resource not accessible by integration"}') == 0
+        assert limiter.wait_time(HIGH) == 0
+        # Não conta como strike: o próximo limite secundário começa da espera base
+        assert limiter.observe(429, {}) == 60
+
+    def test_token_is_not_stored(self):
+        limiter, _ = self.limiter()
+        assert "token" not in limiter.key
@@ -0,0 +1,77 @@
+from apps.core.extract_github.reference_resolver import (
+    HAS_MILESTONE, IN_MILESTONE, LABELED_WITH, PART_OF_PULL_REQUEST, ReferenceResolver,
+)
+
+
+class Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def data(self):
+        return self.rows
+
+
+class FakeGraph:
+    """Graph whose nodes are ``{(label, key): values}``, recording every statement."""
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.lookups = []
+        self.links = []
+
+    def run(self, query, **params):
+        if "values" in params:
+            tipo = next(t for t in self.nodes if f"`{t[0]}`" in query and f"`{t[1]}`" in query)
+            self.lookups.append(tipo)
+            return Result([{"value": v} for v in params["values"] if v in self.nodes[tipo]])
+        self.links.append((query, params["rows"]))
+        return Result([])
+
+
+class TestGitHubReferenceResolver:
+    """Test suite for the batch linking of labels, milestones and pull requests."""
+
+    def graph(self):
+        return FakeGraph({("label", "id"): {1, 2}, ("milestone", "id"): {10}, ("pullrequest", "url"): {"u1"}})
+
+    def test_one_lookup_per_referenced_label(self):
+        graph = self.graph()
+        resolver = ReferenceResolver(graph)
+        for issue in ("i1", "i2", "i3"):
+            resolver.add("developmenttask", issue, LABELED_WITH, 1)
+            resolver.add("developmenttask", issue, IN_MILESTONE, 10)
+            resolver.add("developmenttask", issue, PART_OF_PULL_REQUEST, "u1")
+        resolver.add("pullrequest", "p1", HAS_MILESTONE, 10)
+        resolver.flush()
+        assert sorted(graph.lookups) == [("label", "id"), ("milestone", "id"), ("pullrequest", "url")]
+        assert resolver.linked == 10
+
+    def test_direction_of_the_edges(self):
+        graph = self.graph()
+        resolver = ReferenceResolver(graph)
+        resolver.add("developmenttask", "i1", IN_MILESTONE, 10)
+        resolver.add("pullrequest", "p1", HAS_MILESTONE, 10)
+        resolver.flush()
+        queries = {rows[0]["node"]: query for query, rows in graph.links}
+        assert "(ref)-[:`has`]->(n)" in queries["i1"]
+        assert "(n)-[:`has`]->(ref)" in queries["p1"]
+
+    def test_missing_values_are_not_linked(self):
+        graph = self.graph()
+        resolver = ReferenceResolver(graph)
+        resolver.add("developmenttask", "i1", LABELED_WITH, 1)
+        resolver.add("developmenttask", "i1", LABELED_WITH, 3)
+        resolver.add("developmenttask", "i1", PART_OF_PULL_REQUEST, "u2")
+        resolver.add("developmenttask", "i1", PART_OF_PULL_REQUEST, None)
+        assert resolver.flush() == 1
+        assert resolver.missing[LABELED_WITH] == {3}
+        assert resolver.missing[PART_OF_PULL_REQUEST] == {"u2"}
+        assert [rows for _, rows in graph.links if rows] == [[{"node": "i1", "value": 1}]]
+
+    def test_flushes_when_batch_is_full(self):
+        resolver = ReferenceResolver(self.graph(), batch_size=2)
+        resolver.add("developmenttask", "i1", LABELED_WITH, 1)
+        assert resolver.linked == 0
+        resolver.add("developmenttask", "i2", LABELED_WITH, 2)
+        assert resolver.linked == 2
+        assert resolver.pending == 0
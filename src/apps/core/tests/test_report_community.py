@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+from apps.core.report.community import (
+    analyse_quarters, analyse_teams, isolated_people, quarters, read_results, result_row, write_results,
+)
+from apps.core.report.graph import label_with_team
+
+
+@pytest.fixture
+def edges():
+    df = pd.DataFrame([
+        {"team1": "alpha", "team2": "beta", "source": "ana", "target": "bia", "relation": "CO_COMMIT_IN", "created_at": "2024-01-10"},
+        {"team1": "beta", "team2": "alpha", "source": "bia", "target": "caio", "relation": "COORDINATES", "created_at": "2024-02-01"},
+        {"team1": "alpha", "team2": "alpha", "source": "caio", "target": "ana", "relation": "COORDINATES", "created_at": "2024-08-01"},
+        {"team1": None, "team2": None, "source": "duda", "target": "duda", "relation": "ISOLATED", "created_at": "2024-01-01"},
+    ])
+    df["role1"] = df["role2"] = None
+    df["created_at"] = pd.to_datetime(df["created_at"], utc=True)
+    return label_with_team(df)
+
+
+class TestReportCommunity:
+    """Test suite for the community smell service used by scripts and tasks."""
+
+    def test_quarters(self):
+        periodos = quarters(pd.Timestamp("2024-01-01"), pd.Timestamp("2024-08-15"))
+        assert [(i.month, f.month) for i, f in periodos] == [(1, 4), (4, 7), (7, 8)]
+
+    def test_analyse_quarters(self, edges):
+        periodos = quarters(edges["created_at"].min(), edges["created_at"].max())
+        resultados = analyse_quarters(edges, periodos, isolated_people(edges), workers=1)
+        assert len(resultados) == len(periodos) == 3
+        assert resultados[0]["truck"] == ["bia (beta)"]
+        assert resultados[1]["lone"] == ["duda"]
+        # Periods are half-open, so the last relation falls outside every quarter
+        assert resultados[2]["members"] == ["duda"]
+
+    def test_periods_without_data(self, edges):
+        periodos = quarters(edges["created_at"].min(), edges["created_at"].max())
+        assert analyse_quarters(edges, periodos, [], workers=1)[1] is None
+
+    def test_analyse_teams(self, edges):
+        resultados = dict(analyse_teams(edges, workers=1))
+        assert set(resultados) == {"alpha", "beta"}
+        assert resultados["alpha"]["members"] == ["ana (alpha)", "caio (alpha)"]
+        assert resultados["beta"]["members"] == ["bia (beta)"]
+
+    def test_results_round_trip(self, edges, tmp_path):
+        periodos = quarters(edges["created_at"].min(), edges["created_at"].max())
+        resultados = analyse_quarters(edges, periodos, isolated_people(edges), workers=1)
+        rows = [result_row("", i, f, r) for (i, f), r in zip(periodos, resultados)]
+
+        path = write_results(tmp_path / "smells.json", "org", "g1", rows, global_row=rows[0])
+        documento = read_results(path)
+        assert documento["generation"] == "g1"
+        assert documento["global"]["truck_factor"] == ["bia (beta)"]
+        assert documento["results"][1]["period_start"] == periodos[1][0].isoformat()
@@ -0,0 +1,87 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from apps.core.report import export
+from apps.core.report.export import chunks, write_records
+
+
+class TestReportExport:
+    """Test suite for the chunked Parquet/CSV exporter."""
+
+    rows = [
+        {"id": i, "title": None if i < 2 else f"t{i}", "created_at": datetime(2025, 1, i + 1), "labels": ["task"]}
+        for i in range(5)
+    ]
+
+    def test_chunks_are_lazy_and_bounded(self):
+        consumed = []
+
+        def records():
+            for row in self.rows:
+                consumed.append(row["id"])
+                yield row
+
+        primeiro = next(chunks(records(), chunk_rows=2))
+        assert [r["id"] for r in primeiro] == [0, 1]
+        assert consumed == [0, 1]
+        assert primeiro[0]["created_at"] == "2025-01-01T00:00:00"
+
+    def test_parquet_in_batches(self, tmp_path):
+        path, total = write_records(iter(self.rows), tmp_path / "tasks.csv", fmt="parquet", chunk_rows=2)
+        assert path.suffix == ".parquet" and total == 5
+        df = pd.read_parquet(path)
+        # título nulo no primeiro bloco vira coluna de texto
+        assert df["title"].tolist() == [None, None, "t2", "t3", "t4"]
+        assert df["labels"].map(list).tolist() == [["task"]] * 5
+
+    def test_later_chunks_promote_the_schema(self, tmp_path):
+        rows = [
+            {"pr_id": None, "count": 1, "mixed": 1},
+            {"pr_id": None, "count": 2, "mixed": "a"},
+            {"pr_id": 7, "count": 2.5, "mixed": 2},
+            {"pr_id": 8, "count": 3, "mixed": "b"},
+            {"pr_id": "x-9", "count": 4, "mixed": None},
+        ]
+        path, total = write_records(iter(rows), tmp_path / "relations", fmt="parquet", chunk_rows=2)
+        assert total == 5
+        df = pd.read_parquet(path)
+        assert df["pr_id"].tolist() == [None, None, "7", "8", "x-9"]
+        assert df["count"].tolist() == [1.0, 2.0, 2.5, 3.0, 4.0]
+        assert df["mixed"].tolist() == ["1", "a", "2", "b", None]
+
+    def test_null_first_chunk_takes_the_later_type(self, tmp_path):
+        rows = [{"pr_id": None}, {"pr_id": None}, {"pr_id": 1}, {"pr_id": 2}]
+        path, _ = write_records(rows, tmp_path / "relations", fmt="parquet", chunk_rows=2)
+        pyarrow = pytest.importorskip("pyarrow.parquet")
+        assert str(pyarrow.read_schema(path).field("pr_id").type) == "int64"
+
+    def test_empty_lists_and_structs_take_the_later_item_type(self, tmp_path):
+        rows = [{"l": [], "s": {"a": None}}] * 3 + [{"l": ["x", "y"], "s": {"a": 1, "b": "z"}}]
+        path, total = write_records(iter(rows), tmp_path / "tasks", fmt="parquet", chunk_rows=3)
+        assert total == 4
+        pq = pytest.importorskip("pyarrow.parquet")
+        table = pq.read_table(path)
+        assert str(table.schema.field("l").type.value_type) == "string"
+        assert table.column("l").to_pylist() == [[], [], [], ["x", "y"]]
+        assert table.column("s").to_pylist()[-1] == {"a": 1, "b": "z"}
+        assert table.column("s").to_pylist()[0] == {"a": None, "b": None}
+        # As partes intermediárias não ficam para trás
+        assert [p.name for p in tmp_path.iterdir()] == ["tasks.parquet"]
+
+    def test_csv_and_empty_export(self, tmp_path):
+        path, total = write_records(self.rows, tmp_path / "tasks", fmt="csv", chunk_rows=2)
+        assert path.suffix == ".csv" and total == 5
+        assert pd.read_csv(path)["id"].tolist() == [0, 1, 2, 3, 4]
+
+        path, total = write_records([], tmp_path / "vazio", fmt="parquet", columns=["id", "title"])
+        assert total == 0 and list(pd.read_parquet(path).columns) == ["id", "title"]
+
+    def test_fallback_without_pyarrow(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(export, "_pyarrow", lambda: None)
+        path, _ = write_records(self.rows, tmp_path / "tasks", fmt="parquet")
+        assert path.suffix == ".csv"
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            write_records(self.rows, tmp_path / "tasks", fmt="xlsx")
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+from apps.core.report.graph import build_graph, edge_list, label_with_team
+
+
+@pytest.fixture
+def edges():
+    return pd.DataFrame([
+        {"team1": "alpha", "team2": "beta", "source": "ana", "target": "bia", "relation": "CO_COMMIT_IN", "role1": "leader", "role2": None},
+        {"team1": "alpha", "team2": None, "source": "ana", "target": "caio", "relation": "COORDINATES", "role1": None, "role2": "dev"},
+        {"team1": None, "team2": None, "source": "duda", "target": "duda", "relation": "ISOLATED", "role1": None, "role2": None},
+        {"team1": "beta", "team2": "alpha", "source": "bia", "target": "ana", "relation": "CO_ASSIGNED", "role1": "dev", "role2": None},
+    ])
+
+
+class TestReportGraph:
+    """Test suite for the vectorized collaboration graph builder."""
+
+    def test_labels_only_people_with_team(self, edges):
+        labelled = label_with_team(edges)
+        assert list(labelled["source"]) == ["ana (alpha)", "ana (alpha)", "duda", "bia (beta)"]
+        assert list(labelled["target"]) == ["bia (beta)", "caio", "duda", "ana (alpha)"]
+
+    def test_symmetric_relations_yield_both_directions(self, edges):
+        rows = edge_list(label_with_team(edges))
+        assert list(zip(rows["source"], rows["target"])) == [
+            ("ana (alpha)", "bia (beta)"),
+            ("bia (beta)", "ana (alpha)"),
+            ("ana (alpha)", "caio"),
+            ("bia (beta)", "ana (alpha)"),
+            ("ana (alpha)", "bia (beta)"),
+        ]
+
+    def test_build_graph(self, edges):
+        G, roles = build_graph(label_with_team(edges), isolated=["eva"])
+        assert set(G.edges()) == {
+            ("ana (alpha)", "bia (beta)"),
+            ("bia (beta)", "ana (alpha)"),
+            ("ana (alpha)", "caio"),
+        }
+        assert list(G.nodes()) == ["ana (alpha)", "bia (beta)", "caio", "duda", "eva"]
+        assert G.degree("duda") == 0 and G.degree("eva") == 0
+        assert roles == {"ana (alpha)": "leader", "caio": "dev", "bia (beta)": "dev"}
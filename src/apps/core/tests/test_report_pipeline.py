@@ -0,0 +1,62 @@
+import pytest
+from apps.core.report.pipeline import RAN, SKIPPED, Pipeline, Stage
+
+
+class TestReportPipeline:
+    """Test suite for the content-addressed report pipeline."""
+
+    @pytest.fixture
+    def source(self):
+        return {"value": "a", "calls": []}
+
+    @pytest.fixture
+    def stages(self, source):
+        def extract(inputs, out_dir):
+            source["calls"].append("extract")
+            path = out_dir / "data.txt"
+            path.write_text(source["value"])
+            return {"data": path}
+
+        def upper(inputs, out_dir):
+            source["calls"].append("upper")
+            path = out_dir / "upper.txt"
+            path.write_text(inputs["extract"]["data"].read_text().upper())
+            return {"upper": path}
+
+        return [Stage("upper", upper, deps=("extract",)), Stage("extract", extract, cache=False)]
+
+    def statuses(self, runs):
+        return {run.name: run.status for run in runs}
+
+    def test_skips_unchanged_dependents(self, tmp_path, stages, source):
+        pipeline = Pipeline(stages, tmp_path)
+        assert [r.name for r in pipeline.run()] == ["extract", "upper"]
+
+        # extract always runs, but produced the same content
+        assert self.statuses(pipeline.run()) == {"extract": RAN, "upper": SKIPPED}
+        assert source["calls"] == ["extract", "upper", "extract"]
+
+        source["value"] = "b"
+        assert self.statuses(pipeline.run()) == {"extract": RAN, "upper": RAN}
+        assert (tmp_path / "upper" / "upper.txt").read_text() == "B"
+
+    def test_restores_deleted_artifacts(self, tmp_path, stages):
+        pipeline = Pipeline(stages, tmp_path)
+        pipeline.run()
+        (tmp_path / "upper" / "upper.txt").unlink()
+        assert self.statuses(pipeline.run())["upper"] == SKIPPED
+        assert (tmp_path / "upper" / "upper.txt").read_text() == "A"
+
+    def test_force_and_targets(self, tmp_path, stages):
+        pipeline = Pipeline(stages, tmp_path)
+        assert [r.name for r in pipeline.run(["extract"])] == ["extract"]
+        assert self.statuses(pipeline.run(force=["upper"]))["upper"] == RAN
+
+    def test_invalid_graphs(self, tmp_path):
+        noop = lambda inputs, out_dir: {}  # noqa: E731
+        with pytest.raises(ValueError):
+            Pipeline([Stage("a", noop, deps=("missing",))], tmp_path)
+        with pytest.raises(ValueError):
+            Pipeline([Stage("a", noop, deps=("b",)), Stage("b", noop, deps=("a",))], tmp_path)
+        with pytest.raises(ValueError):
+            Pipeline([Stage("a", noop)], tmp_path).run(["b"])
@@ -0,0 +1,130 @@
+import re
+from datetime import datetime
+
+import pytest
+from apps.core.report.relations import HASH_PREFIX, ROLES_WATERMARK, RelationDerivation, generation
+from apps.core.report.snapshot import CollaborationSnapshot
+
+
+class FakeResult:
+    def __init__(self, records):
+        self.records = records
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def single(self):
+        return self.records[0] if self.records else None
+
+    def consume(self):
+        return None
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, **params):
+        driver = self.driver
+        label = re.search(r"\(src:`(\w+)`", query)
+        if "RETURN properties(c)" in query:
+            return FakeResult([{"props": dict(driver.config)}] if driver.config else [])
+        if "SET c += $props" in query:
+            driver.config.update(params["props"])
+        elif "collect(src.id)" in query:
+            since = params["since"]
+            ids = [n["id"] for n in driver.sources[label.group(1)] if since is None or n["created_node_at"] >= since]
+            return FakeResult([{"ids": ids}])
+        elif "count(src) AS total" in query:
+            nodes = driver.sources[label.group(1)]
+            return FakeResult([{"total": len(nodes), "last": max((n["created_node_at"] for n in nodes), default=None)}])
+        elif "sum(qtd)" in query:
+            driver.merged += len(params["ids"])
+            return FakeResult([{"qtd": len(params["ids"])}])
+        elif "p.team_slug AS team_slug" in query:
+            return FakeResult(driver.people)
+        elif "properties(r) AS props" in query:
+            return FakeResult([
+                {"source": a, "target": b, "props": {"via": params["via"]}}
+                for a, b in driver.edges.get(params["via"], [])
+            ])
+        return FakeResult([])
+
+
+class FakeDriver:
+    def __init__(self):
+        self.config = {}
+        self.sources = {"pullrequest": [], "developmenttask": []}
+        self.edges = {"pr_assignee": [("ana", "bia")]}
+        self.people = [
+            {"id": "ana", "name": "Ana", "team_slug": "core", "role": None},
+            {"id": "bia", "name": "Bia", "team_slug": "core", "role": None},
+        ]
+        self.merged = 0
+
+    def session(self):
+        return FakeSession(self)
+
+
+class TestReportRelations:
+    """Test suite for the incremental relation derivation and its generation."""
+
+    @pytest.fixture
+    def driver(self):
+        driver = FakeDriver()
+        driver.sources["pullrequest"].append({"id": 1, "created_node_at": "2024-01-01T00:00:00"})
+        return driver
+
+    def test_no_new_sources_keeps_watermark_and_generation(self, driver):
+        derivation = RelationDerivation(driver, "org")
+        derivation.run()
+        config, merged = dict(driver.config), driver.merged
+        gen = CollaborationSnapshot(driver, "org").generation
+        assert gen is not None
+
+        derivation.run()
+        assert driver.config == config
+        assert driver.merged == merged
+        assert CollaborationSnapshot(driver, "org").generation == gen
+
+    def test_resynced_sources_with_same_edges_keep_generation(self, driver):
+        derivation = RelationDerivation(driver, "org")
+        derivation.run()
+        gen = CollaborationSnapshot(driver, "org").generation
+
+        # O extrator regravou o PR: a marca avança, mas as arestas são as mesmas
+        driver.sources["pullrequest"][0]["created_node_at"] = datetime.now().isoformat()
+        state = derivation.sources_state()
+        derivation.run()
+        assert derivation.last_run()["pr"] > "2024-01-01"
+        assert CollaborationSnapshot(driver, "org").generation == gen
+
+        driver.sources["pullrequest"][0]["created_node_at"] = datetime.now().isoformat()
+        driver.edges["pr_assignee"].append(("bia", "caio"))
+        assert derivation.sources_state() != state
+        derivation.run()
+        assert CollaborationSnapshot(driver, "org").generation != gen
+
+    def test_generation(self):
+        assert generation({}) is None
+        assert generation({"last_derived_at_pr": "2024"}) is None
+        config = {f"{HASH_PREFIX}pr": "a", f"{HASH_PREFIX}task": "b"}
+        assert generation(config) == generation(dict(reversed(config.items())))
+        assert generation(config) != generation({**config, ROLES_WATERMARK: "2024"})
+
+    def test_membership_changes_the_generation(self, driver):
+        RelationDerivation(driver, "org").run()
+        gen = CollaborationSnapshot(driver, "org").generation
+
+        driver.people[1]["team_slug"] = "web"
+        moved = CollaborationSnapshot(driver, "org").generation
+        assert moved != gen
+
+        driver.people.append({"id": "caio", "name": "Caio", "team_slug": "web", "role": None})
+        assert CollaborationSnapshot(driver, "org").generation not in (gen, moved)
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from apps.core.report.render import ChartCache, content_hash
+
+
+def fake_draw(calls):
+    def draw(data, path):
+        calls.append(data)
+        Path(path).write_bytes(repr(data).encode())
+    return draw
+
+
+class TestReportRender:
+    """Test suite for the content-hash chart cache."""
+
+    def test_hash_depends_on_kind_and_data(self):
+        assert content_hash("trend", {"a": 1}) == content_hash("trend", {"a": 1})
+        assert content_hash("trend", {"a": 1}) != content_hash("trend", {"a": 2})
+        assert content_hash("trend", {"a": 1}) != content_hash("teams", {"a": 1})
+
+    def test_unchanged_charts_are_not_redrawn(self, tmp_path):
+        calls = []
+        cache = ChartCache(tmp_path / "cache")
+        cache.render("trend", {"a": 1}, tmp_path / "x.png", fake_draw(calls))
+        cache.render("trend", {"a": 1}, tmp_path / "y.png", fake_draw(calls))
+        assert calls == [{"a": 1}]
+        assert (tmp_path / "y.png").read_bytes() == (tmp_path / "x.png").read_bytes()
+
+        cache.render("trend", {"a": 2}, tmp_path / "x.png", fake_draw(calls))
+        assert (cache.drawn, cache.reused) == (2, 1)
+        assert (tmp_path / "x.png").read_text() == "{'a': 2}"
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from apps.core.report.relations import ROLES_WATERMARK
+from apps.core.report.roles import QUERY_BUMP, QUERY_CURRENT, invert, roles_from_file, sync_roles
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, **params):
+        self.driver.queries.append(query)
+        if query == QUERY_BUMP:
+            self.driver.config[params["organization"]] = {ROLES_WATERMARK: params["now"]}
+            return self
+        pessoas = self.driver.graph.get(params["organization"], {})
+        records = [
+            {"login": row["login"], "before": pessoas[row["login"]], "after": row["role"]}
+            for row in params["rows"] if row["login"] in pessoas
+        ]
+        if query != QUERY_CURRENT:
+            for row in records:
+                pessoas[row["login"]] = row["after"]
+        return records
+
+    def consume(self):
+        return None
+
+
+class FakeDriver:
+    def __init__(self, graph):
+        self.graph = graph  # {organization: {login: role}}
+        self.queries = []
+        self.config = {}
+
+    def session(self):
+        return FakeSession(self)
+
+
+class TestReportRoles:
+    """Test suite for the batched role sync."""
+
+    def test_files(self, tmp_path):
+        arquivo = tmp_path / "roles.json"
+        arquivo.write_text(json.dumps({"leader": ["ana"], "chief": ["bia"]}), encoding="utf-8")
+        assert roles_from_file(arquivo) == {"ana": "leader", "bia": "chief"}
+
+        arquivo = tmp_path / "roles.csv"
+        arquivo.write_text("name,role\nana,leader\n bia ,consultant\n", encoding="utf-8")
+        assert roles_from_file(arquivo) == {"ana": "leader", "bia": "consultant"}
+
+        arquivo.write_text("login,role\nana-gh,leader\n", encoding="utf-8")
+        assert roles_from_file(arquivo) == {"ana-gh": "leader"}
+
+    def test_person_with_two_roles(self):
+        with pytest.raises(ValueError):
+            invert({"leader": ["ana"], "chief": ["ana"]})
+
+    def test_diff(self):
+        driver = FakeDriver({"org": {"ana": "leader", "bia": None, "caio": "leader"}})
+        diff = sync_roles(driver, {"ana": "leader", "bia": "chief", "caio": "consultant", "duda": "leader"}, "org")
+        assert diff.changed == [("bia", None, "chief"), ("caio", "leader", "consultant")]
+        assert diff.unchanged == 1
+        assert diff.missing == ["duda"]
+        assert driver.queries[1:] == [QUERY_BUMP]
+
+    def test_other_organization_is_not_touched(self):
+        driver = FakeDriver({"org": {"ana": None}, "outra": {"ana": "chief", "bia": "leader"}})
+        diff = sync_roles(driver, {"ana": "leader", "bia": "consultant"}, "org")
+        assert diff.changed == [("ana", None, "leader")]
+        assert diff.missing == ["bia"]
+        assert driver.graph["outra"] == {"ana": "chief", "bia": "leader"}
+        assert list(driver.config) == ["org"]
+
+    def test_unchanged_roles_keep_the_watermark(self):
+        driver = FakeDriver({"org": {"ana": "leader"}})
+        sync_roles(driver, {"ana": "leader"}, "org")
+        assert QUERY_BUMP not in driver.queries
+        assert driver.config == {}
+
+    def test_dry_run_does_not_write(self):
+        driver = FakeDriver({"org": {"ana": None}})
+        sync_roles(driver, {"ana": "leader"}, "org", dry_run=True)
+        assert driver.queries == [QUERY_CURRENT]
+        assert driver.graph["org"] == {"ana": None}
+        with pytest.raises(ValueError):
+            sync_roles(driver, {"ana": "leader"}, "")
@@ -0,0 +1,44 @@
+import networkx as nx
+import pytest
+from apps.core.report.smells import APPROX, EXACT, betweenness, bottleneck_leaders, error_bound
+
+
+@pytest.fixture
+def graph():
+    return nx.gnm_random_graph(60, 240, seed=7, directed=True)
+
+
+class TestReportSmells:
+    """Test suite for the betweenness modes of the bottleneck-leader check."""
+
+    def test_small_graphs_default_to_exact(self, graph):
+        values, metodo = betweenness(graph)
+        assert metodo["mode"] == EXACT and metodo["error"] == 0
+        assert values == nx.betweenness_centrality(graph, normalized=True)
+
+    def test_approx_is_reproducible_and_within_bound(self, graph):
+        exact, _ = betweenness(graph, EXACT)
+        first, metodo = betweenness(graph, APPROX, pivots=20)
+        second, _ = betweenness(graph, APPROX, pivots=20)
+        assert metodo["mode"] == APPROX and metodo["pivots"] == 20
+        assert first == second
+        assert max(abs(first[n] - exact[n]) for n in graph) <= metodo["error"]
+
+    def test_enough_pivots_fall_back_to_exact(self, graph):
+        _, metodo = betweenness(graph, APPROX, pivots=graph.number_of_nodes())
+        assert metodo["mode"] == EXACT
+
+    def test_error_bound_shrinks_with_pivots(self):
+        assert error_bound(1000, 400) < error_bound(1000, 100)
+
+    def test_unknown_mode(self, graph):
+        with pytest.raises(ValueError):
+            betweenness(graph, "fast")
+
+    def test_bottleneck_threshold(self):
+        G = nx.DiGraph([("lider", "a"), ("lider", "b"), ("lider", "c")])
+        G.add_nodes_from(["d", "e"])
+        roles = {"a": "leader"}
+        assert bottleneck_leaders(G, roles, {"a": 0.5}) == ["a"]
+        assert bottleneck_leaders(G, roles, {"a": 0.25, "lider": 0.5}) == ["a"]
+        assert bottleneck_leaders(G, roles, {"a": 0.1, "lider": 0.5}) == []
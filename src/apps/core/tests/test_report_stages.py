@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from apps.core.report import stages
+from apps.core.report.pipeline import RAN, SKIPPED, Pipeline
+from apps.core.tests.test_report_relations import FakeDriver
+
+TARGETS = ["relations", "roles", "smells", "charts"]
+
+
+class TestReportStages:
+    """Test suite for the caching of the report pipeline stages."""
+
+    @pytest.fixture
+    def driver(self):
+        driver = FakeDriver()
+        driver.sources["pullrequest"].append({"id": 1, "created_node_at": "2024-01-01T00:00:00"})
+        return driver
+
+    @pytest.fixture
+    def calls(self, monkeypatch):
+        calls = []
+
+        def community_smells(driver, organization, workers=None, refresh=False):
+            calls.append(("community", refresh))
+            return stages.CollaborationSnapshot(driver, organization).generation, []
+
+        monkeypatch.setattr(stages, "community_smells", community_smells)
+        monkeypatch.setattr(stages, "global_smells", lambda driver, organization: None)
+        return calls
+
+    def pipeline(self, driver, tmp_path):
+        roles = tmp_path / "roles.json"
+        if not roles.exists():
+            roles.write_text(json.dumps({"leader": ["ana"]}), encoding="utf-8")
+        return Pipeline(
+            stages.report_stages(driver, "org", tmp_path, roles_file=roles, echo=lambda text: None),
+            tmp_path / "org",
+        )
+
+    def statuses(self, runs):
+        return {run.name: run.status for run in runs}
+
+    def test_second_run_skips_every_stage(self, tmp_path, driver, calls):
+        assert set(self.statuses(self.pipeline(driver, tmp_path).run(TARGETS)).values()) == {RAN}
+        assert calls == [("community", False)]
+
+        assert self.statuses(self.pipeline(driver, tmp_path).run(TARGETS)) == dict.fromkeys(TARGETS, SKIPPED)
+        assert len(calls) == 1
+
+    def test_resync_without_new_relations_skips_the_smells(self, tmp_path, driver, calls):
+        self.pipeline(driver, tmp_path).run(TARGETS)
+
+        # Os PRs foram regravados, mas as relações derivadas são as mesmas
+        driver.sources["pullrequest"][0]["created_node_at"] = "2999-01-01T00:00:00"
+        runs = self.statuses(self.pipeline(driver, tmp_path).run(TARGETS))
+        assert runs == {"relations": RAN, "roles": RAN, "smells": SKIPPED, "charts": SKIPPED}
+        assert len(calls) == 1
+
+    def test_team_change_reruns_the_smells(self, tmp_path, driver, calls):
+        self.pipeline(driver, tmp_path).run(TARGETS)
+
+        driver.people[0]["team_slug"] = "web"
+        runs = self.statuses(self.pipeline(driver, tmp_path).run(TARGETS))
+        assert runs == {"relations": RAN, "roles": SKIPPED, "smells": RAN, "charts": RAN}
+        assert len(calls) == 2
@@ -0,0 +1,62 @@
+import pytest
+from apps.core.report.summary import StubClient, SummaryCache, TeamSummarizer, split_teams, team_sections
+
+REPORT = """# Relatório de Análise de Community Smells por Time
+
+**Período analisado:** 2024-01-01 → 2024-06-30
+
+## Periodo: ALL (all) | Time: api
+
+- Truck Factor: ana
+
+---
+
+## Periodo: ALL (all) | Time: web
+
+- Truck Factor: bia
+"""
+
+
+class FailingClient(StubClient):
+    def generate(self, prompt):
+        if "team web" in prompt:
+            raise RuntimeError("quota")
+        return super().generate(prompt)
+
+
+class TestReportSummary:
+    """Test suite for the cached per-team summaries."""
+
+    def test_split_teams(self):
+        preamble, sections = split_teams(REPORT)
+        assert "2024-01-01 → 2024-06-30" in preamble
+        assert list(sections) == ["api", "web"]
+        assert "bia" in sections["web"] and "ana" not in sections["web"]
+
+    def test_team_sections_skip_organization_rows(self):
+        row = {"people": 2, "truck_factor": ["ana"], "boundary_spanners": [], "bottlenecks": [],
+               "lone_wolves": [], "silos": [["ana", "bia"]]}
+        sections = team_sections([{**row, "team": ""}, {**row, "team": "api"}])
+        assert list(sections) == ["api"]
+        assert "Comunidade 1: ana, bia" in sections["api"]
+
+    def test_only_changed_teams_are_sent(self, tmp_path):
+        _, sections = split_teams(REPORT)
+        client = StubClient()
+        primeiro = TeamSummarizer(client, SummaryCache(tmp_path), max_workers=2)
+        resumos = primeiro.summarize(sections, "2024")
+        assert list(resumos) == ["api", "web"] and primeiro.sent == 2
+
+        sections["web"] += "\n- Lone Wolves: caio"
+        segundo = TeamSummarizer(client, SummaryCache(tmp_path))
+        assert segundo.summarize(sections, "2024")["api"] == resumos["api"]
+        assert (segundo.sent, segundo.reused) == (1, 1)
+        assert len(client.prompts) == 3
+
+    def test_failure_keeps_other_teams(self, tmp_path):
+        _, sections = split_teams(REPORT)
+        with pytest.raises(RuntimeError):
+            TeamSummarizer(FailingClient(), SummaryCache(tmp_path)).summarize(sections)
+        client = StubClient()
+        TeamSummarizer(client, SummaryCache(tmp_path)).summarize({"api": sections["api"]})
+        assert client.prompts == []
@@ -0,0 +1,90 @@
+import pytest
+from apps.core.extract_github.property_store import PropertyStore
+from apps.core.report.task_query import DESCRIPTION_REF, PAGE_KEY, Q_MATCH, build_task_query, fetch_tasks
+
+
+class FakeSession:
+    def __init__(self, rows, calls):
+        self.rows = rows
+        self.calls = calls
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, after, limit, **params):
+        self.calls.append((after, limit, params))
+        return [r for r in self.rows if after is None or r[PAGE_KEY] > after][:limit]
+
+
+class FakeDriver:
+    def __init__(self, rows):
+        # Como o Neo4j devolve: ordenadas pela chave de página
+        self.rows = [{**row, PAGE_KEY: i} for i, row in enumerate(rows)]
+        self.calls = []
+
+    def session(self):
+        return FakeSession(self.rows, self.calls)
+
+
+class TestReportTaskQuery:
+    """Test suite for the filtered, paged task queries."""
+
+    def test_only_given_filters_and_columns(self):
+        query, params = build_task_query("developmenttask", ["title", "create_date"],
+                                         {"status": "open", "q": None, "due_from": "2025-01-01"})
+        assert params == {"status": "open", "due_from": "2025-01-01"}
+        assert "$status" in query and "$due_from" in query
+        assert "$q" not in query and "$assignee" not in query
+        assert "t.title AS title" in query and "description" not in query
+        assert query.rstrip().endswith("ORDER BY t.id\nLIMIT $limit")
+        assert "SKIP" not in query
+
+    def test_no_filters_only_the_page_key(self):
+        query, params = build_task_query(columns=["id"])
+        assert params == {}
+        where = query.split("WHERE", 1)[1].split("RETURN", 1)[0]
+        assert where.split() == "t.id IS NOT NULL AND ($after IS NULL OR t.id > $after)".split()
+
+    def test_unknown_names_rejected(self):
+        with pytest.raises(ValueError):
+            build_task_query(columns=["title", "t.secret"])
+        with pytest.raises(ValueError):
+            build_task_query(filters={"label": "x"})
+
+    def test_fetch_pages(self):
+        driver = FakeDriver([{"id": i} for i in range(5)])
+        df = fetch_tasks(driver, build_task_query(columns=["id"], filters={"status": "open"}), page_size=2)
+        assert df["id"].tolist() == [0, 1, 2, 3, 4]
+        assert [(after, limit) for after, limit, _ in driver.calls] == [(None, 2), (1, 2), (3, 2)]
+        assert PAGE_KEY not in df.columns
+        assert all(params == {"status": "open"} for *_, params in driver.calls)
+
+    def test_text_filter_reads_offloaded_descriptions(self, tmp_path):
+        store = PropertyStore(tmp_path, threshold=100, preview=10)
+        longa = store.offload({"description": "x" * 200 + " agulha"})
+        outra = store.offload({"description": "y" * 200})
+        query = build_task_query(columns=["title", "description"], filters={"q": "AGULHA"})
+        assert "t.description_ref IS NOT NULL" in query.query
+        assert f"AS {Q_MATCH}" in query.query
+
+        # Linhas como o Neo4j devolve: só a prévia no nó, a referência e se título/prévia bateram
+        driver = FakeDriver([
+            {"title": "a", "description": longa["description"], DESCRIPTION_REF: longa["description_ref"], Q_MATCH: False},
+            {"title": "b", "description": outra["description"], DESCRIPTION_REF: outra["description_ref"], Q_MATCH: False},
+            {"title": "agulha", "description": "curta", DESCRIPTION_REF: None, Q_MATCH: True},
+        ])
+        df = fetch_tasks(driver, query, page_size=2, store=store)
+        assert df["title"].tolist() == ["a", "agulha"]
+        assert df["description"].tolist() == ["x" * 200 + " agulha", "curta"]
+        assert list(df.columns) == ["title", "description"]
+
+    def test_description_column_is_the_full_text(self, tmp_path):
+        store = PropertyStore(tmp_path, threshold=100, preview=10)
+        longa = store.offload({"description": "z" * 300})
+        query = build_task_query(columns=["description"])
+        assert DESCRIPTION_REF in query.query
+        driver = FakeDriver([{"description": longa["description"], DESCRIPTION_REF: longa["description_ref"]}])
+        assert fetch_tasks(driver, query, store=store)["description"].tolist() == ["z" * 300]
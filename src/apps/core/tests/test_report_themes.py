@@ -0,0 +1,65 @@
+import pandas as pd
+from apps.core.report.task_query import PAGE_KEY
+from apps.core.report.themes import TaskThemes, classify
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, **params):
+        self.driver.calls.append((query, params))
+        if "count(t)" in query:
+            return [{"tema": "BUG", "qtd": 2, "ultima_data": "2025-02-01"}]
+        after = params["after"]
+        return [r for r in self.driver.rows if after is None or r[PAGE_KEY] > after][:params["limit"]]
+
+
+class FakeDriver:
+    def __init__(self, rows=()):
+        self.rows = [{**row, PAGE_KEY: i} for i, row in enumerate(rows)]
+        self.calls = []
+
+    def session(self):
+        return FakeSession(self)
+
+
+class TestReportThemes:
+    """Test suite for the task theme classification rules."""
+
+    def test_classify(self):
+        titles = pd.Series(["[FEAT] [API] Criar endpoint", "Reunião semanal", "[Hotfix] erro", "sem prefixo", None])
+        temas = classify(titles)
+        assert list(temas["tema"]) == ["FEATURE", "REUNIAO", "BUG", "NO_PREFIX", "NO_PREFIX"]
+        assert list(temas["prefix_list"]) == [["FEAT", "API"], [], ["Hotfix"], [], []]
+        assert list(temas["prefix_tag"]) == ["FEAT", None, "Hotfix", None, None]
+        assert list(temas["title_wo_prefix"]) == ["Criar endpoint", "Reunião semanal", "erro", "sem prefixo", None]
+
+    def test_meeting_wins_over_prefix(self):
+        assert classify(pd.Series(["[BUG] reuniao de alinhamento"]))["tema"].tolist() == ["REUNIAO"]
+
+    def test_summary_uses_the_detail_filters(self):
+        driver = FakeDriver()
+        sumario = TaskThemes(driver).summary({"status": "open", "assignee": None, "due_from": "2025-01-01"})
+        assert sumario.to_dict("records") == [{"tema": "BUG", "qtd": 2, "ultima_data": "2025-02-01"}]
+        query, params = driver.calls[0]
+        assert params == {"status": "open", "due_from": "2025-01-01"}
+        assert "$status" in query and "$due_from" in query and "t.tema IS NOT NULL" in query
+
+    def test_summary_with_text_filter_counts_the_detail_rows(self):
+        rows = [
+            {"tema": "BUG", "create_date": "2025-01-01", "_q_match": True, "_description_ref": None},
+            {"tema": "BUG", "create_date": "2025-03-01", "_q_match": True, "_description_ref": None},
+            {"tema": "FEATURE", "create_date": None, "_q_match": True, "_description_ref": None},
+        ]
+        sumario = TaskThemes(FakeDriver(rows)).summary({"q": "erro"}, page_size=2)
+        assert sumario.to_dict("records") == [
+            {"tema": "BUG", "qtd": 2, "ultima_data": "2025-03-01"},
+            {"tema": "FEATURE", "qtd": 1, "ultima_data": None},
+        ]
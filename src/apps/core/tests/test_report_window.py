@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+from apps.core.report.graph import edge_array
+from apps.core.report.smells import analyse_period
+from apps.core.report.window import SlidingWindow, windows
+
+
+def edge(source, target, relation, day):
+    role = {"ana (a)": "leader"}
+    return {
+        "source": source, "target": target, "relation": relation,
+        "role1": role.get(source, "dev"), "role2": role.get(target, "dev"),
+        "created_at": pd.Timestamp("2024-01-01", tz="UTC") + timedelta(days=day),
+    }
+
+
+@pytest.fixture
+def edges():
+    return pd.DataFrame([
+        edge("ana (a)", "bia (b)", "CO_COMMIT_IN", 0),
+        edge("bia (b)", "caio (c)", "COORDINATES", 3),
+        edge("ana (a)", "bia (b)", "CO_COMMIT_IN", 12),
+        edge("caio (c)", "duda (a)", "COORDINATES", 20),
+        edge("duda (a)", "ana (a)", "COORDINATES", 40),
+    ])
+
+
+class TestReportWindow:
+    """Test suite for the incrementally updated sliding-window analysis."""
+
+    def test_windows_cover_the_range(self):
+        start = pd.Timestamp("2024-01-01")
+        periodos = list(windows(start, start + timedelta(days=20), timedelta(days=10), timedelta(days=7)))
+        assert [(i.day, f.day) for i, f in periodos] == [(1, 11), (8, 18), (15, 25)]
+        with pytest.raises(ValueError):
+            next(windows(start, start, timedelta(days=10), timedelta(0)))
+
+    def test_matches_rebuilding_each_window(self, edges):
+        periodos = list(windows(edges["created_at"].min(), edges["created_at"].max(), timedelta(days=15), timedelta(days=5)))
+        resultados = SlidingWindow(edges, isolated=["eva"]).run(periodos)
+
+        for (inicio, fim), resultado in zip(periodos, resultados):
+            periodo = edges[(edges["created_at"] >= inicio) & (edges["created_at"] < fim)]
+            esperado = analyse_period(edge_array(periodo, isolated=["eva"]))
+            for chave in ("truck", "boundary", "bottlenecks", "lone"):
+                assert sorted(resultado[chave]) == sorted(esperado[chave])
+            assert sorted(map(tuple, resultado["silos"])) == sorted(map(tuple, esperado["silos"]))
+
+    def test_unchanged_windows_reuse_metrics(self, edges):
+        deslizante = SlidingWindow(edges)
+        start = pd.Timestamp("2024-01-01", tz="UTC")
+        # Days 30-35 and 31-36 hold no edges: same (empty) graph
+        deslizante.run([
+            (start + timedelta(days=30), start + timedelta(days=35)),
+            (start + timedelta(days=31), start + timedelta(days=36)),
+        ])
+        assert deslizante.recomputed == {"structure": 1, "centrality": 1}
+        assert deslizante.G.number_of_nodes() == 0
@@ -154,6 +154,9 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Textos grandes dos nós do grafo (apps/core/extract_github/property_store.py), compartilhados por API e workers
+PROPERTY_STORE_DIR = os.getenv("PROPERTY_STORE_DIR", os.path.join(BASE_DIR, 'property_store'))
+
 REST_FRAMEWORK = {
     'DATETIME_FORMAT': '%d/%m/%Y',
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
@@ -3,6 +3,7 @@ import pandas as pd
 from dotenv import load_dotenv
 import os
 from pathlib import Path
+import sys
 
 # ===== Carregar variáveis do .env =====
 BASE_DIR = Path(__file__).resolve().parent
@@ -15,57 +16,47 @@ URI = os.getenv("NEO4J_URI")
 USER = os.getenv("NEO4J_USER")
 PASSWORD = os.getenv("NEO4J_PASSWORD")
 
+sys.path.append(str(BASE_DIR.parent.parent))
+from apps.core.report.export import write_records
+from apps.core.report.task_query import build_task_query, task_pages
+
 # ===== Config das tarefas =====
 TASK_LABEL = "developmenttask"   # ajuste a capitalização do label se preciso
 
 # Filtros opcionais (deixe como None para ignorar)
 TASK_FILTERS = {
     "status":   None,            # ex.: "open", "done"
-    "assignee": None,            # ex.: "felipe"
+    "assignee": None,            # ex.: "felipe" (login ou nome)
     "q":        None,            # busca em title/description
-    "due_from": None,            # ex.: "2025-01-01"
+    "due_from": None,            # ex.: "2025-01-01" (data de criação)
     "due_to":   None             # ex.: "2025-12-31"
 }
 
-# Arquivo de saída
-OUTPUT_CSV = "tasks_list.csv"
+# Colunas exportadas (veja COLUMNS em apps/core/report/task_query.py)
+TASK_COLUMNS = ["labels", "title", "create_date", "description"]
+
+# Arquivo de saída (.parquet, ou .csv com REPORT_EXPORT_FORMAT=csv ou sem pyarrow)
+OUTPUT = "tasks_list"
+
+
+def linhas(driver, consulta):
+    """Tarefas filtradas, página a página, com a data de criação formatada."""
+    for pagina in task_pages(driver, consulta):
+        if "create_date" in pagina.columns:
+            pagina["create_date"] = pd.to_datetime(
+                pagina["create_date"].astype(str), errors="coerce"
+            ).dt.strftime("%Y-%m-%d %H:%M:%S")
+        yield from pagina.to_dict("records")
 
-def build_task_query(label: str) -> str:
-    return f"""
-    MATCH (t:`{label}`)
-    RETURN
-        labels(t)      AS labels,
-        t.title        AS title,
-        t.created_at AS create_date,
-        t.description  AS description
-     ORDER BY
-        coalesce(t.created_at, datetime('1970-01-01T00:00:00')) DESC
-    """
 
+if __name__ == "__main__":
+    consulta = build_task_query(TASK_LABEL, TASK_COLUMNS, TASK_FILTERS)
 
-def run(query: str, params: dict) -> pd.DataFrame:
     driver = GraphDatabase.driver(URI, auth=(USER, PASSWORD))
     try:
-        with driver.session() as session:
-            res = session.run(query, parameters=params)
-            return pd.DataFrame([dict(r) for r in res])
+        # Filtros e colunas vão para o Neo4j; o arquivo é escrito em blocos
+        saida, total = write_records(linhas(driver, consulta), OUTPUT, columns=TASK_COLUMNS)
     finally:
         driver.close()
 
-if __name__ == "__main__":
-    params = {
-        "status":   TASK_FILTERS.get("status"),
-        "assignee": TASK_FILTERS.get("assignee"),
-        "q":        TASK_FILTERS.get("q"),
-        "due_from": TASK_FILTERS.get("due_from"),
-        "due_to":   TASK_FILTERS.get("due_to"),
-    }
-    df = run(build_task_query(TASK_LABEL), params)
-
-    # Conversões leves (se existirem)
-    for col in ["created_at", "updated_at", "due_date"]:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S")
-
-    df.to_csv(OUTPUT_CSV, index=False, encoding="utf-8")
-    print(f"✅ CSV gerado: {OUTPUT_CSV} ({len(df)} linhas)")
+    print(f"✅ Arquivo gerado: {saida} ({total} linhas)")
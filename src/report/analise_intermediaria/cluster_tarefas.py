@@ -1,8 +1,6 @@
 from neo4j import GraphDatabase
 import pandas as pd
-import numpy as np
-import re
-import unicodedata
+import sys
 
 from dotenv import load_dotenv
 import os
@@ -18,133 +16,67 @@ load_dotenv(dotenv_path=ENV_PATH)
 URI = os.getenv("NEO4J_URI")
 USER = os.getenv("NEO4J_USER")
 PASSWORD = os.getenv("NEO4J_PASSWORD")
-driver = GraphDatabase.driver(URI, auth=(USER, PASSWORD))
 
+sys.path.append(str(BASE_DIR.parent.parent))
+from apps.core.report.export import write_records
+from apps.core.report.themes import TaskThemes
 
 # ===== Config das tarefas =====
 TASK_LABEL = "developmenttask"
 
-# ===== Arquivos de saída =====
-CSV_DETALHES = "tasks_grouped_by_tema.csv"
-CSV_SUMARIO  = "tasks_tema_summary.csv"
-
-def build_task_query(label: str) -> str:
-    return f"""
-    MATCH (t:`{label}`)
-    RETURN
-        labels(t)        AS labels,
-        t.title          AS title,
-        t.created_at     AS create_date,
-        t.description    AS description
-    ORDER BY
-        coalesce(t.created_at, datetime('1970-01-01T00:00:00')) DESC,
-        toLower(t.title) ASC
-    """
-
-def run(query: str) -> pd.DataFrame:
+# Filtros opcionais, como em analise_tarefas.py (deixe como None para ignorar)
+TASK_FILTERS = {
+    "status":   None,
+    "assignee": None,
+    "q":        None,
+    "due_from": None,
+    "due_to":   None
+}
+
+# Colunas do CSV detalhado; "description" só é lida do Neo4j se estiver aqui
+COLUNAS = ["tema", "labels", "prefix_tag", "prefix_list", "title", "title_wo_prefix", "create_date", "description"]
+
+# ===== Arquivos de saída (.parquet, ou .csv com REPORT_EXPORT_FORMAT=csv) =====
+ARQ_DETALHES = "tasks_grouped_by_tema"
+ARQ_SUMARIO  = "tasks_tema_summary"
+
+
+def linhas(temas, nomes):
+    """Tarefas de cada tema, página a página, com a data de criação formatada."""
+    for tema in nomes:
+        for pagina in temas.pages(COLUNAS, {**TASK_FILTERS, "tema": tema}):
+            pagina["create_date"] = pd.to_datetime(
+                pagina["create_date"].astype(str), errors="coerce"
+            ).dt.strftime("%Y-%m-%d %H:%M:%S")
+            yield from pagina[COLUNAS].to_dict("records")
+
+
+if __name__ == "__main__":
     driver = GraphDatabase.driver(URI, auth=(USER, PASSWORD))
     try:
-        with driver.session() as session:
-            res = session.run(query)
-            return pd.DataFrame([dict(r) for r in res])
-    finally:
-        driver.close()
+        temas = TaskThemes(driver, label=TASK_LABEL)
 
-def strip_accents_lower(s: str) -> str:
-    if not isinstance(s, str):
-        return ""
-    s = unicodedata.normalize("NFKD", s).encode("ASCII", "ignore").decode("utf-8")
-    return s.lower()
+        # --- Classificar só as tarefas novas ou alteradas desde a última execução ---
+        novas = temas.run()
+        print(f"🏷️ {novas} tarefas classificadas nesta execução")
 
-if __name__ == "__main__":
-    df = run(build_task_query(TASK_LABEL))
-
-    # --- Extrair blocos de prefixos do início do título ---
-    df["prefix_block"] = df["title"].str.extract(r"^(\s*(?:\[[^\]]+\]\s*)+)", expand=False)
-
-    def extract_prefix_list(block):
-        if isinstance(block, str):
-            return re.findall(r"\[([^\]]+)\]", block)
-        return []
-
-    df["prefix_list"] = df["prefix_block"].apply(extract_prefix_list)
-    df["prefix_tag"]  = df["prefix_list"].apply(lambda lst: lst[0] if lst else None)
-
-    def strip_prefix(title, block):
-        if isinstance(block, str):
-            return title[len(block):].strip()
-        return title
-
-    df["title_wo_prefix"] = df.apply(lambda r: strip_prefix(r["title"], r["prefix_block"]), axis=1)
-
-    # Normaliza datas
-    if "create_date" in df.columns:
-        df["create_date"] = pd.to_datetime(df["create_date"], errors="coerce")
-
-    # === Tema (primeiro prefixo normalizado) ===
-    df["tema"] = df["prefix_tag"].apply(lambda x: (x or "NO_PREFIX").strip().upper())
-
-    # === REUNIAO: quando houver "reunião/reuniao" no título (acento-insensitive) ===
-    df["title_norm"] = df["title"].fillna("").apply(strip_accents_lower)
-    mask_reuniao = df["title_norm"].str.contains(r"\breuniao\b", regex=True)
-    df.loc[mask_reuniao, "tema"] = "REUNIAO"
-
-    # === Unificar BUG, HOTFIX e FIX em BUG ===
-    # === Unificações de tema ===
-    EQUIV = {
-        # bugfix
-        "FIX": "BUG",
-        "HOTFIX": "BUG",
-        "HOT-FIX": "BUG",
-        "FIX+FEAT": "BUG",
-        "FEAT+FIX": "BUG",
-
-        # feature
-        "FEAT": "FEATURE",
-
-        # combos / otimização -> refatoração
-        "FEAT+REFACTOR": "REFRACTOR",
-        "OTIMIZACAO": "REFRACTOR",
-        "OTIMIZAÇÃO": "REFRACTOR",
-        "OTIMIZATION": "REFRACTOR",
-        "OTIMIZATION": "REFRACTOR",
-        "Teste" : "TESTE",
-        "Testes" : "TEST",
-        "Test" : "TEST",
-        "QA" : "TEST",
-
-        # pedido do usuário
-        "REFACT": "REFRACTOR",     # <- novo
-        # (opcional) padronizar também REFACTOR:
-        "REFACTOR": "REFRACTOR",
-    }
-    df["tema"] = df["tema"].replace(EQUIV)
-
-
-    # ---- CSV detalhado agrupado (ordenado por tema e data desc) ----
-    cols = ["tema", "labels", "prefix_tag", "prefix_list", "title", "title_wo_prefix", "create_date", "description"]
-    cols = [c for c in cols if c in df.columns]
-    df_sorted = df.sort_values(["tema", "create_date"], ascending=[True, False]).copy()
-
-    # Formata data para string no CSV
-    if "create_date" in df_sorted.columns:
-        df_sorted["create_date"] = df_sorted["create_date"].dt.strftime("%Y-%m-%d %H:%M:%S")
-
-    df_sorted[cols].to_csv(CSV_DETALHES, index=False, encoding="utf-8")
+        # --- Agregar os temas já gravados nos nós (mesmos filtros do detalhado) ---
+        sumario = temas.summary(TASK_FILTERS)
+        if sumario.empty:
+            print("⚠️ Nenhuma tarefa encontrada")
+            sys.exit(0)
 
-    # ---- Sumário por tema (maiores primeiro) ----
-    sumario = (df
-        .groupby("tema", dropna=False)
-        .agg(qtd=("title", "size"),
-             ultima_data=("create_date", "max"))
-        .reset_index()
-        .sort_values(["qtd", "ultima_data"], ascending=[False, False])
-    )
+        # ---- Detalhado agrupado por tema: uma consulta paginada por tema, escrita em blocos ----
+        detalhes, total = write_records(linhas(temas, sorted(sumario["tema"])), ARQ_DETALHES, columns=COLUNAS)
+    finally:
+        driver.close()
 
-    sumario["ultima_data"] = pd.to_datetime(sumario["ultima_data"], errors="coerce") \
-                               .dt.strftime("%Y-%m-%d %H:%M:%S")
+    # ---- Sumário por tema (maiores primeiro) ----
+    sumario["ultima_data"] = pd.to_datetime(sumario["ultima_data"].astype(str), errors="coerce")
+    sumario = sumario.sort_values(["qtd", "ultima_data"], ascending=[False, False])
+    sumario["ultima_data"] = sumario["ultima_data"].dt.strftime("%Y-%m-%d %H:%M:%S")
 
-    sumario.to_csv(CSV_SUMARIO, index=False, encoding="utf-8")
+    resumo, _ = write_records(sumario.to_dict("records"), ARQ_SUMARIO, columns=list(sumario.columns))
 
-    print(f"✅ CSV detalhado gerado: {CSV_DETALHES} ({len(df_sorted)} linhas)")
-    print(f"✅ CSV sumário por tema: {CSV_SUMARIO} ({len(sumario)} temas)")
+    print(f"✅ Detalhado gerado: {detalhes} ({total} linhas)")
+    print(f"✅ Sumário por tema: {resumo} ({len(sumario)} temas)")
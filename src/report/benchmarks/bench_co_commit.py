@@ -0,0 +1,157 @@
+"""Benchmark da derivação CO_COMMIT_IN: pares de commits x pares de contribuidores.
+
+Gera um grafo sintético (PRs com poucos autores e muitos commits) e compara:
+
+- antes: (p1)<-[:created_by]-(c1)-[:committed_in]->(pr)<-[:committed_in]-(c2)-[:created_by]->(p2)
+- depois: coleta os autores distintos de cada PR e só então forma os pares
+
+Por padrão simula os dois planos em memória. Com --neo4j executa as duas
+queries (com PROFILE) num grafo sintético de labels próprios (Bench*),
+que é removido ao final. Use uma instância de testes.
+
+    python ./benchmarks/bench_co_commit.py --prs 300 --max-commits 2000
+    python ./benchmarks/bench_co_commit.py --neo4j
+"""
+
+import argparse
+import os
+import random
+import time
+from itertools import product
+from pathlib import Path
+
+QUERY_ANTES = """
+MATCH (p1:BenchPerson)<-[:created_by]-(c1:BenchCommit)-[:committed_in]->(pr:BenchPR)<-[:committed_in]-(c2:BenchCommit)-[:created_by]->(p2:BenchPerson)
+WHERE p1 <> p2
+MERGE (p1)-[r:BENCH_CO_COMMIT_IN {pr_id:pr.id}]->(p2)
+RETURN count(r) AS qtd
+"""
+
+QUERY_DEPOIS = """
+MATCH (pr:BenchPR)<-[:committed_in]-(:BenchCommit)-[:created_by]->(p:BenchPerson)
+WITH pr, collect(DISTINCT p) AS autores
+UNWIND autores AS p1
+UNWIND autores AS p2
+WITH pr, p1, p2
+WHERE p1 <> p2
+MERGE (p1)-[r:BENCH_CO_COMMIT_IN {pr_id:pr.id}]->(p2)
+RETURN count(r) AS qtd
+"""
+
+
+def gerar_grafo(prs, pessoas, max_commits, max_autores, seed=42):
+    """Retorna {pr_id: [autor de cada commit]}, com alguns PRs muito grandes."""
+    rnd = random.Random(seed)
+    grafo = {}
+    for pr in range(prs):
+        autores = rnd.sample(range(pessoas), rnd.randint(1, max_autores))
+        commits = min(max_commits, int(rnd.paretovariate(1.2) * 5))
+        grafo[pr] = [rnd.choice(autores) for _ in range(commits)]
+    return grafo
+
+
+def plano_antes(grafo):
+    arestas, linhas = set(), 0
+    for pr, autores in grafo.items():
+        for a1, a2 in product(autores, autores):
+            linhas += 1
+            if a1 != a2:
+                arestas.add((a1, a2, pr))
+    return arestas, linhas
+
+
+def plano_depois(grafo):
+    arestas, linhas = set(), 0
+    for pr, autores in grafo.items():
+        distintos = set(autores)
+        for a1, a2 in product(distintos, distintos):
+            linhas += 1
+            if a1 != a2:
+                arestas.add((a1, a2, pr))
+    return arestas, linhas
+
+
+def medir(nome, fn, *args):
+    inicio = time.perf_counter()
+    resultado = fn(*args)
+    print(f"{nome:<8} {time.perf_counter() - inicio:>9.3f}s", end="  ")
+    return resultado
+
+
+def benchmark_memoria(grafo):
+    commits = sum(len(a) for a in grafo.values())
+    print(f"PRs: {len(grafo)} | commits: {commits} | maior PR: {max(len(a) for a in grafo.values())} commits")
+    antes, linhas_antes = medir("antes", plano_antes, grafo)
+    print(f"linhas expandidas: {linhas_antes}")
+    depois, linhas_depois = medir("depois", plano_depois, grafo)
+    print(f"linhas expandidas: {linhas_depois}")
+    assert antes == depois, "os dois planos devem gerar as mesmas relações"
+    print(f"relações CO_COMMIT_IN: {len(depois)}")
+
+
+def _db_hits(plano):
+    return plano.get("dbHits", 0) + sum(_db_hits(filho) for filho in plano.get("children", []))
+
+
+def benchmark_neo4j(grafo):
+    from dotenv import load_dotenv
+    from neo4j import GraphDatabase
+
+    load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / ".env")
+    driver = GraphDatabase.driver(
+        os.getenv("NEO4J_URI"), auth=(os.getenv("NEO4J_USER"), os.getenv("NEO4J_PASSWORD"))
+    )
+    commits = [
+        {"id": f"{pr}-{i}", "pr": pr, "autor": autor}
+        for pr, autores in grafo.items()
+        for i, autor in enumerate(autores)
+    ]
+    try:
+        with driver.session() as session:
+            session.run("MATCH (n) WHERE n:BenchPerson OR n:BenchCommit OR n:BenchPR DETACH DELETE n").consume()
+            session.run("UNWIND $ids AS id CREATE (:BenchPR {id:id})", ids=list(grafo)).consume()
+            session.run(
+                "UNWIND $ids AS id CREATE (:BenchPerson {id:id})",
+                ids=sorted({a for autores in grafo.values() for a in autores}),
+            ).consume()
+            session.run("CREATE INDEX bench_pr IF NOT EXISTS FOR (n:BenchPR) ON (n.id)").consume()
+            session.run("CREATE INDEX bench_person IF NOT EXISTS FOR (n:BenchPerson) ON (n.id)").consume()
+            session.run("""
+                UNWIND $commits AS row
+                CALL {
+                  WITH row
+                  MATCH (pr:BenchPR {id:row.pr}), (p:BenchPerson {id:row.autor})
+                  CREATE (p)<-[:created_by]-(:BenchCommit {id:row.id})-[:committed_in]->(pr)
+                } IN TRANSACTIONS OF 5000 ROWS
+            """, commits=commits).consume()
+
+            for nome, query in (("antes", QUERY_ANTES), ("depois", QUERY_DEPOIS)):
+                session.run("MATCH ()-[r:BENCH_CO_COMMIT_IN]->() DELETE r").consume()
+                inicio = time.perf_counter()
+                result = session.run("PROFILE " + query)
+                qtd = result.single()["qtd"]
+                summary = result.consume()
+                print(
+                    f"{nome:<8} {time.perf_counter() - inicio:>9.3f}s  "
+                    f"linhas MERGE: {qtd}  db hits: {_db_hits(summary.profile)}"
+                )
+    finally:
+        with driver.session() as session:
+            session.run("MATCH (n) WHERE n:BenchPerson OR n:BenchCommit OR n:BenchPR DETACH DELETE n").consume()
+        driver.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prs", type=int, default=300)
+    parser.add_argument("--pessoas", type=int, default=40)
+    parser.add_argument("--max-commits", type=int, default=2000)
+    parser.add_argument("--max-autores", type=int, default=6)
+    parser.add_argument("--neo4j", action="store_true", help="Executa as queries num Neo4j em vez de simular")
+    args = parser.parse_args()
+
+    grafo = gerar_grafo(args.prs, args.pessoas, args.max_commits, args.max_autores)
+    if args.neo4j:
+        benchmark_neo4j(grafo)
+    else:
+        benchmark_memoria(grafo)
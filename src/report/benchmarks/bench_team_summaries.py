@@ -0,0 +1,48 @@
+"""Benchmark do relatório por time: chamadas sequenciais x concorrentes com cache.
+
+Usa o modelo local (``StubClient``, com latência simulada) no lugar do
+Gemini e compara: uma chamada sequencial por time, a primeira execução do
+``TeamSummarizer`` (concorrente) e uma segunda execução com só um time
+alterado.
+
+    python ./benchmarks/bench_team_summaries.py --times 20 --latencia 0.5
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from apps.core.report.summary import StubClient, SummaryCache, TeamSummarizer
+
+
+def gerar_secoes(times, alterado=None):
+    return {
+        f"time{i}": f"## Time: time{i}\n- Truck Factor: pessoa{i}\n- Lone Wolves: {'pessoaX' if i == alterado else 'nenhum'}"
+        for i in range(times)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--times", type=int, default=20)
+    parser.add_argument("--latencia", type=float, default=0.5, help="Segundos por chamada ao modelo")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    secoes = gerar_secoes(args.times)
+    cliente = StubClient(delay=args.latencia)
+
+    inicio = time.perf_counter()
+    for team, secao in secoes.items():
+        cliente.generate(secao)
+    print(f"{'sequencial':<20} {time.perf_counter() - inicio:>8.2f}s ({args.times} chamadas)")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome, entrada in (("primeira execução", secoes), ("1 time alterado", gerar_secoes(args.times, alterado=0))):
+            resumidor = TeamSummarizer(cliente, SummaryCache(pasta), max_workers=args.workers)
+            inicio = time.perf_counter()
+            resumidor.summarize(entrada)
+            print(f"{nome:<20} {time.perf_counter() - inicio:>8.2f}s ({resumidor.sent} chamadas, {resumidor.reused} do cache)")
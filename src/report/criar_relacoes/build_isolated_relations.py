@@ -1,5 +1,7 @@
 from neo4j import GraphDatabase
+import sys
 from dotenv import load_dotenv
+import argparse
 import os
 from pathlib import Path
 
@@ -10,103 +12,31 @@ ENV_PATH = BASE_DIR.parent / ".env"
 # Carregar o .env explicitamente
 load_dotenv(dotenv_path=ENV_PATH)
 
+# As derivações ficam em apps/core/report (as mesmas usadas pela task do Celery)
+sys.path.append(str(BASE_DIR.parent.parent))
+from apps.core.report.relations import RelationDerivation, ISOLATED
+
 URI = os.getenv("NEO4J_URI")
 USER = os.getenv("NEO4J_USER")
 PASSWORD = os.getenv("NEO4J_PASSWORD")
 driver = GraphDatabase.driver(URI, auth=(USER, PASSWORD))
 
-# === Queries com labels e contagem ===
-queries = [
-
-    # ==============================================================
-    # RELAÇÕES ISOLATED
-    # ==============================================================
-
-    ("DELETE isolated",
-    """
-    MATCH (p:person)-[r:ISOLATED]->(p)
-    DELETE r;
-    """),
-
-    # --- Commits isolados ---
-    ("MERGE isolated_commits",
-    """
-    MATCH (p:person {organization:"leds-conectafapes"})<-[:created_by]-(c:commit)-[:committed_in]->(pr:pullrequest)
-    WITH pr, collect(DISTINCT p) AS autores
-    WHERE size(autores) = 1
-    UNWIND autores AS isolado
-    MERGE (isolado)-[r:ISOLATED {via:"commit"}]->(isolado)
-      ON CREATE SET r.created_at = pr.created_at,
-                    r.obj_id     = pr.id,
-                    r.html_url   = pr.html_url,
-                    r.title      = pr.title,
-                    r.ended_at   = pr.merged_at
-      ON MATCH SET  r.created_at = pr.created_at,
-                    r.ended_at   = pr.merged_at,
-                    r.obj_id     = pr.id,
-                    r.html_url   = pr.html_url,
-                    r.title      = pr.title
-    RETURN count(r) AS qtd;
-    """),
-
-    # --- PRs isolados ---
-    ("MERGE isolated_prs",
-    """
-    MATCH (creator:person {organization:"leds-conectafapes"})<-[:created_by]-(pr:pullrequest)
-    OPTIONAL MATCH (pr)-[:assigned_to]->(assignee:person {organization:"leds-conectafapes"})
-    OPTIONAL MATCH (pr)-[:reviewed_by]->(reviewer:person {organization:"leds-conectafapes"})
-    WITH pr, collect(DISTINCT creator) + collect(DISTINCT assignee) + collect(DISTINCT reviewer) AS envolvidos
-    WHERE size(envolvidos) = 1
-    UNWIND envolvidos AS isolado
-    MERGE (isolado)-[r:ISOLATED {via:"pr"}]->(isolado)
-      ON CREATE SET r.created_at = pr.created_at,
-                    r.obj_id     = pr.id,
-                    r.html_url   = pr.html_url,
-                    r.title      = pr.title,
-                    r.ended_at   = pr.merged_at
-      ON MATCH SET  r.created_at = pr.created_at,
-                    r.ended_at   = pr.merged_at,
-                    r.obj_id     = pr.id,
-                    r.html_url   = pr.html_url,
-                    r.title      = pr.title
-    RETURN count(r) AS qtd;
-    """),
-
-    # --- Tasks isoladas ---
-    ("MERGE isolated_tasks",
-    """
-    MATCH (t:developmenttask)<-[:created_by]-(creator:person {organization:"leds-conectafapes"})
-    OPTIONAL MATCH (t)-[:assigned_to]->(assignee:person {organization:"leds-conectafapes"})
-    WITH t, collect(DISTINCT creator) + collect(DISTINCT assignee) AS pessoas
-    WHERE size(pessoas) = 1
-    UNWIND pessoas AS isolado
-    MERGE (isolado)-[r:ISOLATED {via:"task"}]->(isolado)
-      ON CREATE SET r.created_at = t.created_at,
-                    r.obj_id     = t.id,
-                    r.title      = t.title,
-                    r.ended_at   = t.ended_at
-      ON MATCH SET  r.created_at = t.created_at,
-                    r.ended_at   = t.ended_at,
-                    r.obj_id     = t.id,
-                    r.title      = t.title
-    RETURN count(r) AS qtd;
-    """),
-]
-
-# === Função para executar queries ===
-def run_queries():
-    with driver.session() as session:
-        for i, (label, query) in enumerate(queries, start=1):
-            print(f"Executando query {i} ({label})...")
-            result = session.run(query)
-            try:
-                qtd = result.single().get("qtd")
-                print(f" → Relações criadas/atualizadas: {qtd}")
-            except Exception:
-                print(" → Query sem retorno de contagem.")
-        print("✅ Queries de ISOLATED executadas com sucesso!")
+# === Função para executar as derivações ===
+def run_queries(organization, full=False):
+    derivation = RelationDerivation(driver, organization)
+    resultados = derivation.run(groups=[ISOLATED], full=full)
+    for i, (label, qtd) in enumerate(resultados.items(), start=1):
+        print(f"Query {i} ({label}) → Relações criadas/atualizadas: {qtd}")
+    print("✅ Queries de ISOLATED executadas com sucesso!")
 
 # === Main ===
 if __name__ == "__main__":
-    run_queries()
+    parser = argparse.ArgumentParser(description="Deriva as relações ISOLATED de commits, Pull Requests e tarefas.")
+    parser.add_argument("organization", nargs="?", default=os.getenv("ORGANIZATION"),
+                        help="Organização (person.organization); padrão: ORGANIZATION do .env")
+    parser.add_argument("--full", action="store_true",
+                        help="Recria todas as relações em vez de só as dos objetos alterados")
+    args = parser.parse_args()
+
+    run_queries(args.organization, full=args.full)
     driver.close()
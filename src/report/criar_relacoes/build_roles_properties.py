@@ -1,4 +1,5 @@
 from neo4j import GraphDatabase
+import argparse
 import sys
 
 sys.stdout.reconfigure(encoding="utf-8")
@@ -19,34 +20,49 @@ USER = os.getenv("NEO4J_USER")
 PASSWORD = os.getenv("NEO4J_PASSWORD")
 driver = GraphDatabase.driver(URI, auth=(USER, PASSWORD))
 
-# === Dicionário de papéis ===
-roles = {
-    "leader": {
-        "MateusLannes","vinicius-je","marcelasfl","joaomrpimentel","oliverids",
-        "gabrieldpbrunetti","JenniferAmaral", "ManoelRL",
-        "sofialctv","diogoanb-dev","malumantovanelli"
-    },
-    "consultant": {
-        "RobsonGarcia","franciscorj","LuizRojas","felipefo","MayaraPimenta" ,"rafaelrezo","victoriocarvalho","jvcosmo", "igorcarlospulini", "LEDS", "barcx"
-    },
-    "chief": {
-        "paulossjunior" 
-    }
-}
-
-# === Função para atualizar papéis no Neo4j ===
-def definir_papeis(driver, roles_dict):
-    with driver.session() as session:
-        for role, pessoas in roles_dict.items():
-            for pessoa in pessoas:
-                session.run("""
-                    MATCH (p:person {name:$nome})
-                    SET p.role = $role
-                """, nome=pessoa, role=role)
-                print(f"✅ {pessoa} definido como {role}")
+sys.path.append(str(BASE_DIR.parent.parent))
+from apps.core.report.roles import roles_from_eo, roles_from_file, sync_roles
+
+# === Papéis: arquivo {papel: [logins]} (ou CSV login,role) ou tabelas do EO ===
+ROLES_FILE = BASE_DIR / "roles.json"
+
+
+def carregar_papeis(args):
+    if not args.eo:
+        return roles_from_file(args.file)
+
+    # Lê TeamMembership/OrganizationalRole pelo ORM do Django
+    import django
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dashboard.settings.local")
+    django.setup()
+    return roles_from_eo(driver, args.organization)
+
+
+# === Função para atualizar papéis no Neo4j (um único UNWIND) ===
+def definir_papeis(driver, mapping, organization, dry_run=False):
+    diff = sync_roles(driver, mapping, organization, dry_run=dry_run)
+    for pessoa, antes, depois in diff.changed:
+        print(f"✅ {pessoa}: {antes or '—'} → {depois}")
+    for pessoa in diff.missing:
+        print(f"⚠ {pessoa} não encontrado no grafo")
+    print(f"\n{len(diff.changed)} papéis alterados, {diff.unchanged} sem alteração, {len(diff.missing)} não encontrados")
+    return diff
+
 
 # === Main ===
 if __name__ == "__main__":
-    definir_papeis(driver, roles)
-    driver.close()
-    print("\n✅ Atualização de papéis concluída!")
+    parser = argparse.ArgumentParser(description="Sincroniza a propriedade role das pessoas")
+    origem = parser.add_mutually_exclusive_group()
+    origem.add_argument("--file", type=Path, default=ROLES_FILE, help="JSON {papel: [logins]} ou CSV login,role")
+    origem.add_argument("--eo", action="store_true", help="Usa as associações ativas do EO (TeamMembership)")
+    parser.add_argument("--organization", default=os.getenv("ORGANIZATION"), help="Organização das pessoas")
+    parser.add_argument("--dry-run", action="store_true", help="Só mostra o que mudaria")
+    args = parser.parse_args()
+    if not args.organization:
+        parser.error("--organization (ou ORGANIZATION) é obrigatório")
+
+    try:
+        definir_papeis(driver, carregar_papeis(args), args.organization, dry_run=args.dry_run)
+    finally:
+        driver.close()
+    print("\n✅ Atualização de papéis concluída!" if not args.dry_run else "\n(dry-run: nada foi gravado)")
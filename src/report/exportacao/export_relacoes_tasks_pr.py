@@ -1,6 +1,10 @@
 from neo4j import GraphDatabase
-import pandas as pd
 import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from apps.core.report.export import export_query
 
 # === Conexão com Neo4j ===
 uri = "bolt://localhost:7687"
@@ -37,19 +41,14 @@ ORDER BY rel_type, via, src_name, dst_name
 """
 
 def export_relations():
-    with driver.session() as session:
-        print("Consultando relações detalhadas...")
-        result = session.run(EXPORT_QUERY)
-        rows = [record.data() for record in result]
+    print("Consultando relações detalhadas...")
+    # Registros do Bolt escritos em blocos (Parquet, ou CSV sem pyarrow)
+    saida, total = export_query(driver, EXPORT_QUERY, os.path.join(OUT_DIR, "relations_export"))
 
-    if not rows:
+    if total == 0:
         print("⚠ Nenhuma relação encontrada para exportar.")
         return
-
-    df = pd.DataFrame(rows)
-    out_csv = os.path.join(OUT_DIR, "relations_export.csv")
-    df.to_csv(out_csv, index=False, encoding="utf-8")
-    print(f"✔ Relações exportadas: {out_csv} ({len(df)} linhas)")
+    print(f"✔ Relações exportadas: {saida} ({total} linhas)")
 
 if __name__ == "__main__":
     export_relations()
@@ -1,7 +1,11 @@
-import google.generativeai as genai
+import argparse
+import os
+import re
+import sys
+from pathlib import Path
 
+from dotenv import load_dotenv
 
-# === Configuração da API Gemini ===
 # ===== Carregar variáveis do .env =====
 BASE_DIR = Path(__file__).resolve().parent
 ENV_PATH = BASE_DIR.parent / ".env"
@@ -11,18 +15,10 @@ load_dotenv(dotenv_path=ENV_PATH)
 
 GEMINI_KEY = os.getenv("GEMINI_KEY")
 
-# === Configuração da API Gemini ===
-genai.configure(api_key=GEMINI_KEY)
-model = genai.GenerativeModel("gemini-2.5-flash")
-
-# === Dicionário de explicações técnicas ===
-explicacoes = {
-    "bottleneck": "Bottleneck (leaders): Identifies leaders who concentrate many connections. In this case, leaders impose their participation in several tasks. A bottleneck leader can cause overload and block the workflow if not acting properly.",
-    "silos": "Organizational Silos: Subgroups that interact more with each other than with the rest. Indicates communication barriers between teams.",
-    "lone": "Lone Wolf: People in the team who cannot reach all others. They represent communication gaps that need to be addressed.",
-    "factor": "Truck Factor: Individuals whose removal disconnects the network. They are single points of vulnerability.",
-    "bound": "Boundary Spanners: Critical and disconnected people within the team who connect their team to other teams. They are vital links for inter-team collaboration.",
-}
+sys.path.append(str(BASE_DIR.parent.parent))
+from apps.core.report.summary import (
+    MAX_WORKERS, GeminiClient, StubClient, SummaryCache, TeamSummarizer, split_teams, write_report,
+)
 
 
 # === Função para ler markdown ===
@@ -30,56 +26,33 @@ def ler_markdown(caminho_md):
     with open(caminho_md, "r", encoding="utf-8") as f:
         return f.read()
 
-# === Função para gerar explicações amigáveis ===
-def gerar_relatorio_para_gestor(conteudo_md):
-    todas_explicacoes = "\n".join([f"- {v}" for v in explicacoes.values()])
-
-    prompt = f"""
-    You are a project management consultant and very knowledgeable about community smells.
-    Below are the technical definitions of each smell that may appear:
-
-
-    ### Technical definitions of community smells:
-    {todas_explicacoes}
-
-    Now, here are the analyzed results from GitHub commits, pull requests, and issues regarding community smells (in Markdown):
 
-    ### Technical report separated by team (.md):
-    {conteudo_md}
+# === Período analisado, do cabeçalho gerado por community_smells_by_teams.py ===
+def periodo_do_relatorio(preambulo):
+    match = re.search(r"Período analisado:\**\s*(.+)", preambulo)
+    return match.group(1).strip() if match else ""
 
-    Task:
-    - Analyze the technical report above by separating it by team, and write everything in corrected text form, as if it were a formal report.
-    - Dot not generate recommendations for improvement, just anaylze the smells. 
-    - Use a clear and accessible language for managers and entry-level leader.  
-    - Use simple language, without technical jargon; use the terms of community smells but also explain what they mean.
-    - Structure the output in Markdown, with well-defined titles and subtitles for each team.
-    - Write the output in english
-    
-    Out put example for a team:
-    
-    Report from inicial data x to end y, In team X, fulano is a key go-to person across tasks and conversations; that’s great for coordination, but it also risks overload.
-We see small groups that mostly talk among themselves, and franciscorj is working apart from the rest; Person 1, Person 2 and person 2 don’t reach everyone yet.
-On the bright side, the team doesn’t hinge on any single person—if someone steps away, work can still move forward.
-    """
 
-    resposta = model.generate_content(prompt)
-    return resposta.text.strip()
+# === Processar arquivo MD: um prompt por time, só os times alterados vão ao modelo ===
+def analisar_md(caminho_md, cliente, workers=MAX_WORKERS):
+    preambulo, secoes = split_teams(ler_markdown(caminho_md))
+    resumidor = TeamSummarizer(cliente, SummaryCache(BASE_DIR.parent / "cache" / "summaries"), max_workers=workers)
+    resumos = resumidor.summarize(secoes, periodo_do_relatorio(preambulo))
+    print(f"🤖 {resumidor.sent} times enviados ao modelo, {resumidor.reused} reaproveitados do cache")
+    return resumos
 
 
-# === Processar arquivo MD ===
-def analisar_md(caminho_md):
-    conteudo = ler_markdown(caminho_md)
-    return gerar_relatorio_para_gestor(conteudo)
-
-# === Exemplo de uso ===
 if __name__ == "__main__":
-    caminho = "../reports/analyse_community_smells_by_team.md"  # seu arquivo MD
-    resultado = analisar_md(caminho)
-
-    # Salva saída em outro .md
-    md_saida = "relatorio_gestor_times.md"
-    with open(md_saida, "w", encoding="utf-8") as f:
-        f.write(resultado)
+    parser = argparse.ArgumentParser(description="Relatório para gestores a partir da análise por time")
+    parser.add_argument("entrada", nargs="?", default="../reports/analyse_community_smells_by_team.md")
+    parser.add_argument("--saida", default="relatorio_gestor_times.md")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Requisições simultâneas ao modelo")
+    parser.add_argument("--stub", action="store_true", help="Usa um modelo local de teste em vez do Gemini")
+    args = parser.parse_args()
 
-    print("✅ Relatório pronto em relatorio_gestor_times.md")
+    cliente = StubClient() if args.stub else GeminiClient(GEMINI_KEY)
+    resultado = analisar_md(args.entrada, cliente, args.workers)
 
+    # Salva saída em outro .md
+    write_report(resultado, args.saida)
+    print(f"✅ Relatório pronto em {args.saida}")
@@ -1,9 +1,9 @@
 @echo off
 REM === Make.bat: choose one of the options ===
-REM Uso: make.bat build|analyse|report
+REM Uso: make.bat build|analyse|render|report
 
 if "%1"=="" (
-    echo Uso: make.bat [build|analyse|report]
+    echo Uso: make.bat [build|analyse|render|report]
     goto fim
 )
 
@@ -11,6 +11,7 @@ if "%1"=="build" (
     echo Executando criacao...
     python ./criar_relacoes/build_pr_relations.py 
     python ./criar_relacoes/build_tasks_relations.py 
+    python ./criar_relacoes/build_isolated_relations.py 
     python ./criar_relacoes/build_roles_properties.py 
     goto fim
 )
@@ -23,6 +24,12 @@ if "%1"=="analyse" (
     goto fim
 )
 
+if "%1"=="render" (
+    echo Desenhando graficos...
+    python render_charts.py 
+    goto fim
+)
+
 if "%1"=="report" (
     echo Executando reports...
     python results_teams.py 
@@ -32,6 +39,6 @@ if "%1"=="report" (
 
 
 echo Ivalid arg: %1
-echo Valid Options: build, analyse, report
+echo Valid Options: build, analyse, render, report
 
 :fim
@@ -0,0 +1,44 @@
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# ===== Desenho dos gráficos a partir das métricas salvas pelas análises =====
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR.parent))
+from apps.core.report.render import ChartCache, teams_chart, trend_chart
+
+
+def main(reports_dir):
+    cache = ChartCache(BASE_DIR / "cache" / "charts")
+
+    trimestral = reports_dir / "community_smells_trimestral.csv"
+    if trimestral.exists():
+        trend_chart(
+            cache, pd.read_csv(trimestral), reports_dir / "community_smells_evolucao.png",
+            x="periodo", title="Evolução dos Community Smells por Trimestre", xlabel="Período",
+        )
+
+    janelas = reports_dir / "community_smells_janelas.csv"
+    if janelas.exists():
+        df = pd.read_csv(janelas, parse_dates=["inicio", "fim"])
+        janela = (df["fim"].iloc[0] - df["inicio"].iloc[0]).days
+        passo = (df["inicio"].iloc[1] - df["inicio"].iloc[0]).days if len(df) > 1 else 0
+        trend_chart(
+            cache, df, reports_dir / "community_smells_janelas.png", x="fim",
+            title=f"Community Smells em janelas de {janela} dias (passo de {passo} dias)",
+            xlabel="Fim da janela", markers=False, figsize=(12, 6),
+        )
+
+    por_time = reports_dir / "community_smells_por_time.csv"
+    if por_time.exists():
+        teams_chart(cache, pd.read_csv(por_time), reports_dir / "community_smells_por_time.png")
+
+    print(f"📊 Gráficos: {cache.drawn} desenhados, {cache.reused} reaproveitados do cache")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Desenha os gráficos dos community smells (etapa opcional)")
+    parser.add_argument("--reports", type=Path, default=Path("./reports"), help="Pasta com as métricas (.csv)")
+    main(parser.parse_args().reports)